@@ -1,14 +1,30 @@
+import asyncio
+
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
 from backend.app.schemas.chat import ChatRequest, ChatResponse
 from backend.app.services.chat_agent import ZodiacAgent
+from backend.app.services.profiles import ProfileNotFoundError, with_profile
 
 router = APIRouter()
 
 
+async def _with_profile(request: ChatRequest) -> ChatRequest:
+    try:
+        request = await asyncio.to_thread(with_profile, request)
+    except ProfileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    if not request.birth_datetime or not request.birth_coordinates:
+        raise HTTPException(
+            status_code=400,
+            detail="Either 'profile_id' or 'birth_datetime' and 'birth_coordinates' must be provided.",
+        )
+    return request
+
+
 @router.post("/chat")
 async def chat_with_zodiac_agent(request: ChatRequest) -> ChatResponse:
-    # ... existing code ...
+    request = await _with_profile(request)
     try:
         user_context = {
             "birth_datetime": request.birth_datetime,
@@ -19,7 +35,8 @@ async def chat_with_zodiac_agent(request: ChatRequest) -> ChatResponse:
         agent = ZodiacAgent(user_context)
         history = [msg.model_dump() for msg in request.history]
         history.append({"role": "user", "content": request.message})
-        response_text = agent.chat(history)
+        # Tool calls wait on upstream admission and the LLM call blocks.
+        response_text = await asyncio.to_thread(agent.chat, history)
         return ChatResponse(response=response_text)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -27,6 +44,7 @@ async def chat_with_zodiac_agent(request: ChatRequest) -> ChatResponse:
 
 @router.post("/chat/stream")
 async def chat_with_zodiac_agent_stream(request: ChatRequest):
+    request = await _with_profile(request)
     try:
         user_context = {
             "birth_datetime": request.birth_datetime,
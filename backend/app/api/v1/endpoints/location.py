@@ -1,6 +1,13 @@
 from fastapi import APIRouter, HTTPException
-from backend.app.core.location import get_coordinates, get_timezone, GeopyError
-from pydantic import BaseModel
+from backend.app.core.location import (
+    get_coordinates_async,
+    get_timezone,
+    GeopyError,
+    GeocodeRateLimitError,
+)
+from backend.app.core.geocode_cache import normalize_query
+from backend.app.services.divination.zodiac.pregenerate import pregenerate_portrait
+from pydantic import BaseModel, Field
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
@@ -18,15 +25,29 @@ class LocalizeResponse(BaseModel):
     timezone: str
     coordinates: str
 
+class LocalizeBatchRequest(BaseModel):
+    items: list[LocalizeRequest] = Field(max_length=1000)
+
+class LocalizeBatchResult(BaseModel):
+    datetime: str | None = None
+    timezone: str | None = None
+    coordinates: str | None = None
+    error: str | None = None
+
+class LocalizeBatchResponse(BaseModel):
+    results: list[LocalizeBatchResult]
+
 @router.get("/resolve")
 async def resolve_location(city: str) -> LocationResponse:
     try:
-        coordinates = get_coordinates(city)
+        coordinates = await get_coordinates_async(city)
         if not coordinates:
              raise HTTPException(status_code=404, detail="Location not found")
         return LocationResponse(coordinates=coordinates)
     except GeopyError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except GeocodeRateLimitError as e:
+        raise HTTPException(status_code=429, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -34,7 +55,7 @@ async def resolve_location(city: str) -> LocationResponse:
 async def localize_datetime(request: LocalizeRequest) -> LocalizeResponse:
     try:
         # 1. Get Coordinates
-        coordinates = get_coordinates(request.city)
+        coordinates = await get_coordinates_async(request.city)
         if not coordinates:
             raise HTTPException(status_code=404, detail=f"Location not found: {request.city}")
         
@@ -53,15 +74,83 @@ async def localize_datetime(request: LocalizeRequest) -> LocalizeResponse:
             tz = ZoneInfo(tz_name)
             dt_aware = dt.replace(tzinfo=tz)
             
-            return LocalizeResponse(
+            localized = LocalizeResponse(
                 datetime=dt_aware.isoformat(),
                 timezone=tz_name,
                 coordinates=coordinates
             )
         except ValueError:
              raise HTTPException(status_code=400, detail="Invalid date format. Expected ISO (YYYY-MM-DDTHH:MM:SS)")
+
+        # 4. Onboarding asks for the portrait next; get it started now
+        pregenerate_portrait(localized.datetime, localized.coordinates)
+        return localized
              
     except GeopyError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except GeocodeRateLimitError as e:
+        raise HTTPException(status_code=429, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/localize/batch")
+async def localize_datetime_batch(
+    request: LocalizeBatchRequest,
+) -> LocalizeBatchResponse:
+    """
+    Localize many (date, city) pairs in one call.
+
+    Each distinct city is geocoded and timezone-resolved once; failures are
+    reported per item instead of failing the whole batch.
+
+    Cities missing from the geocode cache are resolved one after another
+    under GEOCODE_RATE_LIMIT (one per second by default), so a batch takes
+    about a second per new city.
+    """
+    # 1. Resolve each distinct city once
+    resolved: dict[str, tuple[str, str, ZoneInfo] | str] = {}
+    for item in request.items:
+        key = normalize_query(item.city)
+        if key in resolved:
+            continue
+        try:
+            coordinates = await get_coordinates_async(item.city)
+            if not coordinates:
+                resolved[key] = f"Location not found: {item.city}"
+                continue
+            lat, lng = map(float, coordinates.split(","))
+            tz_name = get_timezone(lat, lng)
+            if not tz_name:
+                resolved[key] = "Timezone not found for location"
+                continue
+            resolved[key] = (coordinates, tz_name, ZoneInfo(tz_name))
+        except Exception as e:
+            # A timeout or network error fails only this city's items.
+            resolved[key] = str(e) or type(e).__name__
+
+    # 2. Localize every datetime against the resolved timezones
+    results = []
+    for item in request.items:
+        entry = resolved[normalize_query(item.city)]
+        if isinstance(entry, str):
+            results.append(LocalizeBatchResult(error=entry))
+            continue
+        coordinates, tz_name, tz = entry
+        try:
+            dt = datetime.fromisoformat(item.date_str)
+        except ValueError:
+            results.append(
+                LocalizeBatchResult(
+                    error="Invalid date format. Expected ISO (YYYY-MM-DDTHH:MM:SS)"
+                )
+            )
+            continue
+        results.append(
+            LocalizeBatchResult(
+                datetime=dt.replace(tzinfo=tz).isoformat(),
+                timezone=tz_name,
+                coordinates=coordinates,
+            )
+        )
+    return LocalizeBatchResponse(results=results)
@@ -0,0 +1,62 @@
+import asyncio
+
+from fastapi import APIRouter, HTTPException
+from backend.app.core.location import GeocodeRateLimitError, GeopyError
+from backend.app.schemas.profile import ProfileCreateRequest, ProfileUpdateRequest
+from backend.app.services.divination.zodiac.pregenerate import pregenerate_portrait
+from backend.app.services.profiles import (
+    Profile,
+    ProfileNotFoundError,
+    get_profile_store,
+)
+
+router = APIRouter()
+
+
+def _http_error(error: Exception) -> HTTPException:
+    if isinstance(error, ProfileNotFoundError):
+        return HTTPException(status_code=404, detail=str(error))
+    if isinstance(error, GeopyError):
+        return HTTPException(status_code=404, detail=str(error))
+    if isinstance(error, GeocodeRateLimitError):
+        return HTTPException(status_code=429, detail=str(error))
+    if isinstance(error, ValueError):
+        return HTTPException(status_code=400, detail=str(error))
+    return HTTPException(status_code=500, detail=str(error))
+
+
+@router.post("", status_code=201)
+async def create_profile(request: ProfileCreateRequest) -> Profile:
+    """
+    Store a user's birth data, resolved to coordinates and a localized
+    datetime, and return it with the id later requests can use instead.
+    """
+    try:
+        profile = await asyncio.to_thread(
+            get_profile_store().create, **request.model_dump()
+        )
+    except Exception as e:
+        raise _http_error(e) from e
+    pregenerate_portrait(profile.birth_datetime, profile.birth_coordinates)
+    return profile
+
+
+@router.get("/{profile_id}")
+async def get_profile(profile_id: str) -> Profile:
+    try:
+        return await asyncio.to_thread(get_profile_store().get, profile_id)
+    except Exception as e:
+        raise _http_error(e) from e
+
+
+@router.patch("/{profile_id}")
+async def update_profile(profile_id: str, request: ProfileUpdateRequest) -> Profile:
+    """
+    Change the current location used for daily transits.
+    """
+    try:
+        return await asyncio.to_thread(
+            get_profile_store().move, profile_id, **request.model_dump()
+        )
+    except Exception as e:
+        raise _http_error(e) from e
@@ -1,25 +1,112 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+import os
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from backend.app.services.divination.zodiac.batch import (
+    stream_daily_transits,
+    stream_portraits,
+)
+from backend.app.services.divination.zodiac.daily import seconds_left_in_day
 from backend.app.services.divination.zodiac.engine import get_zodiac_engine
+from backend.app.services.profiles import (
+    ProfileNotFoundError,
+    get_profile_store,
+    with_profile,
+)
+from backend.app.services.divination.zodiac.nightly import (
+    remember_daily_transit_user,
+)
+from backend.app.services.divination.zodiac.jobs import (
+    DAILY_TRANSIT_JOB,
+    PORTRAIT_JOB,
+    get_job_queue,
+)
 from backend.app.schemas.zodiac import (
     ZodiacPortraitRequest,
     ZodiacPortraitResponse,
+    ZodiacPortraitBatchRequest,
     ZodiacDailyTransitRequest,
     ZodiacDailyTransitResponse,
+    ZodiacDailyTransitBatchRequest,
 )
 
-from backend.app.core.location import get_coordinates
+from backend.app.core.jobs import Job
+from backend.app.core.location import (
+    GeocodeRateLimitError,
+    GeopyError,
+    get_coordinates_async,
+)
+from backend.app.core.quota import UpstreamBusyError
+from backend.app.core.http_cache import conditional_response
+from backend.app.core.serialization import dumps
+from backend.app.core.swr_cache import collect_staleness
 
 router = APIRouter()
-engine = get_zodiac_engine()
 
+# How long the app may show a portrait before revalidating it.
+PORTRAIT_MAX_AGE = int(os.getenv("PORTRAIT_HTTP_MAX_AGE", "86400"))
+
+
+def _try_later(error: UpstreamBusyError) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail=str(error),
+        headers={"Retry-After": str(error.retry_after)},
+    )
+
+
+def _flag_stale(response: Response, ages: list[float]) -> None:
+    """
+    Tell the client that (part of) the answer came from an expired cache
+    entry while a fresh one is being computed.
+    """
+    if ages:
+        response.headers["X-Stale"] = "true"
+        response.headers["Age"] = str(int(max(ages)))
 
-@router.post("/divination/zodiac/portrait")
-async def get_ai_portrait(request: ZodiacPortraitRequest) -> ZodiacPortraitResponse:
+
+def _keep_portrait(profile_id: str, datetime: str, coordinates: str, portrait):
+    # The chart was just read to generate the portrait, so it is cached.
+    chart = get_zodiac_engine().get_portrait(datetime, coordinates)
+    get_profile_store().set_portrait(profile_id, portrait, chart)
+
+
+async def _resolve_city(city: str) -> str | None:
+    try:
+        return await get_coordinates_async(city)
+    except GeopyError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    except GeocodeRateLimitError as e:
+        raise HTTPException(status_code=429, detail=str(e)) from e
+
+
+async def _with_profile(request):
+    try:
+        return await asyncio.to_thread(with_profile, request)
+    except ProfileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+
+
+@router.post("/divination/zodiac/portrait", response_model=ZodiacPortraitResponse)
+async def get_ai_portrait(request: ZodiacPortraitRequest, http: Request) -> Response:
+    """
+    The portrait, with an ETag: a request sending it back in If-None-Match
+    gets a 304 while the portrait is unchanged.
+    """
+    request = await _with_profile(request)
+    if not request.datetime:
+        raise HTTPException(
+            status_code=400,
+            detail="Either 'profile_id' or 'datetime' must be provided.",
+        )
     try:
         coordinates = request.coordinates
         if not coordinates:
             if request.city:
-                coordinates = get_coordinates(request.city)
+                coordinates = await _resolve_city(request.city)
                 if not coordinates:
                     raise HTTPException(
                         status_code=400,
@@ -30,19 +117,55 @@ async def get_ai_portrait(request: ZodiacPortraitRequest) -> ZodiacPortraitRespo
                     status_code=400,
                     detail="Either 'coordinates' or 'city' must be provided.",
                 )
-        return engine.get_ai_portrait(request.datetime, coordinates)
+        with collect_staleness() as stale_ages:
+            # Admission to the Prokerala quota may block for seconds.
+            portrait = await asyncio.to_thread(
+                get_zodiac_engine().get_ai_portrait, request.datetime, coordinates
+            )
+        if request.profile_id:
+            await asyncio.to_thread(
+                _keep_portrait,
+                request.profile_id,
+                request.datetime,
+                coordinates,
+                portrait,
+            )
+        response = conditional_response(
+            http, portrait, PORTRAIT_MAX_AGE, stale=bool(stale_ages)
+        )
+        _flag_stale(response, stale_ages)
+        return response
+    except UpstreamBusyError as e:
+        raise _try_later(e) from e
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/divination/zodiac/daily-transit")
+@router.post(
+    "/divination/zodiac/daily-transit", response_model=ZodiacDailyTransitResponse
+)
 async def get_ai_daily_transit(
-    request: ZodiacDailyTransitRequest,
-) -> ZodiacDailyTransitResponse:
+    request: ZodiacDailyTransitRequest, http: Request
+) -> Response:
+    """
+    The daily transit, cacheable by the app until local midnight and
+    revalidated with its ETag like the portrait.
+    """
+    request = await _with_profile(request)
+    if not request.birth_datetime:
+        raise HTTPException(
+            status_code=400,
+            detail="Either 'profile_id' or 'birth_datetime' must be provided.",
+        )
+    transit_datetime = (
+        request.transit_datetime or datetime.now(timezone.utc).isoformat()
+    )
     birth_coordinates = request.birth_coordinates
     if not birth_coordinates:
         if request.birth_city:
-            birth_coordinates = get_coordinates(request.birth_city)
+            birth_coordinates = await _resolve_city(request.birth_city)
             if not birth_coordinates:
                 raise HTTPException(
                     status_code=400,
@@ -57,7 +180,7 @@ async def get_ai_daily_transit(
     current_coordinates = request.current_coordinates
     if not current_coordinates:
         if request.current_city:
-            current_coordinates = get_coordinates(request.current_city)
+            current_coordinates = await _resolve_city(request.current_city)
             # If current city coordinate resolution fails, we could fallback to birth coordinates or error out.
             # For strictness, let's error.
             if not current_coordinates:
@@ -69,10 +192,134 @@ async def get_ai_daily_transit(
             # If neither is provided, fallback to birth location as a default 'current' location
             current_coordinates = birth_coordinates
 
-    return engine.get_ai_daily_transit(
-        birth_datetime=request.birth_datetime,
-        birth_coordinates=birth_coordinates,
-        transit_datetime=request.transit_datetime,
-        current_coordinates=current_coordinates,
-        ai_portrait=request.ai_portrait,
+    try:
+        with collect_staleness() as stale_ages:
+            daily_transit = await asyncio.to_thread(
+                get_zodiac_engine().get_ai_daily_transit,
+                birth_datetime=request.birth_datetime,
+                birth_coordinates=birth_coordinates,
+                transit_datetime=transit_datetime,
+                current_coordinates=current_coordinates,
+                ai_portrait=request.ai_portrait,
+            )
+    except UpstreamBusyError as e:
+        raise _try_later(e) from e
+    # Pre-generate tomorrow's transit before this user's morning.
+    await asyncio.to_thread(
+        remember_daily_transit_user,
+        request.birth_datetime,
+        birth_coordinates,
+        current_coordinates,
+        request.ai_portrait,
+    )
+    response = conditional_response(
+        http,
+        daily_transit,
+        seconds_left_in_day(current_coordinates),
+        stale=bool(stale_ages),
     )
+    _flag_stale(response, stale_ages)
+    return response
+
+
+def _ndjson(results: AsyncIterator[dict[str, Any]]) -> StreamingResponse:
+    async def lines():
+        async for result in results:
+            yield dumps(result) + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.post("/divination/zodiac/portrait/batch")
+async def get_ai_portrait_batch(request: ZodiacPortraitBatchRequest):
+    """
+    Generate portraits for many profiles.
+
+    Streams one JSON line per item as it completes, in completion order:
+    {"index", "status": 200, "result"} or {"index", "status", "error"}.
+    """
+    return _ndjson(stream_portraits(request.items))
+
+
+@router.post("/divination/zodiac/daily-transit/batch")
+async def get_ai_daily_transit_batch(request: ZodiacDailyTransitBatchRequest):
+    """
+    Generate daily transits for many profiles, streamed like the portrait
+    batch endpoint.
+    """
+    return _ndjson(stream_daily_transits(request.items))
+
+
+async def _submit(
+    kind: str, payload: dict[str, Any], http: Request, response: Response
+):
+    job = await asyncio.to_thread(get_job_queue().submit, kind, payload)
+    response.headers["Location"] = str(http.url_for("get_zodiac_job", job_id=job.id))
+    return job
+
+
+@router.post("/divination/zodiac/portrait/jobs", status_code=202)
+async def submit_ai_portrait_job(
+    request: ZodiacPortraitRequest, http: Request, response: Response
+) -> Job:
+    """
+    Queue a portrait generation and answer right away; poll the job for the
+    result. An identical job still in progress is returned instead of a new one.
+    """
+    if not request.profile_id and not request.datetime:
+        raise HTTPException(
+            status_code=400,
+            detail="Either 'profile_id' or 'datetime' must be provided.",
+        )
+    if not request.profile_id and not request.coordinates and not request.city:
+        raise HTTPException(
+            status_code=400,
+            detail="Either 'coordinates' or 'city' must be provided.",
+        )
+    payload = request.model_dump(mode="json", exclude_none=True)
+    return await _submit(PORTRAIT_JOB, payload, http, response)
+
+
+@router.post("/divination/zodiac/daily-transit/jobs", status_code=202)
+async def submit_ai_daily_transit_job(
+    request: ZodiacDailyTransitRequest, http: Request, response: Response
+) -> Job:
+    """
+    Queue a daily transit generation, like the portrait job endpoint.
+    """
+    if not request.profile_id and not request.birth_datetime:
+        raise HTTPException(
+            status_code=400,
+            detail="Either 'profile_id' or 'birth_datetime' must be provided.",
+        )
+    if (
+        not request.profile_id
+        and not request.birth_coordinates
+        and not request.birth_city
+    ):
+        raise HTTPException(
+            status_code=400,
+            detail="Either 'birth_coordinates' or 'birth_city' must be provided.",
+        )
+    payload = request.model_dump(mode="json", exclude_none=True)
+    return await _submit(DAILY_TRANSIT_JOB, payload, http, response)
+
+
+@router.get("/divination/zodiac/jobs/{job_id}")
+async def get_zodiac_job(
+    job_id: str, response: Response, wait: float = Query(0, ge=0, le=30)
+) -> Job:
+    """
+    The job's status, and its result once done. With `wait`, hold the
+    request up to that many seconds for the job to finish (long polling).
+    """
+    queue = get_job_queue()
+    if wait:
+        job = await queue.wait(job_id, wait)
+    else:
+        job = await asyncio.to_thread(queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    if not job.finished:
+        response.headers["Retry-After"] = "1"
+    return job
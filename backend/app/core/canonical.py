@@ -0,0 +1,89 @@
+"""
+Canonical chart inputs.
+
+Clients send the same chart in many spellings: "2000-01-01T08:00:00+08:00"
+and "2000-01-01T00:00:00Z" are one moment, and "25.0375198,121.5636796" and
+"25.03752,121.56368" are one place as far as a chart can tell. Used as
+cache keys and sent upstream in their canonical form, they share one cache
+entry and one upstream call.
+"""
+
+import os
+from datetime import datetime, timezone
+from typing import Union
+
+from pydantic import BaseModel
+
+# Two decimals is roughly 1km, which moves the houses by a fraction of a
+# degree.
+COORDINATE_PRECISION = int(os.getenv("CHART_COORDINATE_PRECISION", "2"))
+
+
+class BirthMoment(BaseModel):
+    """
+    The moment a chart is cast for, in UTC to the second.
+    """
+
+    model_config = {"frozen": True}
+    utc: datetime
+
+    @classmethod
+    def parse(cls, value: Union[str, datetime, "BirthMoment"]) -> "BirthMoment":
+        """
+        Accepts ISO 8601 strings and datetimes; a datetime without an offset
+        is taken as UTC. Raises ValueError for anything else.
+        """
+        if isinstance(value, BirthMoment):
+            return value
+        moment = datetime.fromisoformat(value) if isinstance(value, str) else value
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        return cls(utc=moment.astimezone(timezone.utc).replace(microsecond=0))
+
+    def __str__(self) -> str:
+        return self.utc.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class Coordinates(BaseModel):
+    """
+    A place, rounded to `precision` decimals (CHART_COORDINATE_PRECISION).
+    """
+
+    model_config = {"frozen": True}
+    latitude: float
+    longitude: float
+
+    @classmethod
+    def quantize(
+        cls,
+        latitude: float,
+        longitude: float,
+        precision: int = COORDINATE_PRECISION,
+    ) -> "Coordinates":
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise ValueError(f"Coordinates out of range: {latitude},{longitude}")
+        # Adding 0.0 turns a rounded -0.0 into 0.0.
+        return cls(
+            latitude=round(latitude, precision) + 0.0,
+            longitude=round(longitude, precision) + 0.0,
+        )
+
+    @classmethod
+    def parse(
+        cls,
+        value: Union[str, "Coordinates"],
+        precision: int = COORDINATE_PRECISION,
+    ) -> "Coordinates":
+        """
+        Accepts "latitude,longitude" strings. Raises ValueError for anything
+        else.
+        """
+        if isinstance(value, Coordinates):
+            return value
+        parts = value.split(",")
+        if len(parts) != 2:
+            raise ValueError(f"Invalid coordinates: {value!r}")
+        return cls.quantize(float(parts[0]), float(parts[1]), precision)
+
+    def __str__(self) -> str:
+        return f"{self.latitude},{self.longitude}"
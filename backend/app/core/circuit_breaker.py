@@ -0,0 +1,167 @@
+"""
+Circuit breakers for upstream services.
+
+A breaker opens after `failure_threshold` consecutive failures (errors, or
+calls slower than `slow_call_duration`) and then fails calls immediately
+for `recovery_timeout` seconds. After that it lets `half_open_calls` probe
+calls through: one success closes it again, a failure re-opens it.
+
+Rejected calls raise CircuitOpenError, an UpstreamBusyError, so callers
+already answering "try later" for a saturated upstream handle an unhealthy
+one the same way.
+"""
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from enum import Enum
+from typing import Callable
+
+from backend.app.core.metrics import Counter, registry
+from backend.app.core.quota import UpstreamBusyError
+
+logger = logging.getLogger(__name__)
+
+
+class State(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(UpstreamBusyError):
+    def __init__(self, upstream: str, retry_after: float):
+        super().__init__(upstream, retry_after, reason="unavailable")
+
+
+circuit_transitions = registry.register(
+    Counter(
+        "myng_circuit_transitions_total",
+        "Circuit breaker state changes by upstream and new state.",
+    )
+)
+
+
+def is_upstream_failure(error: BaseException) -> bool:
+    """
+    Whether `error` says something about the upstream's health. Client
+    errors (4xx other than 429) are the caller's fault and do not count.
+    """
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    if isinstance(status, int) and 400 <= status < 500 and status != 429:
+        return False
+    return True
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_calls: int = 1,
+        slow_call_duration: float | None = None,
+        is_failure: Callable[[BaseException], bool] = is_upstream_failure,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_calls = half_open_calls
+        self.slow_call_duration = slow_call_duration
+        self.is_failure = is_failure
+        self.state = State.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+
+    def _transition(self, state: State) -> None:
+        if self.state is state:
+            return
+        self.state = state
+        circuit_transitions.inc(upstream=self.name, state=state.value)
+        log = logger.warning if state is State.OPEN else logger.info
+        log(
+            "Circuit breaker state changed",
+            extra={"upstream": self.name, "state": state.value},
+        )
+
+    def retry_after(self) -> float:
+        return max(0.0, self._opened_at + self.recovery_timeout - time.monotonic())
+
+    def check(self) -> None:
+        """
+        Raise CircuitOpenError while the breaker is open, without taking a
+        half-open probe slot. Lets callers skip work ahead of the call.
+        """
+        if self.state is State.OPEN and self.retry_after() > 0:
+            raise CircuitOpenError(self.name, self.retry_after())
+
+    def before_call(self) -> None:
+        """
+        Raise CircuitOpenError unless a call may go through now.
+        """
+        with self._lock:
+            if self.state is State.OPEN:
+                if self.retry_after() > 0:
+                    raise CircuitOpenError(self.name, self.retry_after())
+                self._transition(State.HALF_OPEN)
+                self._probes = 0
+            if self.state is State.HALF_OPEN:
+                if self._probes >= self.half_open_calls:
+                    # A probe is in flight; its outcome is known shortly.
+                    raise CircuitOpenError(self.name, 1.0)
+                self._probes += 1
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._transition(State.CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if (
+                self.state is State.HALF_OPEN
+                or self._failures >= self.failure_threshold
+            ):
+                self._opened_at = time.monotonic()
+                self._transition(State.OPEN)
+
+    @contextmanager
+    def call(self):
+        """
+        Guard the block: fail fast while open, and record its outcome.
+        """
+        self.before_call()
+        start = time.monotonic()
+        try:
+            yield
+        except BaseException as e:
+            if self.is_failure(e):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        slow = self.slow_call_duration
+        if slow is not None and time.monotonic() - start > slow:
+            self.record_failure()
+        else:
+            self.record_success()
+
+
+def breaker_from_env(name: str, prefix: str) -> CircuitBreaker:
+    """
+    Build a breaker configured by `{prefix}_CIRCUIT_FAILURES`,
+    `_CIRCUIT_RECOVERY`, `_CIRCUIT_HALF_OPEN_CALLS` and `_CIRCUIT_SLOW_CALL`.
+    """
+    slow = os.getenv(f"{prefix}_CIRCUIT_SLOW_CALL")
+    return CircuitBreaker(
+        name,
+        failure_threshold=int(os.getenv(f"{prefix}_CIRCUIT_FAILURES", "5")),
+        recovery_timeout=float(os.getenv(f"{prefix}_CIRCUIT_RECOVERY", "30")),
+        half_open_calls=int(os.getenv(f"{prefix}_CIRCUIT_HALF_OPEN_CALLS", "1")),
+        slow_call_duration=float(slow) if slow else None,
+    )
@@ -0,0 +1,62 @@
+"""
+SQLAlchemy engines shared by the persistent stores.
+
+Engines are pooled and cached per URL. SQLite databases (the default) run
+in WAL mode so readers never wait on the writer. Pooled connections do not
+survive fork(); the pool is dropped in the child on first use.
+"""
+
+import os
+import tempfile
+import threading
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+
+DEFAULT_DATABASE_URL = "sqlite:///" + os.path.join(
+    tempfile.gettempdir(), "myng.sqlite3"
+)
+
+_engines: dict[str, tuple[Engine, int]] = {}
+_engines_lock = threading.Lock()
+
+
+def _sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+def _create(url: str) -> Engine:
+    if url.startswith("sqlite"):
+        engine = create_engine(
+            url,
+            pool_size=int(os.getenv("DATABASE_POOL_SIZE", "5")),
+            max_overflow=int(os.getenv("DATABASE_MAX_OVERFLOW", "10")),
+            connect_args={"timeout": 30, "check_same_thread": False},
+        )
+        event.listen(engine, "connect", _sqlite_pragmas)
+        return engine
+    return create_engine(
+        url,
+        pool_size=int(os.getenv("DATABASE_POOL_SIZE", "5")),
+        max_overflow=int(os.getenv("DATABASE_MAX_OVERFLOW", "10")),
+        pool_pre_ping=True,
+    )
+
+
+def get_engine(url: str | None = None) -> Engine:
+    """
+    The pooled engine for `url`, by default DATABASE_URL.
+    """
+    url = url or os.getenv("DATABASE_URL", DEFAULT_DATABASE_URL)
+    with _engines_lock:
+        engine, pid = _engines.get(url, (None, None))
+        if engine is None:
+            engine = _create(url)
+        elif pid != os.getpid():
+            # Leave the parent's connections alone, just forget them here.
+            engine.dispose(close=False)
+        _engines[url] = (engine, os.getpid())
+        return engine
@@ -0,0 +1,94 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+MISS = object()
+
+DEFAULT_CACHE_PATH = os.path.join(tempfile.gettempdir(), "myng_geocode.sqlite3")
+DEFAULT_TTL = 30 * 24 * 3600
+DEFAULT_NEGATIVE_TTL = 3600
+
+
+def normalize_query(city: str) -> str:
+    """
+    Normalize a free-text city query so trivially different spellings
+    ("Taipei", " taipei ", "TAIPEI") share one cache entry.
+    """
+    return " ".join(city.split()).casefold()
+
+
+class GeocodeCache:
+    """
+    SQLite-backed geocode cache shared by every worker on the host.
+
+    Successful lookups are kept for `ttl` seconds. Failed lookups are stored
+    as NULL coordinates for `negative_ttl` seconds so repeated bad input does
+    not reach the upstream geocoder.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        ttl: float = DEFAULT_TTL,
+        negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS geocode ("
+                        " query TEXT PRIMARY KEY,"
+                        " coordinates TEXT,"
+                        " expires_at REAL NOT NULL)"
+                    )
+                    self._initialized = True
+        return conn
+
+    def get(self, query: str):
+        """
+        Returns the cached coordinates, None for a cached failure, or MISS.
+        """
+        row = (
+            self._connect()
+            .execute(
+                "SELECT coordinates, expires_at FROM geocode WHERE query = ?",
+                (query,),
+            )
+            .fetchone()
+        )
+        if row is None or row[1] < time.time():
+            return MISS
+        return row[0]
+
+    def set(self, query: str, coordinates: str | None) -> None:
+        ttl = self.ttl if coordinates is not None else self.negative_ttl
+        self._connect().execute(
+            "INSERT OR REPLACE INTO geocode (query, coordinates, expires_at)"
+            " VALUES (?, ?, ?)",
+            (query, coordinates, time.time() + ttl),
+        )
+
+    def purge_expired(self) -> int:
+        cursor = self._connect().execute(
+            "DELETE FROM geocode WHERE expires_at < ?", (time.time(),)
+        )
+        return cursor.rowcount
+
+    def clear(self) -> None:
+        self._connect().execute("DELETE FROM geocode")
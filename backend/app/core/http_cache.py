@@ -0,0 +1,167 @@
+"""
+Conditional and negotiated responses for cached results.
+
+Results served from the caches carry an ETag, the hash of their JSON,
+computed once per cache entry like the JSON itself. A repeat request that
+sends it back in If-None-Match is answered with an empty 304 once the
+cache lookup finds the same entry, without serializing or sending the
+body again.
+
+The zodiac endpoints are POST only because their input is a JSON body;
+they do not change anything, so they answer 304 like a GET would rather
+than the 412 RFC 9110 prescribes for unsafe methods.
+
+Bodies are sent as MessagePack to clients that prefer it (Accept:
+application/msgpack), and compressed with brotli or gzip, as the client
+accepts, once they reach COMPRESSION_MIN_SIZE bytes. Each encoded body is
+kept on the cached object, so it is compressed once per cache entry.
+brotli and msgpack are optional; without them those codings are never
+chosen.
+"""
+
+import gzip
+import os
+from importlib.util import find_spec
+
+from fastapi import Request, Response
+
+from backend.app.core.serialization import ModelResponse, PreserializedModel
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+
+# In order of preference when the client accepts them equally.
+CODINGS = tuple(
+    coding
+    for coding, module in (("br", "brotli"), ("gzip", "gzip"))
+    if find_spec(module) is not None
+)
+MSGPACK_AVAILABLE = find_spec("msgpack") is not None
+
+
+def _compress(data: bytes, coding: str) -> bytes:
+    # Paid once per cache entry, so the strongest settings are affordable.
+    if coding == "br":
+        import brotli
+
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _qvalues(header: str | None) -> dict[str, float]:
+    """
+    The q-value of each item of an Accept or Accept-Encoding header.
+    """
+    values: dict[str, float] = {}
+    for item in (header or "").split(","):
+        name, *params = (part.strip() for part in item.split(";"))
+        if not name:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        values[name.lower()] = q
+    return values
+
+
+def negotiate_coding(accept_encoding: str | None) -> str | None:
+    """
+    The preferred content coding the client accepts, or None for identity.
+    """
+    accepted = _qvalues(accept_encoding)
+    best, best_q = None, 0.0
+    for coding in CODINGS:
+        q = accepted.get(coding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def negotiate_media_type(accept: str | None) -> str:
+    """
+    MessagePack if the client asks for it at least as much as for JSON.
+    """
+    if not MSGPACK_AVAILABLE or not accept:
+        return JSON
+    accepted = _qvalues(accept)
+    msgpack_q = max(
+        accepted.get(MSGPACK, 0.0), accepted.get("application/x-msgpack", 0.0)
+    )
+    json_q = accepted.get(JSON, accepted.get("application/*", accepted.get("*/*", 0.0)))
+    return MSGPACK if msgpack_q > 0 and msgpack_q >= json_q else JSON
+
+
+def _opaque(tag: str) -> str:
+    return tag.strip().removeprefix("W/").strip('"')
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Whether an If-None-Match header names `etag`, compared weakly. Each
+    representation (media type and coding) of a body has its own tag, so a
+    client only gets a 304 for the representation it holds.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(_opaque(tag) == _opaque(etag) for tag in if_none_match.split(","))
+
+
+def cache_control(max_age: int, stale: bool = False) -> str:
+    # A stale answer is being replaced; have the client ask again next time.
+    if stale or max_age <= 0:
+        return "private, no-cache"
+    return f"private, max-age={max_age}"
+
+
+def _body(model: PreserializedModel, media_type: str, coding: str | None) -> bytes:
+    bodies = model.encoded_bodies
+    body = bodies.get((media_type, coding))
+    if body is None:
+        raw = model.json_bytes if media_type == JSON else model.msgpack_bytes
+        body = bodies[(media_type, coding)] = _compress(raw, coding) if coding else raw
+    return body
+
+
+def conditional_response(
+    http: Request, model: PreserializedModel, max_age: int, stale: bool = False
+) -> Response:
+    """
+    The model in the representation the client prefers, or a 304 if the
+    client already has it.
+    """
+    media_type = negotiate_media_type(http.headers.get("accept"))
+    raw_size = len(model.json_bytes)
+    coding = (
+        negotiate_coding(http.headers.get("accept-encoding"))
+        if raw_size >= COMPRESSION_MIN_SIZE
+        else None
+    )
+    etag = model.etag
+    if media_type != JSON or coding:
+        suffix = "-".join(
+            part for part in ("msgpack" if media_type != JSON else "", coding) if part
+        )
+        etag = f'{etag[:-1]}-{suffix}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": cache_control(max_age, stale),
+        "Vary": "Accept, Accept-Encoding",
+    }
+    if etag_matches(http.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    if media_type == JSON and coding is None:
+        return ModelResponse(model, headers=headers)
+    if coding:
+        headers["Content-Encoding"] = coding
+    return Response(
+        _body(model, media_type, coding), media_type=media_type, headers=headers
+    )
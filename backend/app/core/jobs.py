@@ -0,0 +1,488 @@
+"""
+Persistent background job queue.
+
+Slow generations are submitted as jobs and answered with a job id instead
+of holding the HTTP request open; clients poll (or long-poll) for the
+result. Jobs live in a SQLAlchemy database, so any worker process can pick
+up or report on any job, and a job whose worker died is picked up again
+once its lease runs out.
+
+Submitting a job identical to one still pending or running returns the
+existing job instead of queueing a second generation.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Any, Callable
+
+from pydantic import BaseModel
+from sqlalchemy import (
+    Column,
+    Float,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    and_,
+    delete,
+    insert,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+
+from backend.app.core.metrics import Counter, registry, track
+from backend.app.core.quota import Priority, UpstreamBusyError, upstream_priority
+
+logger = logging.getLogger(__name__)
+
+
+class JobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+ACTIVE = (JobStatus.PENDING.value, JobStatus.RUNNING.value)
+
+metadata = MetaData()
+
+jobs_table = Table(
+    "jobs",
+    metadata,
+    Column("id", String(32), primary_key=True),
+    Column("kind", String(64), nullable=False),
+    Column("dedupe_key", String(64), nullable=False),
+    Column("payload", Text, nullable=False),
+    Column("status", String(16), nullable=False),
+    Column("result", Text),
+    Column("error", Text),
+    Column("error_status", Integer),
+    Column("attempts", Integer, nullable=False, default=0),
+    Column("run_after", Float, nullable=False),
+    Column("lease_until", Float),
+    Column("created_at", Float, nullable=False),
+    Column("updated_at", Float, nullable=False),
+    Index("ix_jobs_queue", "status", "run_after"),
+)
+# At most one active job per payload; lets concurrent submitters in
+# different processes converge on the same job.
+Index(
+    "ux_jobs_active",
+    jobs_table.c.dedupe_key,
+    unique=True,
+    sqlite_where=jobs_table.c.status.in_(ACTIVE),
+    postgresql_where=jobs_table.c.status.in_(ACTIVE),
+)
+
+job_events = registry.register(
+    Counter("myng_jobs_total", "Background job events by kind and outcome.")
+)
+
+
+class Job(BaseModel):
+    id: str
+    kind: str
+    status: JobStatus
+    result: Any = None
+    error: str | None = None
+    error_status: int | None = None
+    attempts: int = 0
+    created_at: datetime
+    updated_at: datetime
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JobStatus.DONE, JobStatus.FAILED)
+
+
+def _to_job(row) -> Job:
+    return Job(
+        id=row.id,
+        kind=row.kind,
+        status=row.status,
+        result=json.loads(row.result) if row.result is not None else None,
+        error=row.error,
+        error_status=row.error_status,
+        attempts=row.attempts,
+        created_at=datetime.fromtimestamp(row.created_at, timezone.utc),
+        updated_at=datetime.fromtimestamp(row.updated_at, timezone.utc),
+    )
+
+
+def dedupe_key(kind: str, payload: dict[str, Any]) -> str:
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{kind}:{canonical}".encode()).hexdigest()
+
+
+class JobStore:
+    """
+    Job rows in the database behind `engine`.
+    """
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        metadata.create_all(engine)
+
+    def _active(self, conn, key: str):
+        return conn.execute(
+            select(jobs_table).where(
+                jobs_table.c.dedupe_key == key, jobs_table.c.status.in_(ACTIVE)
+            )
+        ).first()
+
+    def submit(
+        self, kind: str, payload: dict[str, Any], run_after: float | None = None
+    ) -> tuple[Job, bool]:
+        """
+        Queue a job, to run no earlier than `run_after` (a Unix time), or find
+        the identical one already queued. Returns the job and whether it was
+        newly created.
+        """
+        key = dedupe_key(kind, payload)
+        now = time.time()
+        with self.engine.begin() as conn:
+            row = self._active(conn, key)
+            if row is not None:
+                return _to_job(row), False
+        try:
+            with self.engine.begin() as conn:
+                job_id = uuid.uuid4().hex
+                conn.execute(
+                    insert(jobs_table).values(
+                        id=job_id,
+                        kind=kind,
+                        dedupe_key=key,
+                        payload=json.dumps(payload),
+                        status=JobStatus.PENDING.value,
+                        attempts=0,
+                        run_after=run_after or now,
+                        created_at=now,
+                        updated_at=now,
+                    )
+                )
+                row = conn.execute(
+                    select(jobs_table).where(jobs_table.c.id == job_id)
+                ).one()
+                return _to_job(row), True
+        except IntegrityError:
+            # Another submitter won the race.
+            with self.engine.begin() as conn:
+                row = self._active(conn, key)
+            if row is None:
+                raise
+            return _to_job(row), False
+
+    def get(self, job_id: str) -> Job | None:
+        with self.engine.connect() as conn:
+            row = conn.execute(
+                select(jobs_table).where(jobs_table.c.id == job_id)
+            ).first()
+        return _to_job(row) if row is not None else None
+
+    def claim(self, kinds: list[str], lease: float) -> tuple[Job, dict] | None:
+        """
+        Take the oldest runnable job of one of `kinds`: a pending one that is
+        due, or a running one whose worker let its lease expire.
+        """
+        now = time.time()
+        runnable = and_(
+            jobs_table.c.kind.in_(kinds),
+            or_(
+                and_(
+                    jobs_table.c.status == JobStatus.PENDING.value,
+                    jobs_table.c.run_after <= now,
+                ),
+                and_(
+                    jobs_table.c.status == JobStatus.RUNNING.value,
+                    jobs_table.c.lease_until < now,
+                ),
+            ),
+        )
+        with self.engine.begin() as conn:
+            candidates = conn.execute(
+                select(jobs_table.c.id)
+                .where(runnable)
+                .order_by(jobs_table.c.run_after)
+                .limit(8)
+            ).all()
+            for (job_id,) in candidates:
+                # Optimistic claim: only one worker's update matches.
+                claimed = conn.execute(
+                    update(jobs_table)
+                    .where(jobs_table.c.id == job_id, runnable)
+                    .values(
+                        status=JobStatus.RUNNING.value,
+                        lease_until=now + lease,
+                        attempts=jobs_table.c.attempts + 1,
+                        updated_at=now,
+                    )
+                ).rowcount
+                if claimed:
+                    row = conn.execute(
+                        select(jobs_table).where(jobs_table.c.id == job_id)
+                    ).one()
+                    return _to_job(row), json.loads(row.payload)
+        return None
+
+    def extend(self, job_id: str, lease: float) -> bool:
+        """
+        Renew the lease of a running job for another `lease` seconds.
+        """
+        now = time.time()
+        with self.engine.begin() as conn:
+            return bool(
+                conn.execute(
+                    update(jobs_table)
+                    .where(
+                        jobs_table.c.id == job_id,
+                        jobs_table.c.status == JobStatus.RUNNING.value,
+                    )
+                    .values(lease_until=now + lease, updated_at=now)
+                ).rowcount
+            )
+
+    def _finish(self, job_id: str, **values) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(
+                update(jobs_table)
+                .where(jobs_table.c.id == job_id)
+                .values(lease_until=None, updated_at=time.time(), **values)
+            )
+
+    def complete(self, job_id: str, result: str) -> None:
+        self._finish(job_id, status=JobStatus.DONE.value, result=result, error=None)
+
+    def fail(self, job_id: str, error: str, error_status: int) -> None:
+        self._finish(
+            job_id,
+            status=JobStatus.FAILED.value,
+            error=error,
+            error_status=error_status,
+        )
+
+    def retry(self, job_id: str, delay: float, error: str) -> None:
+        self._finish(
+            job_id,
+            status=JobStatus.PENDING.value,
+            run_after=time.time() + delay,
+            error=error,
+        )
+
+    def purge(self, older_than: float) -> int:
+        """
+        Delete finished jobs last updated more than `older_than` seconds ago.
+        """
+        with self.engine.begin() as conn:
+            return conn.execute(
+                delete(jobs_table).where(
+                    jobs_table.c.status.notin_(ACTIVE),
+                    jobs_table.c.updated_at < time.time() - older_than,
+                )
+            ).rowcount
+
+
+JobHandler = Callable[[dict[str, Any]], Any]
+
+
+def _encode(result: Any) -> str:
+    if isinstance(result, BaseModel):
+        return result.model_dump_json()
+    return json.dumps(result)
+
+
+class JobQueue:
+    """
+    Runs jobs from `store` on `workers` threads per process.
+
+    Handlers are registered per job kind and receive the submitted payload.
+    Jobs run at the upstream priority registered for their kind. Interactive
+    jobs, which someone is waiting on, may queue up to `upstream_timeout`
+    seconds for the upstream. The lease of a running job is renewed every
+    third of `lease` seconds, so only a job whose worker died is picked up
+    again, however long the job waits for its upstream.
+    A job rejected by a busy upstream is retried after the suggested delay,
+    up to `max_attempts` times; other errors fail it with the HTTP status
+    `error_status` assigns.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        workers: int = 4,
+        poll_interval: float = 1.0,
+        lease: float = 300.0,
+        max_attempts: int = 3,
+        upstream_timeout: float = 60.0,
+        retention: float = 86400.0,
+        error_status: Callable[[BaseException], int] = lambda error: 500,
+    ):
+        self.store = store
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.upstream_timeout = upstream_timeout
+        self.retention = retention
+        self.error_status = error_status
+        self.handlers: dict[str, JobHandler] = {}
+        self.priorities: dict[str, Priority] = {}
+        self._threads: list[threading.Thread] = []
+        self._pid: int | None = None
+        self._lock = threading.Lock()
+        self._wake = threading.Condition()
+        self._stop = threading.Event()
+        self._purged_at = 0.0
+
+    def register(
+        self,
+        kind: str,
+        handler: JobHandler,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> None:
+        self.handlers[kind] = handler
+        self.priorities[kind] = priority
+
+    def submit(
+        self, kind: str, payload: dict[str, Any], run_after: float | None = None
+    ) -> Job:
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job, created = self.store.submit(kind, payload, run_after)
+        job_events.inc(kind=kind, result="submitted" if created else "deduplicated")
+        if created:
+            self.start()
+            with self._wake:
+                self._wake.notify()
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        return self.store.get(job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Job | None:
+        """
+        The job once it has finished, or as it is after `timeout` seconds.
+        """
+        deadline = time.monotonic() + timeout
+        interval = 0.05
+        while True:
+            job = await asyncio.to_thread(self.store.get, job_id)
+            remaining = deadline - time.monotonic()
+            if job is None or job.finished or remaining <= 0:
+                return job
+            await asyncio.sleep(min(interval, remaining))
+            interval = min(interval * 2, self.poll_interval)
+
+    def start(self) -> None:
+        """
+        Start this process's workers, again after a fork.
+        """
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._stop.clear()
+            self._threads = [
+                threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+            self._pid = os.getpid()
+
+    warmup = start
+
+    def stop(self) -> None:
+        self._stop.set()
+        with self._wake:
+            self._wake.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._pid = None
+
+    def _work(self) -> None:
+        while not self._stop.is_set():
+            try:
+                claimed = self.store.claim(list(self.handlers), self.lease)
+            except Exception as e:
+                logger.warning("Job claim failed", extra={"error": str(e)})
+                claimed = None
+            if claimed is None:
+                self._maybe_purge()
+                with self._wake:
+                    self._wake.wait(self.poll_interval)
+                continue
+            self.run(*claimed)
+
+    @contextmanager
+    def _leased(self, job: Job):
+        done = threading.Event()
+
+        def renew():
+            while not done.wait(self.lease / 3):
+                try:
+                    self.store.extend(job.id, self.lease)
+                except Exception as e:
+                    logger.warning(
+                        "Job lease renewal failed",
+                        extra={"job_id": job.id, "error": str(e)},
+                    )
+
+        thread = threading.Thread(target=renew, name="job-lease", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            done.set()
+            thread.join()
+
+    def run(self, job: Job, payload: dict[str, Any]) -> None:
+        labels = {"kind": job.kind}
+        priority = self.priorities[job.kind]
+        # Background jobs wait as long as the scheduler allows them to.
+        timeout = self.upstream_timeout if priority is Priority.INTERACTIVE else None
+        try:
+            with track(f"job.{job.kind}", job_id=job.id), upstream_priority(
+                priority, timeout=timeout
+            ), self._leased(job):
+                result = self.handlers[job.kind](payload)
+            self.store.complete(job.id, _encode(result))
+            job_events.inc(result="done", **labels)
+        except UpstreamBusyError as e:
+            if job.attempts < self.max_attempts:
+                self.store.retry(job.id, e.retry_after, str(e))
+                job_events.inc(result="retried", **labels)
+            else:
+                self.store.fail(job.id, str(e), 503)
+                job_events.inc(result="failed", **labels)
+        except Exception as e:
+            logger.exception(
+                "Job failed", extra={"job_id": job.id, "job_kind": job.kind}
+            )
+            self.store.fail(job.id, str(e), self.error_status(e))
+            job_events.inc(result="failed", **labels)
+
+    def _maybe_purge(self) -> None:
+        now = time.monotonic()
+        if now - self._purged_at < 60:
+            return
+        self._purged_at = now
+        try:
+            self.store.purge(self.retention)
+        except Exception as e:
+            logger.warning("Job purge failed", extra={"error": str(e)})
@@ -1,40 +1,175 @@
-from geopy.geocoders import Nominatim
+import asyncio
+import os
+import threading
+from functools import lru_cache
 from typing import Optional
-from functools import cache
-from timezonefinder import TimezoneFinder
 
-geolocator = Nominatim(user_agent="myng_app")
-tf = TimezoneFinder(in_memory=True)
+from backend.app.core.canonical import Coordinates
+from backend.app.core.geocode_cache import (
+    DEFAULT_CACHE_PATH,
+    DEFAULT_NEGATIVE_TTL,
+    DEFAULT_TTL,
+    MISS,
+    GeocodeCache,
+    normalize_query,
+)
+from backend.app.core.metrics import cache_requests, track, track_functools_cache
+from backend.app.core.rate_limit import TokenBucket
+from backend.app.core.startup import Lazy
+
+
+def _build_geolocator():
+    from geopy.geocoders import Nominatim
+
+    return Nominatim(user_agent="myng_app")
+
+
+def _build_timezone_finder():
+    from timezonefinder import TimezoneFinder
+
+    # in_memory=False memory-maps the polygon file instead, letting every
+    # worker share the OS page cache rather than holding a private copy.
+    in_memory = os.getenv("TIMEZONEFINDER_IN_MEMORY", "true").lower() != "false"
+    return TimezoneFinder(in_memory=in_memory)
+
+
+geolocator = Lazy("nominatim", _build_geolocator, imports=("geopy.geocoders",))
+tf = Lazy("timezonefinder", _build_timezone_finder, imports=("timezonefinder",))
+
+# Nominatim's usage policy allows at most one request per second.
+geocode_limiter = TokenBucket(
+    rate=float(os.getenv("GEOCODE_RATE_LIMIT", "1.0")),
+    capacity=float(os.getenv("GEOCODE_RATE_BURST", "1.0")),
+)
+GEOCODE_RATE_TIMEOUT = float(os.getenv("GEOCODE_RATE_TIMEOUT", "5.0"))
+
+# Timezone lookups are cached per grid cell; 3 decimals is roughly 100m.
+TIMEZONE_GRID_PRECISION = int(os.getenv("TIMEZONE_GRID_PRECISION", "3"))
+
+geocode_cache = GeocodeCache(
+    path=os.getenv("GEOCODE_CACHE_PATH", DEFAULT_CACHE_PATH),
+    ttl=float(os.getenv("GEOCODE_CACHE_TTL", DEFAULT_TTL)),
+    negative_ttl=float(os.getenv("GEOCODE_NEGATIVE_TTL", DEFAULT_NEGATIVE_TTL)),
+)
+
+_inflight: dict[str, threading.Lock] = {}
+_inflight_lock = threading.Lock()
 
 
 class GeopyError(Exception):
     pass
 
 
-@cache
+class GeocodeRateLimitError(Exception):
+    pass
+
+
+def _cached_coordinates(city: str, key: str, count: bool = True):
+    """
+    The cached coordinates, MISS, or GeopyError for a cached failure. Only
+    the first look at the cache for a lookup is counted, not the re-check
+    made after waiting for another thread's request.
+    """
+    cached = geocode_cache.get(key)
+    if count:
+        if cached is MISS:
+            result = "miss"
+        elif cached is None:
+            result = "negative_hit"
+        else:
+            result = "hit"
+        cache_requests.inc(cache="geocode", result=result)
+    if cached is None:
+        raise GeopyError("Location not found for city: " + city)
+    return cached
+
+
 def get_coordinates(city: str) -> Optional[str]:
     """
     Get the latitude and longitude for a given city name.
 
+    Results, including failed lookups, are served from the persistent geocode
+    cache when possible. Concurrent misses for the same city in this process
+    share a single upstream request.
+
     Args:
         city: The name of the city.
 
     Returns:
         A string "latitude,longitude" if found, else None.
     """
-    location = geolocator.geocode(city)
+    key = normalize_query(city)
+    cached = _cached_coordinates(city, key)
+    if cached is not MISS:
+        return cached
+    return _geocode(city, key)
 
-    if location:
-        return f"{location.latitude},{location.longitude}"
-    else:
-        raise GeopyError("Location not found for city: " + city)
+
+def _geocode(city: str, key: str) -> Optional[str]:
+    """
+    Resolve a city that missed the cache.
+    """
+    with _inflight_lock:
+        lock = _inflight.setdefault(key, threading.Lock())
+
+    with lock:
+        try:
+            cached = _cached_coordinates(city, key, count=False)
+            if cached is not MISS:
+                return cached
+
+            if not geocode_limiter.acquire(timeout=GEOCODE_RATE_TIMEOUT):
+                raise GeocodeRateLimitError(
+                    "Geocoding rate limit exceeded, try again later"
+                )
+            with track("geocode"):
+                location = geolocator.get().geocode(city)
+
+            if location:
+                coordinates = f"{location.latitude},{location.longitude}"
+                geocode_cache.set(key, coordinates)
+                return coordinates
+            geocode_cache.set(key, None)
+            raise GeopyError("Location not found for city: " + city)
+        finally:
+            with _inflight_lock:
+                if _inflight.get(key) is lock:
+                    del _inflight[key]
+
+
+async def get_coordinates_async(city: str) -> Optional[str]:
+    """
+    Async adapter for `get_coordinates`.
+
+    Cache hits are answered inline; misses run the blocking geocoder in a
+    worker thread so the event loop is never stalled by Nominatim.
+    """
+    key = normalize_query(city)
+    cached = _cached_coordinates(city, key)
+    if cached is not MISS:
+        return cached
+    return await asyncio.to_thread(_geocode, city, key)
+
+
+@lru_cache(maxsize=65536)
+def _timezone_for_cell(cell: Coordinates) -> Optional[str]:
+    with track("timezone"):
+        return tf.get().timezone_at(lat=cell.latitude, lng=cell.longitude)
+
+
+track_functools_cache("timezone", _timezone_for_cell)
 
 
 def get_timezone(latitude: float, longitude: float) -> Optional[str]:
     """
     Get the timezone string for a given latitude and longitude.
+
+    Coordinates are snapped to a grid of TIMEZONE_GRID_PRECISION decimals and
+    the polygon lookup is cached per cell, so nearby points share one lookup.
     """
-    return tf.timezone_at(lat=latitude, lng=longitude)
+    return _timezone_for_cell(
+        Coordinates.quantize(latitude, longitude, TIMEZONE_GRID_PRECISION)
+    )
 
 
 if __name__ == "__main__":
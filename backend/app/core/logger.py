@@ -1,42 +1,254 @@
+import atexit
 import json
 import logging
+import logging.handlers
+import os
+import queue
+import random
 import sys
 from datetime import datetime
 from typing import Any
 
+from backend.app.core.metrics import Counter, registry
+from backend.app.core.tracing import current_context
+
+# Attributes every LogRecord carries; anything else on a record came from `extra`.
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
 
 class JSONFormatter(logging.Formatter):
     """
     Formatter to output logs in JSON format.
+
+    Fields passed through `extra` become top-level keys. Legacy dict messages
+    ({"title": ..., ...}) are unpacked the same way. String values longer than
+    `max_field_length`, also inside dicts and lists, are truncated.
     """
 
+    def __init__(self, max_field_length: int | None = None):
+        super().__init__()
+        self.max_field_length = max_field_length
+
+    def _truncate(self, value: Any) -> Any:
+        limit = self.max_field_length
+        if not limit:
+            return value
+        if isinstance(value, str) and len(value) > limit:
+            return f"{value[:limit]}... [{len(value) - limit} chars truncated]"
+        if isinstance(value, dict):
+            return {key: self._truncate(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self._truncate(item) for item in value]
+        return value
+
     def format(self, record: logging.LogRecord) -> str:
+        if isinstance(record.msg, dict):
+            fields = dict(record.msg)
+            message = str(fields.pop("title", ""))
+        else:
+            fields = {}
+            message = record.getMessage()
+
         log_record: dict[str, Any] = {
             "timestamp": datetime.fromtimestamp(record.created).isoformat(),
             "level": record.levelname,
-            "message": record.getMessage(),
+            "message": self._truncate(message),
             "module": record.module,
             "funcName": record.funcName,
             "lineNo": record.lineno,
         }
 
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                fields[key] = value
+        for key, value in fields.items():
+            log_record.setdefault(key, self._truncate(value))
+
         if record.exc_info:
             log_record["exception"] = self.formatException(record.exc_info)
 
-        return json.dumps(log_record)
+        return json.dumps(log_record, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a fraction of the records below WARNING for selected loggers.
+
+    `rates` maps a logger name prefix to the fraction of records to keep; the
+    longest matching prefix wins. Warnings and errors are never sampled out.
+    """
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._cache: dict[str, float] = {}
+
+    def _rate_for(self, name: str) -> float:
+        rate = self._cache.get(name)
+        if rate is None:
+            rate = 1.0
+            best = -1
+            for prefix, prefix_rate in self.rates.items():
+                if (name == prefix or name.startswith(prefix + ".")) and len(
+                    prefix
+                ) > best:
+                    rate, best = prefix_rate, len(prefix)
+            self._cache[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate_for(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class TraceContextFilter(logging.Filter):
+    """
+    Stamp records with the request id, trace id and span id of the calling
+    context. Runs on the calling thread, before the record is queued.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for key, value in current_context().items():
+            setattr(record, key, value)
+        return True
+
+
+dropped_records = registry.register(
+    Counter(
+        "myng_log_records_dropped_total",
+        "Log records dropped because the logging queue was full.",
+    )
+)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread.
+
+    Only %-style arguments are merged on the calling thread, since they may be
+    mutated after the call returns. When the queue is full the record is
+    dropped and counted in myng_log_records_dropped_total instead of
+    blocking the request.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            dropped_records.inc()
+
+
+def parse_sample_rates(spec: str) -> dict[str, float]:
+    """
+    Parse "logger.name=0.1,other.logger=0.5" into a rate mapping.
+    """
+    rates = {}
+    for item in spec.split(","):
+        name, sep, rate = item.partition("=")
+        if sep and name.strip():
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+def _restart_listener_after_fork() -> None:
+    # The listener thread does not survive fork(), and its queue lock may have
+    # been held at the time; give the child a fresh queue and listener.
+    global _listener
+    if _listener is None:
+        return
+    fresh_queue = queue.Queue(maxsize=_listener.queue.maxsize)
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, NonBlockingQueueHandler):
+            handler.queue = fresh_queue
+    _listener = logging.handlers.QueueListener(
+        fresh_queue,
+        *_listener.handlers,
+        respect_handler_level=_listener.respect_handler_level,
+    )
+    _listener.start()
+
 
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_listener_after_fork)
 
-def setup_logging(level: str = "INFO") -> None:
+
+def _stop_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(_stop_listener)
+
+
+def shutdown_logging() -> None:
+    """
+    Write out the queued records and flush the handlers, for processes that
+    end with os._exit() and so skip atexit.
+    """
+    _stop_listener()
+    logging.shutdown()
+
+
+def setup_logging(
+    level: str = "INFO",
+    async_mode: bool | None = None,
+    sample_rates: dict[str, float] | None = None,
+    max_field_length: int | None = None,
+) -> None:
     """
     Setup the root logger to output JSON to stdout.
+
+    With `async_mode` (LOG_ASYNC, on by default) records are put on a bounded
+    queue and formatted and written by a background thread. `sample_rates`
+    (LOG_SAMPLING, e.g. "uvicorn.access=0.1") thins out chatty loggers and
+    `max_field_length` (LOG_MAX_FIELD_LENGTH) caps long string fields.
     """
+    if async_mode is None:
+        async_mode = os.getenv("LOG_ASYNC", "true").lower() != "false"
+    if sample_rates is None:
+        sample_rates = parse_sample_rates(os.getenv("LOG_SAMPLING", ""))
+    if max_field_length is None:
+        max_field_length = int(os.getenv("LOG_MAX_FIELD_LENGTH", "2000"))
+
     root_logger = logging.getLogger()
     root_logger.setLevel(level)
 
     # Remove existing handlers to avoid duplication
+    _stop_listener()
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
 
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setFormatter(JSONFormatter())
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JSONFormatter(max_field_length=max_field_length))
+
+    if async_mode:
+        global _listener
+        log_queue = queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", "10000")))
+        handler = NonBlockingQueueHandler(log_queue)
+        _listener = logging.handlers.QueueListener(log_queue, stream_handler)
+        _listener.start()
+    else:
+        handler = stream_handler
+
+    if sample_rates:
+        handler.addFilter(SamplingFilter(sample_rates))
+    handler.addFilter(TraceContextFilter())
     root_logger.addHandler(handler)
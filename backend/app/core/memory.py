@@ -0,0 +1,42 @@
+import os
+import resource
+import sys
+from typing import Any
+
+# Fields of /proc/<pid>/smaps_rollup worth reporting, all in kB.
+_SMAPS_FIELDS = {
+    "Rss": "rss_kb",
+    "Pss": "pss_kb",
+    "Shared_Clean": "shared_clean_kb",
+    "Shared_Dirty": "shared_dirty_kb",
+    "Private_Clean": "private_clean_kb",
+    "Private_Dirty": "private_dirty_kb",
+}
+
+
+def memory_report(pid: int | None = None) -> dict[str, Any]:
+    """
+    Memory usage of a process, split into shared and private pages.
+
+    On Linux this reads /proc/<pid>/smaps_rollup, where Pss (proportional set
+    size) is the number to sum across workers: pages shared copy-on-write with
+    the parent are divided between every process mapping them. Elsewhere only
+    the current process' peak RSS is available.
+    """
+    pid = pid or os.getpid()
+    report: dict[str, Any] = {"pid": pid}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in _SMAPS_FIELDS:
+                    report[_SMAPS_FIELDS[key]] = int(value.split()[0])
+        return report
+    except OSError:
+        pass
+
+    if pid == os.getpid():
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and kB elsewhere
+        report["max_rss_kb"] = max_rss // 1024 if sys.platform == "darwin" else max_rss
+    return report
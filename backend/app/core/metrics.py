@@ -0,0 +1,254 @@
+"""
+Minimal in-process metrics with Prometheus text exposition.
+
+Metrics are per process; with several workers each one exposes its own
+values and the scraper aggregates them.
+"""
+
+import bisect
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterable
+
+from backend.app.core.tracing import span
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+def _label_key(labels: dict[str, str]) -> tuple[tuple[str, str], ...]:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: tuple[tuple[str, str], ...], extra: str = "") -> str:
+    parts = [f'{k}="{_escape(v)}"' for k, v in key]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._values: dict[tuple, float] = {}
+        self._callbacks: list[Callable[[], Iterable[tuple[dict, float]]]] = []
+        self._lock = threading.Lock()
+
+    def add_callback(self, callback: Callable[[], Iterable[tuple[dict, float]]]):
+        """
+        Add (labels, value) samples read at scrape time, for values that are
+        cheaper to read on demand than to count on the hot path.
+        """
+        self._callbacks.append(callback)
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0.0)
+
+    def collect(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            items = list(self._values.items())
+        for callback in self._callbacks:
+            items.extend((_label_key(labels), value) for labels, value in callback())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(key)} {_format_value(value)}"
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [bucket counts..., sum, count]
+        self._values: dict[tuple, list[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, **labels) -> int:
+        series = self._values.get(_label_key(labels))
+        return series[-1] if series else 0
+
+    def collect(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            items = [(key, list(series)) for key, series in self._values.items()]
+        for key, series in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, series):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(key, le)} {cumulative}"
+            inf = 'le="+Inf"'
+            yield f"{self.name}_bucket{_format_labels(key, inf)} {series[-1]}"
+            yield f"{self.name}_sum{_format_labels(key)} {_format_value(series[-2])}"
+            yield f"{self.name}_count{_format_labels(key)} {series[-1]}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+stage_duration = registry.register(
+    Histogram("myng_stage_duration_seconds", "Latency of instrumented stages.")
+)
+stage_errors = registry.register(
+    Counter("myng_stage_errors_total", "Exceptions raised by instrumented stages.")
+)
+retries = registry.register(
+    Counter("myng_retries_total", "Retried attempts per stage.")
+)
+cache_requests = registry.register(
+    Counter("myng_cache_requests_total", "Cache lookups by cache and result.")
+)
+llm_tokens = registry.register(
+    Counter("myng_llm_tokens_total", "LLM token usage by model and kind.")
+)
+llm_prompt_cache = registry.register(
+    Counter(
+        "myng_llm_prompt_cache_tokens_total",
+        "LLM prompt tokens by endpoint, model and provider prefix cache result.",
+    )
+)
+
+
+@contextmanager
+def track(stage: str, **attributes):
+    """
+    Time a block as `stage` and count the exception type if it raises.
+
+    The block is also recorded as a span of the current trace, if any.
+    """
+    start = time.perf_counter()
+    with span(stage, **attributes):
+        try:
+            yield
+        except BaseException as e:
+            stage_errors.inc(stage=stage, error=type(e).__name__)
+            raise
+        finally:
+            stage_duration.observe(time.perf_counter() - start, stage=stage)
+
+
+def timed(stage: str):
+    """
+    Decorator form of `track`.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with track(stage):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _cached_tokens(usage) -> int | None:
+    # OpenAI reports prompt_tokens_details.cached_tokens; some compatible
+    # backends report prompt_cache_hit_tokens instead.
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None)
+    if cached is None:
+        cached = getattr(usage, "prompt_cache_hit_tokens", None)
+    return cached
+
+
+def record_llm_usage(response, model: str | None, endpoint: str | None = None) -> None:
+    """
+    Count the tokens of a completion, and for backends that report them,
+    how many prompt tokens came from the provider's prefix cache.
+    """
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    model = model or "default"
+    for kind in ("prompt_tokens", "completion_tokens"):
+        value = getattr(usage, kind, None)
+        if value:
+            llm_tokens.inc(value, model=model, kind=kind.removesuffix("_tokens"))
+
+    cached = _cached_tokens(usage)
+    prompt = getattr(usage, "prompt_tokens", None)
+    if cached is None or not prompt:
+        return
+    labels = {"endpoint": endpoint or "default", "model": model}
+    llm_prompt_cache.inc(cached, result="hit", **labels)
+    llm_prompt_cache.inc(prompt - cached, result="miss", **labels)
+
+
+def track_functools_cache(cache: str, func) -> None:
+    """
+    Report hits and misses of a functools.cache/lru_cache wrapped function
+    under myng_cache_requests_total.
+    """
+
+    def samples():
+        info = func.cache_info()
+        yield {"cache": cache, "result": "hit"}, info.hits
+        yield {"cache": cache, "result": "miss"}, info.misses
+
+    cache_requests.add_callback(samples)
@@ -0,0 +1,186 @@
+"""
+Opt-in request profiling.
+
+A request is profiled when it is picked by PROFILE_SAMPLE_RATE, or when it
+carries an `X-Profile` header equal to PROFILE_TOKEN. Two modes are
+available (PROFILE_MODE):
+
+- "sampling" (default): a background thread samples the stacks of every
+  thread every PROFILE_INTERVAL seconds and writes them in the folded
+  format read by flamegraph.pl, speedscope and inferno.
+- "cprofile": deterministic cProfile of the event loop thread, written as
+  a pstats file for snakeviz or flameprof. Work handed to threads (sync
+  routes, `asyncio.to_thread`, the engine and batch pools) is not seen, so
+  this mode only suits handlers that do their work on the loop.
+
+Profiles are written to PROFILE_DIR, named after the route and request id.
+Only one request per process is profiled at a time.
+"""
+
+import asyncio
+import cProfile
+import hmac
+import logging
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from backend.app.core.tracing import get_request_id
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile"
+
+
+class SamplingProfiler:
+    """
+    Wall-clock stack sampler producing folded stacks ("a;b;c count").
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _sample(self) -> None:
+        own_id = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(
+                        f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+                    )
+                    frame = frame.f_back
+                thread_name = names.get(thread_id, str(thread_id))
+                self.samples[";".join([thread_name, *reversed(stack)])] += 1
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._sample, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def dump(self, path: str) -> None:
+        with open(path, "w") as f:
+            for stack, count in self.samples.items():
+                f.write(f"{stack} {count}\n")
+
+
+class DeterministicProfiler:
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def start(self) -> None:
+        self.profile.enable()
+
+    def stop(self) -> None:
+        self.profile.disable()
+
+    def dump(self, path: str) -> None:
+        self.profile.dump_stats(path)
+
+
+def _slug(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", value).strip("_") or "root"
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles sampled requests and writes one profile
+    file per request. Must sit inside TracingMiddleware so the request id is
+    known.
+    """
+
+    def __init__(
+        self,
+        app,
+        sample_rate: float | None = None,
+        token: str | None = None,
+        mode: str | None = None,
+        directory: str | None = None,
+        interval: float | None = None,
+    ):
+        self.app = app
+        self.sample_rate = (
+            sample_rate
+            if sample_rate is not None
+            else float(os.getenv("PROFILE_SAMPLE_RATE", "0.0"))
+        )
+        self.token = token if token is not None else os.getenv("PROFILE_TOKEN")
+        self.mode = mode or os.getenv("PROFILE_MODE", "sampling")
+        self.directory = directory or os.getenv(
+            "PROFILE_DIR", os.path.join(tempfile.gettempdir(), "myng-profiles")
+        )
+        self.interval = interval or float(os.getenv("PROFILE_INTERVAL", "0.005"))
+        self._busy = threading.Lock()
+
+    def _requested(self, scope) -> bool:
+        if self.sample_rate and random.random() < self.sample_rate:
+            return True
+        if not self.token:
+            return False
+        # Compared as bytes: header values need not be UTF-8.
+        name = PROFILE_HEADER.lower().encode()
+        for key, value in scope["headers"]:
+            if key.lower() == name:
+                return hmac.compare_digest(value, self.token.encode())
+        return False
+
+    def _profiler(self):
+        if self.mode == "cprofile":
+            return DeterministicProfiler(), "prof"
+        return SamplingProfiler(self.interval), "folded"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._requested(scope):
+            return await self.app(scope, receive, send)
+        if not self._busy.acquire(blocking=False):
+            return await self.app(scope, receive, send)
+
+        profiler, extension = self._profiler()
+        start = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.stop()
+            self._busy.release()
+            duration = time.perf_counter() - start
+            route = getattr(scope.get("route"), "path", scope["path"])
+            request_id = get_request_id() or "unknown"
+            name = (
+                f"{time.strftime('%Y%m%dT%H%M%S')}_{scope['method']}_{_slug(route)}"
+                f"_{_slug(request_id)}.{extension}"
+            )
+            path = os.path.join(self.directory, name)
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                await asyncio.to_thread(profiler.dump, path)
+                logger.info(
+                    "Request profile written",
+                    extra={
+                        "path": path,
+                        "route": route,
+                        "duration_ms": round(duration * 1000, 2),
+                    },
+                )
+            except OSError as e:
+                logger.warning(
+                    "Failed to write request profile", extra={"error": str(e)}
+                )
@@ -1,8 +1,14 @@
 import os
+import threading
 from typing import Any, Dict
-from prokerala_api import ApiClient
 import pprint
 
+from backend.app.core.circuit_breaker import breaker_from_env
+from backend.app.core.metrics import timed, track
+from backend.app.core.quota import scheduler_from_env
+from backend.app.core.startup import Lazy
+from backend.app.core.token_cache import DEFAULT_TOKEN_CACHE_PATH, TokenCache
+
 
 class ProkeralaClient:
     planet_id_map = {
@@ -22,16 +28,69 @@ class ProkeralaClient:
     }
 
     def __init__(self):
-        client_id = os.getenv("PROKERALA_CLIENT_ID")
-        client_secret = os.getenv("PROKERALA_SECRET")
+        self._client = None
+        self._client_lock = threading.Lock()
+        self.scheduler = scheduler_from_env("prokerala", "PROKERALA")
+        self.breaker = breaker_from_env("prokerala", "PROKERALA")
+
+    @property
+    def client(self):
+        """
+        The underlying `prokerala_api.ApiClient`, built on first use so that
+        constructing a ProkeralaClient never requires credentials.
+        """
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from backend.app.core.prokerala_auth import (
+                        SharedTokenApiClient,
+                    )
+
+                    client_id = os.getenv("PROKERALA_CLIENT_ID")
+                    client_secret = os.getenv("PROKERALA_SECRET")
+
+                    if not client_id or not client_secret:
+                        raise ValueError(
+                            "PROKERALA_CLIENT_ID and PROKERALA_CLIENT_SECRET must be set in environment variables."
+                        )
 
-        if not client_id or not client_secret:
-            raise ValueError(
-                "PROKERALA_CLIENT_ID and PROKERALA_CLIENT_SECRET must be set in environment variables."
-            )
+                    self._client = SharedTokenApiClient(
+                        client_id,
+                        client_secret,
+                        token_cache=TokenCache(
+                            os.getenv(
+                                "PROKERALA_TOKEN_CACHE", DEFAULT_TOKEN_CACHE_PATH
+                            ),
+                            refresh_margin=float(
+                                os.getenv("PROKERALA_TOKEN_REFRESH_MARGIN", "300")
+                            ),
+                        ),
+                        base_url=os.getenv("PROKERALA_BASE_URL"),
+                        timeout=float(os.getenv("PROKERALA_TIMEOUT", "10")),
+                    )
+        return self._client
 
-        self.client = ApiClient(client_id, client_secret)
+    def warmup(self) -> None:
+        """
+        Validate credentials and obtain an access token ahead of the first
+        request.
+        """
+        self.client.warmup()
+
+    def _get(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Call `endpoint` once the scheduler admits it. Raises
+        UpstreamBusyError when the caller's deadline cannot be met or the
+        circuit breaker is open.
+        """
+        # Fail fast before spending a rate limit token on a broken upstream.
+        self.breaker.check()
+        with track("prokerala.schedule"):
+            self.scheduler.admit()
+        with self.breaker.call():
+            return self.client.get(endpoint, params)
 
+    @timed("prokerala.natal_planet_position")
     def get_natal_planet_position(
         self,
         datetime: str,
@@ -70,8 +129,9 @@ class ProkeralaClient:
                 "birth_time_unknown": birth_time_unknown,
             },
         }
-        return self.client.get("/v2/astrology/natal-planet-position", params)
+        return self._get("/v2/astrology/natal-planet-position", params)
 
+    @timed("prokerala.composite_planet_aspect")
     def get_composite_planet_aspect(
         self,
         primary_profile: Dict[str, Any],
@@ -108,8 +168,9 @@ class ProkeralaClient:
             "birth_time_rectification": birth_time_rectification,
             "la": la,
         }
-        return self.client.get("/v2/astrology/composite-planet-aspect", params)
+        return self._get("/v2/astrology/composite-planet-aspect", params)
 
+    @timed("prokerala.transit_planet_position")
     def get_transit_planet_position(
         self,
         birth_datetime: str,
@@ -151,11 +212,11 @@ class ProkeralaClient:
                 "birth_time_unknown": birth_time_unknown,
             },
         }
-        return self.client.get("/v2/astrology/transit-planet-position", params)
+        return self._get("/v2/astrology/transit-planet-position", params)
 
 
-_client = ProkeralaClient()
-get_client = lambda: _client
+_client = Lazy("prokerala", ProkeralaClient, imports=("prokerala_api",))
+get_client = _client.get
 
 if __name__ == "__main__":
     client = get_client()
@@ -0,0 +1,82 @@
+import hashlib
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+from prokerala_api import ApiClient
+
+from backend.app.core.token_cache import TokenCache, TokenRefresher
+
+
+class SharedTokenApiClient(ApiClient):
+    """
+    `prokerala_api.ApiClient` taking its access token from a TokenCache
+    shared by all workers instead of the per-process ./token.json, with a
+    background refresher renewing it before expiry. Every request, not only
+    the token fetch, gives up after `timeout` seconds, so a hung upstream
+    fails the call instead of holding its thread.
+    """
+
+    def __init__(
+        self,
+        client_id: str,
+        client_secret: str,
+        token_cache: TokenCache,
+        base_url: str | None = None,
+        timeout: float = 10.0,
+    ):
+        super().__init__(client_id, client_secret)
+        if base_url:
+            self.BASE_URL = base_url
+        self.timeout = timeout
+        self.token_cache = token_cache
+        self.cache_key = hashlib.sha1(
+            f"{self.BASE_URL}|{client_id}".encode()
+        ).hexdigest()
+        self.refresher = TokenRefresher(token_cache, self.cache_key, self.request_token)
+
+    def request_token(self) -> tuple[str, float]:
+        data = urlencode(
+            {
+                "grant_type": "client_credentials",
+                "client_id": self.clientId,
+                "client_secret": self.clientSecret,
+            }
+        ).encode("ascii")
+        try:
+            response = urlopen(
+                Request(self.BASE_URL + "token", data), timeout=self.timeout
+            )
+            token = self.parseResponse(response)
+        except HTTPError as e:
+            self.parseResponse(e)
+            raise
+        return token["access_token"], token["expires_in"]
+
+    def get(self, endpoint, params):
+        # ApiClient.get, with a timeout on the request.
+        token = self.getTokenFromCache() or self.fetchNewToken()
+        uri = self.BASE_URL + endpoint + "?" + self.serialize(params)
+        try:
+            response = urlopen(
+                Request(uri, headers={"Authorization": "Bearer " + token}),
+                timeout=self.timeout,
+            )
+            return self.parseResponse(response)
+        except HTTPError as e:
+            self.parseResponse(e)
+            raise
+
+    def getTokenFromCache(self):
+        self.refresher.start()
+        return self.token_cache.get(self.cache_key)
+
+    def fetchNewToken(self):
+        return self.token_cache.refresh(self.cache_key, self.request_token)
+
+    def warmup(self) -> None:
+        """
+        Make sure a token is cached and the refresher is running.
+        """
+        self.token_cache.get_or_refresh(self.cache_key, self.request_token)
+        self.refresher.start()
@@ -0,0 +1,243 @@
+"""
+Priority scheduling and quota accounting for rate-limited upstreams.
+
+Calls go through `QuotaScheduler.admit()`, which hands out tokens from a
+token bucket to the highest-priority waiter first. Interactive calls always
+go ahead of background work, and background work may only use the bucket
+while a few tokens of burst are left for interactive traffic. A caller whose
+wait would run past its deadline is rejected straight away with
+`UpstreamBusyError`, so it can answer "try later" instead of queueing.
+
+Priority and deadline are carried in a context variable (see
+`upstream_priority`), so code deep in the engine does not need to thread
+them through. State is per process: with several workers each one gets
+an equal share of the configured rate, burst and quota (see
+`scheduler_from_env`), so together they stay within the upstream's limits.
+"""
+
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+
+from backend.app.core.metrics import Counter, registry
+from backend.app.core.rate_limit import TokenBucket
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+class UpstreamBusyError(Exception):
+    """
+    The upstream cannot serve the call before the caller's deadline.
+    """
+
+    def __init__(self, upstream: str, retry_after: float, reason: str = "busy"):
+        self.upstream = upstream
+        self.retry_after = max(1, int(retry_after + 0.999))
+        self.reason = reason
+        super().__init__(
+            f"{upstream} is {reason}, try again in {self.retry_after} seconds."
+        )
+
+
+class QuotaExhaustedError(UpstreamBusyError):
+    def __init__(self, upstream: str, retry_after: float):
+        super().__init__(upstream, retry_after, reason="out of quota")
+
+
+upstream_requests = registry.register(
+    Counter(
+        "myng_upstream_requests_total",
+        "Upstream calls by scheduling outcome and priority.",
+    )
+)
+upstream_credits = registry.register(
+    Counter("myng_upstream_credits_total", "Upstream quota credits spent.")
+)
+
+_priority: ContextVar[Priority] = ContextVar(
+    "upstream_priority", default=Priority.INTERACTIVE
+)
+_deadline: ContextVar[float | None] = ContextVar("upstream_deadline", default=None)
+
+
+@contextmanager
+def upstream_priority(priority: Priority, timeout: float | None = None):
+    """
+    Run the block with `priority`, allowing upstream calls to wait at most
+    `timeout` seconds from now. Without a timeout the scheduler's default
+    for the priority applies.
+    """
+    priority_token = _priority.set(priority)
+    deadline_token = _deadline.set(
+        time.monotonic() + timeout if timeout is not None else None
+    )
+    try:
+        yield
+    finally:
+        _deadline.reset(deadline_token)
+        _priority.reset(priority_token)
+
+
+class QuotaScheduler:
+    """
+    Admit calls to one upstream at `rate` per second in priority order.
+
+    `quota` credits may be spent per `quota_period` seconds (0 disables
+    accounting); background calls may spend at most `background_share` of
+    it. `interactive_reserve` tokens of the burst are held back from
+    background calls.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        burst: float | None = None,
+        quota: float = 0,
+        quota_period: float = 86400,
+        background_share: float = 0.8,
+        interactive_reserve: float = 1.0,
+        timeouts: dict[Priority, float] | None = None,
+    ):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.quota = quota
+        self.quota_period = quota_period
+        self.background_share = background_share
+        self.interactive_reserve = min(interactive_reserve, self.bucket.capacity - 1)
+        self.timeouts = timeouts or {
+            Priority.INTERACTIVE: 5.0,
+            Priority.BACKGROUND: 300.0,
+        }
+        self._period_start = time.monotonic()
+        self._spent = {priority: 0.0 for priority in Priority}
+        self._waiters: list[tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    def _reset_period(self, now: float) -> None:
+        if now - self._period_start >= self.quota_period:
+            self._period_start = now
+            self._spent = {priority: 0.0 for priority in Priority}
+
+    def _check_quota(self, priority: Priority, cost: float, now: float) -> None:
+        if not self.quota:
+            return
+        self._reset_period(now)
+        spent = sum(self._spent.values())
+        limit = self.quota
+        if priority is Priority.BACKGROUND:
+            spent = self._spent[Priority.BACKGROUND]
+            limit = self.quota * self.background_share
+        if spent + cost > limit:
+            upstream_requests.inc(
+                upstream=self.name, priority=priority.name.lower(), result="quota"
+            )
+            raise QuotaExhaustedError(
+                self.name, self._period_start + self.quota_period - now
+            )
+
+    def _reserve(self, priority: Priority) -> float:
+        return self.interactive_reserve if priority is Priority.BACKGROUND else 0.0
+
+    def _estimated_wait(self, priority: Priority) -> float:
+        ahead = sum(1 for p, _ in self._waiters if p <= priority)
+        return self.bucket.wait_time(1 + ahead + self._reserve(priority))
+
+    def remaining_quota(self) -> float | None:
+        if not self.quota:
+            return None
+        with self._condition:
+            self._reset_period(time.monotonic())
+            return self.quota - sum(self._spent.values())
+
+    def admit(self, cost: float = 1.0) -> None:
+        """
+        Block until the call may proceed, or raise UpstreamBusyError if that
+        would take longer than the caller's deadline allows.
+        """
+        priority = _priority.get()
+        now = time.monotonic()
+        deadline = _deadline.get()
+        if deadline is None:
+            deadline = now + self.timeouts[priority]
+        labels = {"upstream": self.name, "priority": priority.name.lower()}
+
+        with self._condition:
+            self._check_quota(priority, cost, now)
+            wait = self._estimated_wait(priority)
+            if now + wait > deadline:
+                upstream_requests.inc(result="rejected", **labels)
+                raise UpstreamBusyError(self.name, wait)
+
+            entry = (priority, next(self._sequence))
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    if self._waiters[0] == entry:
+                        reserve = self._reserve(priority)
+                        if self.bucket.wait_time(1 + reserve) == 0:
+                            self.bucket.try_acquire()
+                            break
+                        wait = self.bucket.wait_time(1 + reserve)
+                    else:
+                        wait = None
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        upstream_requests.inc(result="timeout", **labels)
+                        raise UpstreamBusyError(
+                            self.name, self._estimated_wait(priority)
+                        )
+                    self._condition.wait(
+                        remaining if wait is None else min(wait, remaining)
+                    )
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._condition.notify_all()
+
+            self._check_quota(priority, cost, time.monotonic())
+            self._spent[priority] += cost
+
+        upstream_requests.inc(result="admitted", **labels)
+        if self.quota:
+            upstream_credits.inc(cost, upstream=self.name)
+
+
+def scheduler_from_env(name: str, prefix: str) -> QuotaScheduler:
+    """
+    Build a scheduler configured by `{prefix}_RATE_LIMIT`, `_RATE_BURST`,
+    `_QUOTA`, `_QUOTA_PERIOD`, `_BACKGROUND_SHARE`, `_INTERACTIVE_TIMEOUT`
+    and `_BACKGROUND_TIMEOUT`.
+
+    The limits are for the whole deployment. They are divided by the number
+    of worker processes (WEB_CONCURRENCY, set by the pre-fork launcher), so
+    a worker that is busier than the others may be held back while its
+    siblings still have room.
+    """
+
+    def env(key: str, default: str) -> float:
+        return float(os.getenv(f"{prefix}_{key}", default))
+
+    workers = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+    rate = env("RATE_LIMIT", "5")
+    return QuotaScheduler(
+        name,
+        rate=rate / workers,
+        burst=max(env("RATE_BURST", str(max(rate, 1.0))) / workers, 1.0),
+        quota=env("QUOTA", "0") / workers,
+        quota_period=env("QUOTA_PERIOD", "86400"),
+        background_share=env("BACKGROUND_SHARE", "0.8"),
+        timeouts={
+            Priority.INTERACTIVE: env("INTERACTIVE_TIMEOUT", "5"),
+            Priority.BACKGROUND: env("BACKGROUND_TIMEOUT", "300"),
+        },
+    )
@@ -0,0 +1,88 @@
+"""
+Fast JSON for the hot paths.
+
+JSON the app builds itself (LLM output, tool results, NDJSON lines) goes
+through orjson rather than the stdlib. Models served from the caches were
+validated when they were generated, so `ModelResponse` writes them out as
+they are, from bytes serialized once per cached object, instead of having
+FastAPI validate and serialize them again on every request.
+"""
+
+import hashlib
+from functools import cached_property
+from typing import Any
+
+import orjson
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can
+# keep catching the stdlib exception.
+JSONDecodeError = orjson.JSONDecodeError
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value: Any) -> bytes:
+    return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def dumps_str(value: Any) -> str:
+    return dumps(value).decode()
+
+
+def loads(data: str | bytes) -> Any:
+    return orjson.loads(data)
+
+
+class PreserializedModel(BaseModel):
+    """
+    A model that keeps its JSON once serialized. Only for models that are
+    not changed after they are built, such as cached results.
+    """
+
+    @cached_property
+    def json_bytes(self) -> bytes:
+        return self.__pydantic_serializer__.to_json(self)
+
+    @cached_property
+    def msgpack_bytes(self) -> bytes:
+        """
+        The model as MessagePack. Requires the optional msgpack package.
+        """
+        import msgpack
+
+        return msgpack.packb(self.model_dump(mode="json"))
+
+    @cached_property
+    def encoded_bodies(self) -> dict[tuple[str, str | None], bytes]:
+        """
+        Response bodies by media type and content coding, filled in as they
+        are first served.
+        """
+        return {}
+
+    @cached_property
+    def etag(self) -> str:
+        """
+        A strong ETag of the JSON, computed once like it.
+        """
+        return f'"{hashlib.blake2b(self.json_bytes, digest_size=16).hexdigest()}"'
+
+
+class ModelResponse(Response):
+    """
+    A trusted model as JSON, without validating it against the route's
+    response model again.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: BaseModel) -> bytes:
+        if isinstance(content, PreserializedModel):
+            return content.json_bytes
+        return content.__pydantic_serializer__.to_json(content)
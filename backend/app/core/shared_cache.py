@@ -0,0 +1,116 @@
+"""
+Cache entries shared by every worker process.
+
+The in-process caches are private to one worker, so work done by another
+worker (or by a background job) would otherwise not be reused. A cache
+given a `SharedCacheStore` writes every value it loads through to the
+database and looks there before loading on a local miss.
+"""
+
+import hashlib
+import json
+import os
+import time
+from typing import Any, Hashable
+
+from pydantic import BaseModel
+from sqlalchemy import Column, Float, MetaData, String, Table, Text, delete, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+
+from backend.app.core.database import get_engine
+
+metadata = MetaData()
+
+cache_entries = Table(
+    "cache_entries",
+    metadata,
+    Column("cache", String(64), primary_key=True),
+    Column("key", String(64), primary_key=True),
+    Column("value", Text, nullable=False),
+    Column("stored_at", Float, nullable=False),
+)
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Cannot use {type(value).__name__} in a cache key")
+
+
+def key_digest(key: Hashable) -> str:
+    """
+    A stable digest of a cache key made of strings, numbers, tuples and
+    pydantic models, the same in every process.
+    """
+    encoded = json.dumps(key, default=_jsonable, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class SharedCacheStore:
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        metadata.create_all(engine)
+
+    def get(self, cache: str, key: Hashable) -> tuple[str, float] | None:
+        """
+        The encoded value and the wall-clock time it was stored, or None.
+        """
+        with self.engine.connect() as conn:
+            row = conn.execute(
+                select(cache_entries.c.value, cache_entries.c.stored_at).where(
+                    cache_entries.c.cache == cache,
+                    cache_entries.c.key == key_digest(key),
+                )
+            ).first()
+        return (row.value, row.stored_at) if row is not None else None
+
+    def set(self, cache: str, key: Hashable, value: str) -> None:
+        values = {
+            "cache": cache,
+            "key": key_digest(key),
+            "value": value,
+            "stored_at": time.time(),
+        }
+        dialect = {"sqlite": sqlite, "postgresql": postgresql}.get(
+            self.engine.dialect.name
+        )
+        with self.engine.begin() as conn:
+            if dialect is None:
+                conn.execute(
+                    delete(cache_entries).where(
+                        cache_entries.c.cache == cache,
+                        cache_entries.c.key == values["key"],
+                    )
+                )
+                conn.execute(cache_entries.insert().values(values))
+                return
+            statement = dialect.insert(cache_entries).values(values)
+            conn.execute(
+                statement.on_conflict_do_update(
+                    index_elements=["cache", "key"],
+                    set_={
+                        "value": statement.excluded.value,
+                        "stored_at": statement.excluded.stored_at,
+                    },
+                )
+            )
+
+    def purge(self, cache: str, older_than: float) -> int:
+        with self.engine.begin() as conn:
+            return conn.execute(
+                delete(cache_entries).where(
+                    cache_entries.c.cache == cache,
+                    cache_entries.c.stored_at < time.time() - older_than,
+                )
+            ).rowcount
+
+
+def shared_store_from_env() -> SharedCacheStore | None:
+    """
+    The store at SHARED_CACHE_URL (by default DATABASE_URL), or None if
+    SHARED_CACHE=false.
+    """
+    if os.getenv("SHARED_CACHE", "true").lower() == "false":
+        return None
+    return SharedCacheStore(get_engine(os.getenv("SHARED_CACHE_URL")))
@@ -0,0 +1,129 @@
+import importlib
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Generic, Iterable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_timings: dict[str, dict[str, float]] = {}
+_timings_lock = threading.Lock()
+_registry: dict[str, "Lazy"] = {}
+
+
+@contextmanager
+def measure(component: str, phase: str):
+    """
+    Record the wall time of a startup phase ("import", "init", ...) for a component.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with _timings_lock:
+            phases = _timings.setdefault(component, {})
+            phases[phase] = phases.get(phase, 0.0) + elapsed
+
+
+class Lazy(Generic[T]):
+    """
+    Thread-safe lazily constructed singleton.
+
+    The heavy modules listed in `imports` are imported on first use and timed
+    separately from the `factory` call, so the startup report can tell import
+    cost apart from construction cost.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        factory: Callable[[], T],
+        imports: Iterable[str] = (),
+    ):
+        self.name = name
+        self.factory = factory
+        self.imports = tuple(imports)
+        self._value: T | None = None
+        self._initialized = False
+        self._lock = threading.Lock()
+        _registry[name] = self
+
+    @property
+    def initialized(self) -> bool:
+        return self._initialized
+
+    def get(self) -> T:
+        if self._initialized:
+            return self._value
+        with self._lock:
+            if not self._initialized:
+                for module in self.imports:
+                    with measure(self.name, "import"):
+                        importlib.import_module(module)
+                with measure(self.name, "init"):
+                    self._value = self.factory()
+                self._initialized = True
+        return self._value
+
+    __call__ = get
+
+    def set(self, value: T) -> None:
+        """
+        Replace the instance, e.g. with a test double.
+        """
+        with self._lock:
+            self._value = value
+            self._initialized = True
+
+    def reset(self) -> None:
+        with self._lock:
+            self._value = None
+            self._initialized = False
+
+
+def warmup(names: Iterable[str] | None = None) -> dict[str, str]:
+    """
+    Initialize registered singletons ahead of the first request.
+
+    Objects exposing a `warmup()` method get it called after construction.
+    A component that fails to initialize (e.g. missing credentials) is logged
+    and skipped; it will be retried, and fail loudly, on first use.
+    """
+    status = {}
+    for name, lazy in list(_registry.items()):
+        if names is not None and name not in names:
+            continue
+        try:
+            instance = lazy.get()
+            hook = getattr(instance, "warmup", None)
+            if callable(hook):
+                with measure(name, "warmup"):
+                    hook()
+            status[name] = "ok"
+        except Exception as e:
+            logger.warning(
+                "Component warmup failed", extra={"component": name, "error": str(e)}
+            )
+            status[name] = f"error: {e}"
+    return status
+
+
+def startup_report() -> dict[str, Any]:
+    with _timings_lock:
+        components = {
+            name: {phase: round(seconds, 4) for phase, seconds in phases.items()}
+            for name, phases in _timings.items()
+        }
+    for name, lazy in _registry.items():
+        components.setdefault(name, {})["initialized"] = lazy.initialized
+    total = sum(
+        seconds
+        for phases in components.values()
+        for phase, seconds in phases.items()
+        if phase in ("import", "init")
+    )
+    return {"total_seconds": round(total, 4), "components": components}
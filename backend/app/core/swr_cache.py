@@ -0,0 +1,209 @@
+"""
+In-process stale-while-revalidate cache.
+
+Entries younger than `ttl` are served as is. Older entries are still served
+immediately, flagged as stale, while a background thread reloads them at
+background upstream priority. Only a miss waits for the loader, and
+concurrent misses for one key share a single load.
+
+Callers that want to tell clients about staleness wrap the work in
+`collect_staleness()` and inspect the ages it collects.
+
+With a `SharedCacheStore`, loaded values are also written to the database,
+and a local miss is first looked up there, so every worker process reuses
+values loaded by any of them.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Hashable
+
+from backend.app.core.metrics import cache_requests
+from backend.app.core.quota import Priority, upstream_priority
+from backend.app.core.shared_cache import SharedCacheStore
+
+logger = logging.getLogger(__name__)
+
+_stale_ages: ContextVar[list[float] | None] = ContextVar("stale_ages", default=None)
+
+
+@contextmanager
+def collect_staleness():
+    """
+    Yield a list that receives the age in seconds of every stale entry
+    served inside the block.
+    """
+    ages: list[float] = []
+    token = _stale_ages.set(ages)
+    try:
+        yield ages
+    finally:
+        _stale_ages.reset(token)
+
+
+_executor: ThreadPoolExecutor | None = None
+_executor_pid: int | None = None
+_executor_lock = threading.Lock()
+
+
+def _refresh_executor() -> ThreadPoolExecutor:
+    global _executor, _executor_pid
+    # Worker threads do not survive fork(); each process gets its own pool.
+    if _executor is None or _executor_pid != os.getpid():
+        with _executor_lock:
+            if _executor is None or _executor_pid != os.getpid():
+                _executor = ThreadPoolExecutor(
+                    max_workers=int(os.getenv("SWR_REFRESH_WORKERS", "4")),
+                    thread_name_prefix="swr-refresh",
+                )
+                _executor_pid = os.getpid()
+    return _executor
+
+
+class StaleWhileRevalidateCache:
+    """
+    LRU cache of at most `max_entries` values, fresh for `ttl` seconds.
+
+    `encode` and `decode` convert values to and from the text kept in the
+    shared store, if any.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: float,
+        max_entries: int = 10000,
+        shared: SharedCacheStore | None = None,
+        encode: Callable[[Any], str] = json.dumps,
+        decode: Callable[[str], Any] = json.loads,
+    ):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.shared = shared
+        self.encode = encode
+        self.decode = decode
+        self._entries: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: dict[Hashable, threading.Lock] = {}
+        self._refreshing: set[Hashable] = set()
+
+    def _lookup(self, key: Hashable) -> tuple[Any, float] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _remember(self, key: Hashable, value: Any, stored_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (value, stored_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._remember(key, value, time.monotonic())
+        if self.shared is None:
+            return
+        try:
+            self.shared.set(self.name, key, self.encode(value))
+        except Exception as e:
+            logger.warning(
+                "Shared cache write failed", extra={"cache": self.name, "error": str(e)}
+            )
+
+    def _lookup_shared(self, key: Hashable) -> tuple[Any, float] | None:
+        try:
+            found = self.shared.get(self.name, key)
+            if found is None:
+                return None
+            encoded, stored_at = found
+            value = self.decode(encoded)
+        except Exception as e:
+            logger.warning(
+                "Shared cache read failed", extra={"cache": self.name, "error": str(e)}
+            )
+            return None
+        # Keep the original age, translated to the local monotonic clock.
+        entry = (value, time.monotonic() - (time.time() - stored_at))
+        self._remember(key, *entry)
+        return entry
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        entry = self._lookup(key)
+        result = "hit"
+        if entry is None and self.shared is not None:
+            entry = self._lookup_shared(key)
+            result = "shared_hit"
+        if entry is not None:
+            value, stored_at = entry
+            age = time.monotonic() - stored_at
+            if age <= self.ttl:
+                cache_requests.inc(cache=self.name, result=result)
+                return value
+            cache_requests.inc(cache=self.name, result="stale")
+            ages = _stale_ages.get()
+            if ages is not None:
+                ages.append(age)
+            self._refresh_in_background(key, loader)
+            return value
+
+        cache_requests.inc(cache=self.name, result="miss")
+        with self._lock:
+            lock = self._inflight.setdefault(key, threading.Lock())
+        with lock:
+            try:
+                entry = self._lookup(key)
+                if entry is not None:
+                    return entry[0]
+                value = loader()
+                self.set(key, value)
+                return value
+            finally:
+                with self._lock:
+                    if self._inflight.get(key) is lock:
+                        del self._inflight[key]
+
+    def _refresh_in_background(self, key: Hashable, loader: Callable[[], Any]):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        _refresh_executor().submit(self._refresh, key, loader)
+
+    def _refresh(self, key: Hashable, loader: Callable[[], Any]) -> None:
+        try:
+            if self.shared is not None:
+                # Another worker may have refreshed it already.
+                entry = self._lookup_shared(key)
+                if entry is not None and time.monotonic() - entry[1] <= self.ttl:
+                    return
+            with upstream_priority(Priority.BACKGROUND):
+                self.set(key, loader())
+        except Exception as e:
+            logger.warning(
+                "Background cache refresh failed",
+                extra={"cache": self.name, "error": str(e)},
+            )
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
@@ -0,0 +1,191 @@
+"""
+Access tokens shared by every worker on the host.
+
+Tokens live in a small SQLite database so a worker started after a deploy
+picks up the token another worker already negotiated. Refreshing happens
+under SQLite's write lock (BEGIN IMMEDIATE), so workers racing to refresh
+end up with a single upstream round-trip, and a background thread renews
+the token `refresh_margin` seconds before it expires so requests never wait
+on it.
+"""
+
+import logging
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Callable
+
+from backend.app.core.metrics import cache_requests, track
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOKEN_CACHE_PATH = os.path.join(tempfile.gettempdir(), "myng_tokens.sqlite3")
+
+# Returns (access_token, expires_in seconds).
+TokenFetcher = Callable[[], tuple[str, float]]
+
+
+class TokenCache:
+    """
+    Expiry-aware token store keyed by upstream account.
+
+    A token is handed out while it has more than `min_validity` seconds
+    left, and is due for refresh once fewer than `refresh_margin` remain.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_TOKEN_CACHE_PATH,
+        refresh_margin: float = 300.0,
+        min_validity: float = 10.0,
+    ):
+        self.path = path
+        self.refresh_margin = refresh_margin
+        self.min_validity = min_validity
+        self._local = threading.local()
+        self._memo: dict[str, tuple[str, float]] = {}
+        self._refresh_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        # Connections must not cross fork(); open a fresh one in the child.
+        if conn is None or self._local.pid != os.getpid():
+            # The file holds credentials; keep it private to the user.
+            os.close(os.open(self.path, os.O_CREAT | os.O_RDWR, 0o600))
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS token ("
+                " key TEXT PRIMARY KEY,"
+                " access_token TEXT NOT NULL,"
+                " expires_at REAL NOT NULL)"
+            )
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _load(self, key: str) -> tuple[str, float] | None:
+        row = (
+            self._connect()
+            .execute("SELECT access_token, expires_at FROM token WHERE key = ?", (key,))
+            .fetchone()
+        )
+        if row is not None:
+            self._memo[key] = row
+        return row
+
+    def remaining(self, key: str) -> float:
+        """
+        Seconds of validity left on the cached token, or 0 if none.
+        """
+        entry = self._memo.get(key) or self._load(key)
+        return entry[1] - time.time() if entry else 0.0
+
+    def get(self, key: str) -> str | None:
+        """
+        A token with more than `min_validity` seconds left, or None.
+        """
+        entry = self._memo.get(key)
+        if entry is None or entry[1] - time.time() <= self.refresh_margin:
+            # Another worker may have refreshed it already.
+            entry = self._load(key)
+        if entry is None or entry[1] - time.time() <= self.min_validity:
+            cache_requests.inc(cache="access_token", result="miss")
+            return None
+        cache_requests.inc(cache="access_token", result="hit")
+        return entry[0]
+
+    def refresh(self, key: str, fetch: TokenFetcher, force: bool = False) -> str:
+        """
+        Renew the token unless another worker already did so recently.
+
+        Without `force` a token that is still usable is returned as is; with
+        it, a token inside the refresh margin is replaced.
+        """
+        threshold = self.refresh_margin if force else self.min_validity
+        with self._refresh_lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                entry = self._load(key)
+                if entry is not None and entry[1] - time.time() > threshold:
+                    conn.execute("COMMIT")
+                    return entry[0]
+                with track("token_refresh"):
+                    access_token, expires_in = fetch()
+                expires_at = time.time() + expires_in
+                conn.execute(
+                    "INSERT OR REPLACE INTO token (key, access_token, expires_at)"
+                    " VALUES (?, ?, ?)",
+                    (key, access_token, expires_at),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        self._memo[key] = (access_token, expires_at)
+        logger.info("Access token refreshed", extra={"expires_in": expires_in})
+        return access_token
+
+    def get_or_refresh(self, key: str, fetch: TokenFetcher) -> str:
+        return self.get(key) or self.refresh(key, fetch)
+
+
+class TokenRefresher:
+    """
+    Daemon thread renewing a token shortly before it enters the refresh
+    margin. Restarted lazily by `start()` after a fork.
+    """
+
+    def __init__(
+        self, cache: TokenCache, key: str, fetch: TokenFetcher, retry: float = 30.0
+    ):
+        self.cache = cache
+        self.key = key
+        self.fetch = fetch
+        self.retry = retry
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="token-refresher", daemon=True
+                )
+                self._thread.start()
+
+    def _delay(self) -> float:
+        margin = self.cache.refresh_margin
+        # Wake somewhere inside the margin; the jitter spreads the workers so
+        # usually only the first one to wake reaches the upstream.
+        due = self.cache.remaining(self.key) - margin * random.uniform(0.8, 1.0)
+        return max(0.0, due)
+
+    def _run(self) -> None:
+        first = True
+        while True:
+            # After the first pass never spin faster than `retry`, even for
+            # tokens that live shorter than the refresh margin.
+            delay = self._delay()
+            if self._stop.wait(delay if first else max(delay, self.retry)):
+                return
+            first = False
+            try:
+                self.cache.refresh(self.key, self.fetch, force=True)
+            except Exception as e:
+                logger.warning("Access token refresh failed", extra={"error": str(e)})
+                if self._stop.wait(self.retry):
+                    return
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
@@ -0,0 +1,347 @@
+"""
+Lightweight request tracing.
+
+Every request gets a request id (taken from the X-Request-ID header or
+generated) carried through contextvars, so it reaches worker threads spawned
+with `asyncio.to_thread` or FastAPI's threadpool. A sampled request also
+records a tree of spans, exported in the background as JSON lines to a file
+or as OTLP/JSON to a collector.
+"""
+
+import json
+import logging
+import os
+import queue
+import random
+import re
+import secrets
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+REQUEST_ID_HEADER = "X-Request-ID"
+# Client request ids are echoed in headers and logs, so only short plain
+# tokens are accepted; anything else gets a generated id.
+_request_id = re.compile(r"[A-Za-z0-9._-]{1,128}")
+SAMPLE_HEADER = "X-Trace-Sample"
+
+
+class Span:
+    __slots__ = (
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "name",
+        "start_ns",
+        "end_ns",
+        "attributes",
+        "error",
+    )
+
+    def __init__(self, trace_id: str, parent_id: str | None, name: str, attributes):
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+        self.attributes = attributes
+        self.error: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": (
+                round((self.end_ns - self.start_ns) / 1e6, 3) if self.end_ns else None
+            ),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class Trace:
+    def __init__(self, request_id: str, sampled: bool):
+        self.request_id = request_id
+        self.trace_id = secrets.token_hex(16)
+        self.sampled = sampled
+        self.spans: list[Span] = []
+
+
+_current_trace: ContextVar[Trace | None] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+def get_request_id() -> str | None:
+    trace = _current_trace.get()
+    return trace.request_id if trace else None
+
+
+def current_context() -> dict[str, str]:
+    """
+    Identifiers of the active request, for attaching to log records.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return {}
+    context = {"request_id": trace.request_id, "trace_id": trace.trace_id}
+    span = _current_span.get()
+    if span is not None:
+        context["span_id"] = span.span_id
+    return context
+
+
+@contextmanager
+def start_trace(request_id: str | None = None, sampled: bool | None = None):
+    if sampled is None:
+        sampled = random.random() < SAMPLE_RATE
+    trace = Trace(request_id or secrets.token_hex(16), sampled)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+        if trace.sampled and trace.spans:
+            exporter.submit(trace)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Record a child span of the current span. A no-op outside a sampled trace.
+    """
+    trace = _current_trace.get()
+    if trace is None or not trace.sampled:
+        yield None
+        return
+
+    parent = _current_span.get()
+    current = Span(trace.trace_id, parent.span_id if parent else None, name, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _current_span.reset(token)
+        trace.spans.append(current)
+
+
+class FileExporter:
+    """
+    Append one JSON line per trace to a local file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, traces: list[Trace]) -> None:
+        with open(self.path, "a") as f:
+            for trace in traces:
+                f.write(
+                    json.dumps(
+                        {
+                            "trace_id": trace.trace_id,
+                            "request_id": trace.request_id,
+                            "spans": [s.to_dict() for s in trace.spans],
+                        },
+                        default=str,
+                    )
+                    + "\n"
+                )
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OTLPExporter:
+    """
+    Post spans to an OTLP/HTTP collector using the JSON encoding.
+    """
+
+    def __init__(self, endpoint: str, service_name: str = "myng-api", timeout=5.0):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+
+    def _span(self, trace: Trace, s: Span) -> dict[str, Any]:
+        attributes = {"request_id": trace.request_id, **s.attributes}
+        data = {
+            "traceId": s.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            "kind": 2 if s.parent_id is None else 1,
+            "startTimeUnixNano": str(s.start_ns),
+            "endTimeUnixNano": str(s.end_ns),
+            "attributes": [
+                {"key": k, "value": _otlp_value(v)} for k, v in attributes.items()
+            ],
+            "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+        }
+        if s.parent_id:
+            data["parentSpanId"] = s.parent_id
+        return data
+
+    def export(self, traces: list[Trace]) -> None:
+        body = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {
+                                "key": "service.name",
+                                "value": {"stringValue": self.service_name},
+                            }
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "myng"},
+                            "spans": [
+                                self._span(trace, s)
+                                for trace in traces
+                                for s in trace.spans
+                            ],
+                        }
+                    ],
+                }
+            ]
+        }
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(body).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+class BackgroundExporter:
+    """
+    Batches finished traces and hands them to `exporter` on a daemon thread so
+    request handling never waits on disk or network I/O.
+    """
+
+    def __init__(self, exporter=None, max_queue: int = 1000, batch_size: int = 64):
+        self.exporter = exporter
+        self.batch_size = batch_size
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, trace: Trace) -> None:
+        if self.exporter is None:
+            return
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(
+                        target=self._run, name="trace-exporter", daemon=True
+                    )
+                    self._thread.start()
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            pass
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.exporter.export(batch)
+            except Exception as e:
+                logger.warning("Trace export failed", extra={"error": str(e)})
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def flush(self) -> None:
+        self._queue.join()
+
+
+def _build_exporter():
+    kind = os.getenv("TRACE_EXPORTER", "").lower()
+    if kind == "file":
+        return FileExporter(os.getenv("TRACE_FILE", "traces.jsonl"))
+    if kind == "otlp":
+        return OTLPExporter(
+            os.getenv("OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+        )
+    return None
+
+
+SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.0"))
+exporter = BackgroundExporter(_build_exporter())
+
+
+def _header(scope, name: str) -> str | None:
+    # Header bytes need not be UTF-8; latin-1 decodes any of them.
+    name = name.lower().encode()
+    for key, value in scope["headers"]:
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return None
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware opening a trace per HTTP request and echoing its request
+    id in the X-Request-ID response header. The root span covers the whole
+    response, including streamed bodies.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        request_id = _header(scope, REQUEST_ID_HEADER)
+        if request_id is not None and not _request_id.fullmatch(request_id):
+            request_id = None
+        sampled = True if _header(scope, SAMPLE_HEADER) == "1" else None
+
+        with start_trace(request_id, sampled) as trace:
+            request_id_header = (REQUEST_ID_HEADER.encode(), trace.request_id.encode())
+
+            async def send_with_request_id(message):
+                if message["type"] == "http.response.start":
+                    message.setdefault("headers", [])
+                    message["headers"] = [*message["headers"], request_id_header]
+                    if root is not None:
+                        root.attributes["http.status_code"] = message["status"]
+                await send(message)
+
+            with span(
+                f"{scope['method']} {scope['path']}", **{"http.method": scope["method"]}
+            ) as root:
+                await self.app(scope, receive, send_with_request_id)
+                if root is not None:
+                    route = getattr(scope.get("route"), "path", None)
+                    if route:
+                        root.name = f"{scope['method']} {route}"
+                        root.attributes["http.route"] = route
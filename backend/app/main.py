@@ -2,19 +2,41 @@ from dotenv import load_dotenv
 
 load_dotenv(override=True)
 
-from fastapi import FastAPI  # noqa: E402
-from fastapi.middleware.cors import CORSMiddleware  # noqa: E402
-from backend.app.api.v1.router import api_router  # noqa: E402
-from backend.app.core.logger import setup_logging  # noqa: E402
-import logging  # noqa: E402
-import os  # noqa: E402
+from backend.app.core.startup import measure, startup_report, warmup  # noqa: E402
+
+with measure("app", "import"):
+    from contextlib import asynccontextmanager  # noqa: E402
+    from fastapi import FastAPI  # noqa: E402
+    from fastapi.responses import PlainTextResponse  # noqa: E402
+    from fastapi.middleware.cors import CORSMiddleware  # noqa: E402
+    from backend.app.api.v1.router import api_router  # noqa: E402
+    from backend.app.core.logger import setup_logging  # noqa: E402
+    from backend.app.core.metrics import registry  # noqa: E402
+    from backend.app.core.profiling import ProfilingMiddleware  # noqa: E402
+    from backend.app.core.tracing import TracingMiddleware  # noqa: E402
+    import asyncio  # noqa: E402
+    import logging  # noqa: E402
+    import os  # noqa: E402
 
 
 setup_logging(os.getenv("LOG_LEVEL", "INFO"))
 logger = logging.getLogger(__name__)
 logger.info("Application starting up")
 
-app = FastAPI(title="Myng API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build heavy clients (timezone polygons, OpenAI, ...) before serving
+    # traffic instead of on the first request. Set STARTUP_WARMUP=false to
+    # keep everything lazy.
+    if os.getenv("STARTUP_WARMUP", "true").lower() != "false":
+        status = await asyncio.to_thread(warmup)
+        logger.info("Startup warmup finished", extra={"components": status})
+    logger.info("Startup report", extra={"report": startup_report()})
+    yield
+
+
+app = FastAPI(title="Myng API", lifespan=lifespan)
 # log all environment variables in .env file
 # Configure CORS
 origins = ["*"]  # Allow all origins for development
@@ -25,7 +47,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID"],
 )
+# Profiling runs inside tracing so profiles can be tagged with the request id.
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(TracingMiddleware)
 
 app.include_router(api_router, prefix="/api/v1")
 
@@ -34,3 +60,10 @@ app.include_router(api_router, prefix="/api/v1")
 def read_root():
     logger.info("Root endpoint accessed")
     return {"message": "Welcome to Myng API"}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics() -> PlainTextResponse:
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
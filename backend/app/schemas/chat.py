@@ -9,11 +9,13 @@ class ChatMessage(BaseModel):
 
 class ChatRequest(BaseModel):
     message: str
-    birth_datetime: str
-    birth_coordinates: str
+    birth_datetime: Optional[str] = None
+    birth_coordinates: Optional[str] = None
     transit_datetime: str
     current_coordinates: Optional[str] = None
     history: List[ChatMessage] = []
+    # Replaces the birth data and current location with the stored profile's.
+    profile_id: Optional[str] = None
 
 
 class ChatResponse(BaseModel):
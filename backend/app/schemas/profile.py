@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+
+
+class ProfileCreateRequest(BaseModel):
+    birth_datetime: str
+    birth_coordinates: str | None = None
+    birth_city: str | None = None
+    current_coordinates: str | None = None
+    current_city: str | None = None
+
+
+class ProfileUpdateRequest(BaseModel):
+    current_coordinates: str | None = None
+    current_city: str | None = None
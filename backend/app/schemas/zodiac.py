@@ -1,26 +1,40 @@
 from backend.app.services.divination.zodiac.engine import Portrait, DailyTransit
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class ZodiacPortraitRequest(BaseModel):
-    datetime: str
+    datetime: str | None = None
     city: str | None = None
     coordinates: str | None = None
+    # Replaces the fields above with the stored profile's birth data.
+    profile_id: str | None = None
 
 
 class ZodiacPortraitResponse(Portrait):
     pass
 
 
+class ZodiacPortraitBatchRequest(BaseModel):
+    items: list[ZodiacPortraitRequest] = Field(max_length=1000)
+
+
 class ZodiacDailyTransitRequest(BaseModel):
-    birth_datetime: str
+    birth_datetime: str | None = None
     birth_coordinates: str | None = None
     birth_city: str | None = None
-    transit_datetime: str
+    # Defaults to now; any moment of the local day gives the same transit.
+    transit_datetime: str | None = None
     current_coordinates: str | None = None
     current_city: str | None = None
     ai_portrait: Portrait | None = None
+    # Replaces the birth data, and by default the current location and
+    # portrait, with the stored profile's.
+    profile_id: str | None = None
 
 
 class ZodiacDailyTransitResponse(DailyTransit):
     pass
+
+
+class ZodiacDailyTransitBatchRequest(BaseModel):
+    items: list[ZodiacDailyTransitRequest] = Field(max_length=1000)
@@ -0,0 +1,228 @@
+"""
+Pre-fork multi-worker launcher.
+
+Large read-only datasets (the TimezoneFinder polygons, and any other
+component listed in PRELOAD_COMPONENTS) are loaded once in the parent
+process, which then forks the uvicorn workers. The workers share those
+pages copy-on-write instead of each loading a private copy, as they would
+with `uvicorn --workers N`, which spawns fresh interpreters.
+
+Usage:
+    python -m backend.app.serve --workers 4 --port 8000
+
+Send SIGUSR1 to the parent to log a memory report for every worker.
+"""
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+
+from backend.app.core.logger import shutdown_logging
+from backend.app.core.memory import memory_report
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PRELOAD_COMPONENTS = "timezonefinder"
+
+# A worker exiting within FAST_EXIT_SECONDS of its start is restarted after
+# an exponential backoff, and given up on after MAX_FAST_EXITS such exits in
+# a row, so one that fails on import or bind does not fork in a loop.
+FAST_EXIT_SECONDS = 10.0
+MAX_FAST_EXITS = 5
+MAX_RESTART_DELAY = 30.0
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(app, sock: socket.socket, args: argparse.Namespace) -> None:
+    import uvicorn
+
+    for sig in (signal.SIGUSR1, signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, signal.SIG_DFL)
+
+    config = uvicorn.Config(
+        app,
+        log_config=None,
+        timeout_keep_alive=args.timeout_keep_alive,
+    )
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class PreforkSupervisor:
+    def __init__(self, app, sock: socket.socket, args: argparse.Namespace):
+        self.app = app
+        self.sock = sock
+        self.args = args
+        self.workers: dict[int, int] = {}  # pid -> worker index
+        self.started: dict[int, float] = {}  # worker index -> start time
+        self.fast_exits: dict[int, int] = {}  # worker index -> exits in a row
+        self.restart_at: dict[int, float] = {}  # worker index -> due time
+        self.failed: set[int] = set()
+        self.shutting_down = False
+        self.report_requested = False
+
+    def spawn(self, index: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _run_worker(self.app, self.sock, self.args)
+            finally:
+                shutdown_logging()
+                os._exit(0)
+        self.workers[pid] = index
+        self.started[index] = time.monotonic()
+        logger.info("Started worker", extra={"worker": index, "worker_pid": pid})
+
+    def schedule_restart(self, index: int) -> None:
+        """
+        Restart a worker that exited: right away if it had been running a
+        while, after a growing delay if it keeps exiting soon after start.
+        """
+        now = time.monotonic()
+        if now - self.started.get(index, now) >= FAST_EXIT_SECONDS:
+            exits = 0
+        else:
+            exits = self.fast_exits.get(index, 0) + 1
+        self.fast_exits[index] = exits
+        if exits > MAX_FAST_EXITS:
+            self.failed.add(index)
+            logger.error(
+                "Worker keeps exiting on start, not restarting it",
+                extra={"worker": index, "exits": exits},
+            )
+            return
+        delay = min(0.5 * 2 ** (exits - 1), MAX_RESTART_DELAY) if exits else 0.0
+        self.restart_at[index] = now + delay
+
+    def log_memory_report(self) -> None:
+        parent = memory_report()
+        workers = [
+            {"worker": index, **memory_report(pid)}
+            for pid, index in sorted(self.workers.items(), key=lambda w: w[1])
+        ]
+        total_pss = sum(w.get("pss_kb", 0) for w in workers) + parent.get("pss_kb", 0)
+        logger.info(
+            "Memory report",
+            extra={"parent": parent, "workers": workers, "total_pss_kb": total_pss},
+        )
+
+    def _on_terminate(self, signum, frame) -> None:
+        self.shutting_down = True
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _on_report(self, signum, frame) -> None:
+        self.report_requested = True
+
+    def run(self) -> int:
+        """
+        Supervise the workers until shutdown. Returns 1 if a worker was given
+        up on, else 0.
+        """
+        signal.signal(signal.SIGTERM, self._on_terminate)
+        signal.signal(signal.SIGINT, self._on_terminate)
+        signal.signal(signal.SIGUSR1, self._on_report)
+
+        for index in range(self.args.workers):
+            self.spawn(index)
+
+        report_at = time.monotonic() + self.args.memory_report_after
+        while self.workers or (self.restart_at and not self.shutting_down):
+            if self.workers:
+                try:
+                    pid, status = os.waitpid(-1, os.WNOHANG)
+                except ChildProcessError:
+                    break
+            else:
+                pid = 0
+            if pid:
+                index = self.workers.pop(pid)
+                if not self.shutting_down:
+                    logger.warning(
+                        "Worker exited, restarting",
+                        extra={"worker": index, "worker_pid": pid, "status": status},
+                    )
+                    self.schedule_restart(index)
+                continue
+
+            now = time.monotonic()
+            for index, due in list(self.restart_at.items()):
+                if due <= now and not self.shutting_down:
+                    del self.restart_at[index]
+                    self.spawn(index)
+
+            if self.report_requested or (
+                report_at is not None and time.monotonic() >= report_at
+            ):
+                self.report_requested = False
+                report_at = None
+                self.log_memory_report()
+            time.sleep(0.2)
+        return 1 if self.failed else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument(
+        "--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "2"))
+    )
+    parser.add_argument(
+        "--preload",
+        default=os.getenv("PRELOAD_COMPONENTS", DEFAULT_PRELOAD_COMPONENTS),
+        help="Comma separated startup components to load before forking.",
+    )
+    parser.add_argument("--timeout-keep-alive", type=int, default=5)
+    parser.add_argument(
+        "--memory-report-after",
+        type=float,
+        default=10.0,
+        help="Seconds after startup to log the per-worker memory report.",
+    )
+    args = parser.parse_args(argv)
+
+    sock = _bind(args.host, args.port)
+    # Per-process limits, such as the upstream rate limits, are divided
+    # among the workers.
+    os.environ["WEB_CONCURRENCY"] = str(args.workers)
+
+    from backend.app.main import app
+    from backend.app.core.startup import startup_report, warmup
+
+    preload = [name.strip() for name in args.preload.split(",") if name.strip()]
+    status = warmup(preload)
+    logger.info("Preloaded components before fork", extra={"components": status})
+    logger.info("Startup report", extra={"report": startup_report()})
+
+    # Move everything allocated so far out of the GC's tracked generations so
+    # collections in the workers do not write to (and un-share) those pages.
+    gc.collect()
+    gc.freeze()
+
+    logger.info(
+        "Serving",
+        extra={"host": args.host, "port": args.port, "workers": args.workers},
+    )
+    status = PreforkSupervisor(app, sock, args).run()
+    sock.close()
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,63 +1,100 @@
+from __future__ import annotations
+
 import os
-from openai import OpenAI
+from typing import TYPE_CHECKING
 from dotenv import load_dotenv
-from openai.types.chat import ChatCompletionMessageParam
+
+from backend.app.core.circuit_breaker import breaker_from_env
+from backend.app.core.metrics import record_llm_usage, track
+from backend.app.core.startup import Lazy
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+    from openai.types.chat import ChatCompletionMessageParam
 
 load_dotenv()
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+MODEL_NAME = os.getenv("AI_MODEL_NAME")
 
-if not OPENAI_API_KEY:
-    raise ValueError("OPENAI_API_KEY is not set in the environment variables.")
 
-_client = OpenAI(
-    api_key=OPENAI_API_KEY,
-    base_url=os.getenv("OPENAI_BASE_URL"),
-)
+def _build_client() -> OpenAI:
+    from openai import OpenAI
 
-get_client = lambda: _client
+    api_key = os.getenv("OPENAI_API_KEY")
+
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY is not set in the environment variables.")
+
+    return OpenAI(
+        api_key=api_key,
+        base_url=os.getenv("OPENAI_BASE_URL"),
+        timeout=float(os.getenv("OPENAI_TIMEOUT", "60")),
+    )
+
+
+_client = Lazy("openai", _build_client, imports=("openai",))
+
+get_client = _client.get
+
+breaker = breaker_from_env("openai", "OPENAI")
 
 
 def get_chat_response(
     messages: list[ChatCompletionMessageParam],
-    model_name: str = os.getenv("AI_MODEL_NAME"),
-    client: OpenAI = _client,
+    model_name: str = MODEL_NAME,
+    client: OpenAI | None = None,
+    endpoint: str | None = None,
     **kwargs,
 ) -> str:
     """
     Sends a message to an OPENAI Compatible API via the OpenAI client and returns the response content.
+    Token usage is counted under `endpoint`.
     """
+    client = client or get_client()
 
-    response = client.chat.completions.create(
-        model=model_name, messages=messages, **kwargs
-    )
+    with track("llm.chat_response"), breaker.call():
+        response = client.chat.completions.create(
+            model=model_name, messages=messages, **kwargs
+        )
+    record_llm_usage(response, model_name, endpoint)
     return response.choices[0].message.content
 
 
 def get_chat_completion(
     messages: list[ChatCompletionMessageParam],
-    model_name: str = os.getenv("AI_MODEL_NAME"),
-    client: OpenAI = _client,
+    model_name: str = MODEL_NAME,
+    client: OpenAI | None = None,
     tools: list = None,
     tool_choice: str = "auto",
     stream: bool = False,
+    endpoint: str | None = None,
     **kwargs,
 ):
     """
     Sends a message to an AI and returns the full response object.
-    Supports tools/function calling and streaming.
+    Supports tools/function calling and streaming. Token usage is counted
+    under `endpoint`; a stream reports it in its last chunk, which the
+    caller passes to `record_llm_usage` once consumed.
     """
+    client = client or get_client()
     params = {
         "model": model_name,
         "messages": messages,
         "stream": stream,
         **kwargs,
     }
+    if stream:
+        params["stream_options"] = {"include_usage": True}
     if tools:
         params["tools"] = tools
         params["tool_choice"] = tool_choice
 
-    return client.chat.completions.create(**params)
+    # For streams this only covers time to the first chunk.
+    with track("llm.chat_completion"), breaker.call():
+        response = client.chat.completions.create(**params)
+    if not stream:
+        record_llm_usage(response, model_name, endpoint)
+    return response
 
 
 if __name__ == "__main__":
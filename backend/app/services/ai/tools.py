@@ -1,7 +1,10 @@
+from backend.app.core.canonical import BirthMoment, Coordinates
+from backend.app.core.serialization import dumps_str
 from backend.app.services.divination.zodiac.engine import get_zodiac_engine
-import json
-
-engine = get_zodiac_engine()
+from backend.app.services.divination.zodiac.prompts import (
+    encode_chart,
+    encode_transits,
+)
 
 
 def get_daily_transit_context(
@@ -15,15 +18,15 @@ def get_daily_transit_context(
     Use this when the user asks about their daily horoscope, fortune, vibe, or planetary influences.
     """
     try:
-        data = engine.get_transit_natal_aspects(
-            birth_datetime=birth_datetime,
-            birth_coordinates=birth_coordinates,
-            transit_datetime=transit_datetime,
-            current_coordinates=current_coordinates,
+        data = get_zodiac_engine().get_transit_natal_aspects(
+            birth_datetime=BirthMoment.parse(birth_datetime),
+            birth_coordinates=Coordinates.parse(birth_coordinates),
+            transit_datetime=BirthMoment.parse(transit_datetime),
+            current_coordinates=Coordinates.parse(current_coordinates),
         )
-        return json.dumps(data)
+        return encode_transits(data)
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return dumps_str({"error": str(e)})
 
 
 def get_natal_chart_context(
@@ -35,13 +38,13 @@ def get_natal_chart_context(
     Use this when the user asks about their personal astrology (e.g., 'What is my moon sign?', 'Do I have any squares?').
     """
     try:
-        data = engine.get_portrait(
-            datetime=birth_datetime,
-            coordinates=birth_coordinates,
+        data = get_zodiac_engine().get_portrait(
+            datetime=BirthMoment.parse(birth_datetime),
+            coordinates=Coordinates.parse(birth_coordinates),
         )
-        return json.dumps(data)
+        return encode_chart(data)
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return dumps_str({"error": str(e)})
 
 
 # Tool Definition for the AI
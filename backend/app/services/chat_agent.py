@@ -1,7 +1,8 @@
 import json
 import logging
 from datetime import datetime, timezone
-from backend.app.services.ai.chat import get_chat_completion
+from backend.app.core.metrics import record_llm_usage, timed, track
+from backend.app.services.ai.chat import MODEL_NAME, get_chat_completion
 from backend.app.services.ai.tools import (
     TRANSIT_TOOL_DEFINITION,
     NATAL_CHART_TOOL_DEFINITION,
@@ -11,6 +12,27 @@ from backend.app.services.ai.tools import (
 
 logger = logging.getLogger(__name__)
 
+# The system prompt and tools open every request unchanged, with nothing
+# per-user in them, so providers can serve them from their prefix cache.
+SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": """You are a mystic AI astrologer.
+Your goal is to answer questions using astrological insights.
+
+TOOLS:
+1. 'get_daily_transit_context': Use this if the user asks about their day, current vibe, or future planetary influence.
+2. 'get_natal_chart_context': Use this if the user asks about their specific chart placements (e.g., 'What is my rising sign?', 'Do I have a Scorpio Moon?', 'Explain my 7th house').
+
+Do not guess. Use the appropriate tool to get the real data.
+
+When interpreting tool output:
+- Be empathetic but honest.
+- Explain technical terms simply.
+- Keep it conversational.
+""",
+}
+TOOLS = [TRANSIT_TOOL_DEFINITION, NATAL_CHART_TOOL_DEFINITION]
+
 
 def extract_transit_datetime(transit_dt_str: str) -> str:
     if transit_dt_str:
@@ -43,31 +65,19 @@ class ZodiacAgent:
             self.user_context["current_coordinates"] = self.user_context[
                 "birth_coordinates"
             ]
-        logger.info(f"ZodiacAgent initialized for user: {self.user_context}")
+        logger.info(
+            "ZodiacAgent initialized", extra={"user_context": self.user_context}
+        )
 
     def _get_system_prompt(self):
-        return {
-            "role": "system",
-            "content": """You are a mystic AI astrologer.            
-            Your goal is to answer questions using astrological insights.
-            
-            TOOLS:
-            1. 'get_daily_transit_context': Use this if the user asks about their day, current vibe, or future planetary influence.
-            2. 'get_natal_chart_context': Use this if the user asks about their specific chart placements (e.g., 'What is my rising sign?', 'Do I have a Scorpio Moon?', 'Explain my 7th house').
-            
-            Do not guess. Use the appropriate tool to get the real data.
-            
-            When interpreting tool output:
-            - Be empathetic but honest.
-            - Explain technical terms simply.
-            - Keep it conversational.
-            """,
-        }
+        return SYSTEM_MESSAGE
 
     def _execute_tool(self, tool_call):
         name = tool_call.function.name
         args = json.loads(tool_call.function.arguments)
-        logger.info(f"Agent executing tool: {name} with arguments: {args}")
+        logger.info(
+            "Agent executing tool", extra={"tool": name, "tool_arguments": args}
+        )
 
         if name == "get_daily_transit_context":
             transit_dt_str = args.get(
@@ -76,7 +86,10 @@ class ZodiacAgent:
 
             transit_dt_str = extract_transit_datetime(transit_dt_str)
 
-            logger.info(f"Transit datetime: {transit_dt_str}")
+            logger.info(
+                "Transit datetime resolved",
+                extra={"transit_datetime": transit_dt_str},
+            )
 
             result = get_daily_transit_context(
                 birth_datetime=self.user_context["birth_datetime"],
@@ -84,7 +97,9 @@ class ZodiacAgent:
                 transit_datetime=transit_dt_str,
                 current_coordinates=self.user_context["current_coordinates"],
             )
-            logger.debug(f"Tool execution result: {result[:200]}...")
+            logger.debug(
+                "Tool execution result", extra={"tool": name, "result": result}
+            )
             return result
 
         elif name == "get_natal_chart_context":
@@ -92,29 +107,34 @@ class ZodiacAgent:
                 birth_datetime=self.user_context["birth_datetime"],
                 birth_coordinates=self.user_context["birth_coordinates"],
             )
-            logger.debug(f"Tool execution result: {result[:200]}...")
+            logger.debug(
+                "Tool execution result", extra={"tool": name, "result": result}
+            )
             return result
 
-        logger.warning(f"Attempted to execute unknown tool: {name}")
+        logger.warning("Attempted to execute unknown tool", extra={"tool": name})
         return json.dumps({"error": "Unknown tool"})
 
+    @timed("agent.prepare_chat")
     def _prepare_chat(self, conversation_history: list[dict]):
         messages = [self._get_system_prompt()] + conversation_history
-        tools = [TRANSIT_TOOL_DEFINITION, NATAL_CHART_TOOL_DEFINITION]
+        tools = TOOLS
 
         response = get_chat_completion(
-            messages=messages, tools=tools, tool_choice="auto"
+            messages=messages, tools=tools, tool_choice="auto", endpoint="chat"
         )
         response_msg = response.choices[0].message
 
         if response_msg.tool_calls:
             logger.info(
-                f"AI requested tool calls: {[tc.function.name for tc in response_msg.tool_calls]}"
+                "AI requested tool calls",
+                extra={"tools": [tc.function.name for tc in response_msg.tool_calls]},
             )
             messages.append(response_msg)
 
             for tool_call in response_msg.tool_calls:
-                tool_result = self._execute_tool(tool_call)
+                with track("agent.execute_tool", tool=tool_call.function.name):
+                    tool_result = self._execute_tool(tool_call)
                 messages.append(
                     {
                         "role": "tool",
@@ -130,7 +150,9 @@ class ZodiacAgent:
         logger.info("Agent starting new chat turn")
         result, tools, needs_final_call = self._prepare_chat(conversation_history)
         if needs_final_call:
-            final_response = get_chat_completion(messages=result, tools=tools)
+            final_response = get_chat_completion(
+                messages=result, tools=tools, endpoint="chat"
+            )
             return final_response.choices[0].message.content
         return result
 
@@ -139,9 +161,14 @@ class ZodiacAgent:
         logger.info("Agent starting new streaming chat turn")
         result, tools, needs_final_call = self._prepare_chat(conversation_history)
         if needs_final_call:
-            stream = get_chat_completion(messages=result, tools=tools, stream=True)
+            stream = get_chat_completion(
+                messages=result, tools=tools, stream=True, endpoint="chat"
+            )
             for chunk in stream:
                 if chunk.choices and chunk.choices[0].delta.content:
                     yield chunk.choices[0].delta.content
+                # The last chunk carries the usage of the whole stream.
+                if getattr(chunk, "usage", None):
+                    record_llm_usage(chunk, MODEL_NAME, "chat")
         else:
             yield result or ""
@@ -0,0 +1,288 @@
+"""
+Bulk portrait and daily transit generation.
+
+Items describing the same chart, in any spelling, are generated once, and every distinct city
+is geocoded once, a few at a time (BATCH_GEOCODE_CONCURRENCY). Upstream chart fetches run on a small thread pool
+(BATCH_CHART_CONCURRENCY) and LLM generations on a larger one
+(BATCH_LLM_CONCURRENCY), both at background upstream priority so
+interactive traffic keeps its share of the Prokerala quota. Results are
+yielded per item, in completion order, as soon as their chart is done.
+"""
+
+import asyncio
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable, Hashable
+
+from backend.app.core.canonical import BirthMoment, Coordinates
+from backend.app.core.geocode_cache import normalize_query
+from backend.app.core.location import (
+    GeocodeRateLimitError,
+    GeopyError,
+    get_coordinates_async,
+)
+from backend.app.core.quota import Priority, UpstreamBusyError, upstream_priority
+from backend.app.schemas.zodiac import ZodiacDailyTransitRequest, ZodiacPortraitRequest
+from backend.app.services.profiles import ProfileNotFoundError, with_profile
+
+from .daily import anchor_transit_datetime
+from .engine import get_zodiac_engine
+
+POOL_SIZES = {
+    "chart": int(os.getenv("BATCH_CHART_CONCURRENCY", "4")),
+    "llm": int(os.getenv("BATCH_LLM_CONCURRENCY", "8")),
+}
+# Geocoder misses each hold a default executor thread while they wait for
+# the 1 request/second Nominatim limit, so only a few run at once.
+GEOCODE_CONCURRENCY = int(os.getenv("BATCH_GEOCODE_CONCURRENCY", "2"))
+
+_pools: dict[str, ThreadPoolExecutor] = {}
+_pools_pid: int | None = None
+_pools_lock = threading.Lock()
+
+
+def _pool(name: str) -> ThreadPoolExecutor:
+    global _pools_pid
+    with _pools_lock:
+        # Pool threads do not survive fork(); each process gets its own.
+        if _pools_pid != os.getpid():
+            _pools.clear()
+            _pools_pid = os.getpid()
+        pool = _pools.get(name)
+        if pool is None:
+            pool = _pools[name] = ThreadPoolExecutor(
+                POOL_SIZES[name], thread_name_prefix=f"batch-{name}"
+            )
+        return pool
+
+
+async def _run(pool: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+    def call():
+        with upstream_priority(Priority.BACKGROUND):
+            return func(*args, **kwargs)
+
+    # Carry the request's trace context into the pool thread.
+    context = contextvars.copy_context()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_pool(pool), context.run, call)
+
+
+def error_status(error: BaseException) -> int:
+    """
+    The HTTP status describing a failed generation.
+    """
+    if isinstance(error, UpstreamBusyError):
+        return 503
+    if isinstance(error, (GeopyError, ProfileNotFoundError)):
+        return 404
+    if isinstance(error, GeocodeRateLimitError):
+        return 429
+    if isinstance(error, ValueError):
+        return 400
+    return 500
+
+
+def _error(index: int, error: BaseException) -> dict[str, Any]:
+    result: dict[str, Any] = {"index": index, "error": str(error)}
+    if isinstance(error, UpstreamBusyError):
+        result["retry_after"] = error.retry_after
+    return {**result, "status": error_status(error)}
+
+
+async def _geocode(cities: set[str]) -> dict[str, str | BaseException]:
+    """
+    Resolve each distinct city once, at most GEOCODE_CONCURRENCY at a
+    time. Failures are returned, not raised.
+    """
+    semaphore = asyncio.Semaphore(GEOCODE_CONCURRENCY)
+
+    async def resolve(city: str) -> str | BaseException:
+        try:
+            async with semaphore:
+                coordinates = await get_coordinates_async(city)
+        except Exception as e:
+            return e
+        return coordinates or GeopyError("Location not found for city: " + city)
+
+    queries = {normalize_query(city): city for city in cities}
+    results = await asyncio.gather(*(resolve(city) for city in queries.values()))
+    return dict(zip(queries, results))
+
+
+def _coordinates(coordinates: str | None, city: str | None, places: dict) -> str | None:
+    if coordinates:
+        return coordinates
+    if not city:
+        return None
+    place = places[normalize_query(city)]
+    if isinstance(place, BaseException):
+        raise place
+    return place
+
+
+async def _completed(
+    groups: dict[Hashable, list[int]],
+    generate: Callable[[Hashable], Awaitable[Any]],
+) -> AsyncIterator[tuple[list[int], Any]]:
+    """
+    Generate every group once, yielding (item indices, result or exception)
+    as each finishes.
+    """
+
+    async def run(key):
+        try:
+            return key, await generate(key)
+        except Exception as e:
+            return key, e
+
+    tasks = [asyncio.ensure_future(run(key)) for key in groups]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            key, outcome = await next_done
+            yield groups[key], outcome
+    finally:
+        # The client went away; results already computed stay cached.
+        for task in tasks:
+            task.cancel()
+
+
+async def _results(groups, generate) -> AsyncIterator[dict[str, Any]]:
+    async for indices, outcome in _completed(groups, generate):
+        for index in indices:
+            if isinstance(outcome, BaseException):
+                yield _error(index, outcome)
+            else:
+                yield {
+                    "index": index,
+                    "status": 200,
+                    "result": outcome.model_dump(mode="json"),
+                }
+
+
+async def _with_profiles(items: list) -> list:
+    """
+    Fill in the items' profiles; items whose profile cannot be loaded are
+    replaced by the exception.
+    """
+
+    async def resolve(item):
+        try:
+            return await asyncio.to_thread(with_profile, item)
+        except Exception as e:
+            return e
+
+    if not any(item.profile_id for item in items):
+        return items
+    return await asyncio.gather(*(resolve(item) for item in items))
+
+
+async def stream_portraits(
+    items: list[ZodiacPortraitRequest],
+) -> AsyncIterator[dict[str, Any]]:
+    items = await _with_profiles(items)
+    requests = [i for i in items if not isinstance(i, Exception)]
+    places = await _geocode({i.city for i in requests if not i.coordinates and i.city})
+
+    groups: dict[tuple[BirthMoment, Coordinates], list[int]] = {}
+    for index, item in enumerate(items):
+        try:
+            if isinstance(item, Exception):
+                raise item
+            if not item.datetime:
+                raise ValueError("Either 'profile_id' or 'datetime' must be provided.")
+            coordinates = _coordinates(item.coordinates, item.city, places)
+            if not coordinates:
+                raise ValueError("Either 'coordinates' or 'city' must be provided.")
+            key = (BirthMoment.parse(item.datetime), Coordinates.parse(coordinates))
+        except Exception as e:
+            yield _error(index, e)
+            continue
+        groups.setdefault(key, []).append(index)
+
+    engine = get_zodiac_engine()
+
+    async def generate(key):
+        await _run("chart", engine.get_portrait, *key)
+        return await _run("llm", engine.get_ai_portrait, *key)
+
+    async for result in _results(groups, generate):
+        yield result
+
+
+async def stream_daily_transits(
+    items: list[ZodiacDailyTransitRequest],
+) -> AsyncIterator[dict[str, Any]]:
+    items = await _with_profiles(items)
+    cities = set()
+    for item in items:
+        if isinstance(item, Exception):
+            continue
+        if not item.birth_coordinates and item.birth_city:
+            cities.add(item.birth_city)
+        if not item.current_coordinates and item.current_city:
+            cities.add(item.current_city)
+    places = await _geocode(cities)
+
+    groups: dict[tuple, list[int]] = {}
+    for index, item in enumerate(items):
+        try:
+            if isinstance(item, Exception):
+                raise item
+            if not item.birth_datetime:
+                raise ValueError(
+                    "Either 'profile_id' or 'birth_datetime' must be provided."
+                )
+            birth = _coordinates(item.birth_coordinates, item.birth_city, places)
+            if not birth:
+                raise ValueError(
+                    "Either 'birth_coordinates' or 'birth_city' must be provided."
+                )
+            current = (
+                _coordinates(item.current_coordinates, item.current_city, places)
+                or birth
+            )
+            transit_datetime = anchor_transit_datetime(
+                item.transit_datetime or datetime.now(timezone.utc).isoformat(),
+                current,
+            )
+            key = (
+                BirthMoment.parse(item.birth_datetime),
+                Coordinates.parse(birth),
+                BirthMoment.parse(transit_datetime),
+                Coordinates.parse(current),
+                item.ai_portrait,
+            )
+        except Exception as e:
+            yield _error(index, e)
+            continue
+        groups.setdefault(key, []).append(index)
+
+    engine = get_zodiac_engine()
+
+    async def generate(key):
+        birth_datetime, birth, transit_datetime, current, portrait = key
+        await _run(
+            "chart",
+            engine.get_transit_natal_aspects,
+            birth_datetime,
+            birth,
+            transit_datetime,
+            current,
+        )
+        if portrait is None:
+            await _run("chart", engine.get_portrait, birth_datetime, birth)
+        return await _run(
+            "llm",
+            engine.get_ai_daily_transit,
+            birth_datetime=birth_datetime,
+            birth_coordinates=birth,
+            transit_datetime=transit_datetime,
+            current_coordinates=current,
+            ai_portrait=portrait,
+        )
+
+    async for result in _results(groups, generate):
+        yield result
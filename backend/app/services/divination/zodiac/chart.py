@@ -0,0 +1,297 @@
+"""
+Compact natal charts.
+
+Natal charts are cached by the hundred thousand, and as nested dicts each
+one costs a few kilobytes. A `NatalChart` keeps the same data in a fixed
+layout instead: one sign, house and degree per profile body, the twelve
+house cusps, and the key aspects, with enum ids for bodies, signs and
+aspect types. It reads like the dict it replaces (`chart["profile"]`,
+`as_dict()`, `to_json()`), building those views on demand, and packs into
+a few hundred bytes for the shared cache.
+"""
+
+import logging
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+from enum import IntEnum
+from typing import Any, Iterator
+
+from backend.app.core.serialization import dumps_str
+
+logger = logging.getLogger(__name__)
+
+
+class Body(IntEnum):
+    SUN = 0
+    MOON = 1
+    MERCURY = 2
+    VENUS = 3
+    MARS = 4
+    JUPITER = 5
+    SATURN = 6
+    URANUS = 7
+    NEPTUNE = 8
+    PLUTO = 9
+    ASCENDANT = 10
+    MID_HEAVEN = 11
+    CHIRON = 12
+    TRUE_NORTH_NODE = 13
+    TRUE_SOUTH_NODE = 14
+    LILITH = 15
+    DESCENDANT = 16
+    NADIR = 17
+
+
+class Sign(IntEnum):
+    ARIES = 0
+    TAURUS = 1
+    GEMINI = 2
+    CANCER = 3
+    LEO = 4
+    VIRGO = 5
+    LIBRA = 6
+    SCORPIO = 7
+    SAGITTARIUS = 8
+    CAPRICORN = 9
+    AQUARIUS = 10
+    PISCES = 11
+
+
+class Aspect(IntEnum):
+    CONJUNCTION = 0
+    OPPOSITION = 1
+    SQUARE = 2
+    TRINE = 3
+    SEXTILE = 4
+
+
+# Names as Prokerala spells them.
+BODY_NAMES = (
+    "Sun",
+    "Moon",
+    "Mercury",
+    "Venus",
+    "Mars",
+    "Jupiter",
+    "Saturn",
+    "Uranus",
+    "Neptune",
+    "Pluto",
+    "Ascendant",
+    "Mid Heaven",
+    "Chiron",
+    "True North Node",
+    "True South Node",
+    "Lilith",
+    "Descendant",
+    "Nadir",
+)
+SIGN_NAMES = tuple(sign.name.title() for sign in Sign)
+ASPECT_NAMES = tuple(aspect.name.title() for aspect in Aspect)
+
+_bodies = {name: Body(i) for i, name in enumerate(BODY_NAMES)}
+_signs = {name: Sign(i) for i, name in enumerate(SIGN_NAMES)}
+_aspects = {name: Aspect(i) for i, name in enumerate(ASPECT_NAMES)}
+
+# The bodies of the "profile" view, with their keys there. Planets have a
+# house, the angles do not.
+PROFILE = tuple(Body(i) for i in range(Body.MID_HEAVEN + 1))
+PROFILE_KEYS = BODY_NAMES[: Body.ASCENDANT] + ("Ascendant", "MidHeaven")
+PLANETS = PROFILE[: Body.ASCENDANT]
+HOUSES = 12
+
+NO_SIGN = 0xFF
+NO_HOUSE = 0
+# Degrees and orbs are signed: Prokerala reports applying orbs as negative.
+ABSENT = -0x8000
+
+_VERSION = 2
+_header = struct.Struct(f"<B{len(PROFILE)}s{len(PROFILE)}s{HOUSES}sH")
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _sign_id(name: str | None) -> int:
+    if name is None:
+        return NO_SIGN
+    if name not in _signs:
+        raise ValueError(f"Unknown sign: {name!r}")
+    return _signs[name]
+
+
+class NatalChart(Mapping):
+    """
+    A natal chart. Degrees are kept to a tenth of a degree within their
+    sign and orbs to a hundredth, as the chart is generated.
+    """
+
+    __slots__ = ("signs", "houses", "degrees", "cusps", "aspects")
+
+    def __init__(
+        self,
+        signs: bytes,
+        houses: bytes,
+        degrees: array,
+        cusps: bytes,
+        aspects: array,
+    ):
+        # Per profile body: sign id, house number, tenths of a degree.
+        self.signs = signs
+        self.houses = houses
+        self.degrees = degrees
+        # Sign id of each house cusp, first house first.
+        self.cusps = cusps
+        # Flat (body, body, aspect id, signed hundredths of a degree of orb).
+        self.aspects = aspects
+
+    @classmethod
+    def from_dict(cls, chart: dict[str, Any]) -> "NatalChart":
+        """
+        Pack a chart in its dict form. Raises ValueError for a sign name
+        it does not know, which it could not give back. Aspects of bodies or
+        types without an id are left out, and logged.
+        """
+        signs = bytearray([NO_SIGN]) * len(PROFILE)
+        houses = bytearray(len(PROFILE))
+        degrees = array("h", [ABSENT]) * len(PROFILE)
+        for body, key in zip(PROFILE, PROFILE_KEYS):
+            position = chart["profile"].get(key)
+            if position is None:
+                continue
+            signs[body] = _sign_id(position.get("sign"))
+            houses[body] = position.get("house") or NO_HOUSE
+            degrees[body] = round(position["degree"] * 10)
+
+        cusps = bytearray([NO_SIGN]) * HOUSES
+        for number, sign in chart["house_cusps"].items():
+            cusps[int(number) - 1] = _sign_id(sign)
+
+        aspects = array("h")
+        for aspect in chart["key_aspects"]:
+            ids = (
+                _bodies.get(aspect["p1"]),
+                _bodies.get(aspect["p2"]),
+                _aspects.get(aspect["type"]),
+            )
+            if None in ids:
+                logger.warning(
+                    "Leaving out aspect without an id",
+                    extra={"aspect": aspect},
+                )
+                continue
+            aspects.extend((*ids, round(aspect["orb"] * 100)))
+
+        return cls(bytes(signs), bytes(houses), degrees, bytes(cusps), aspects)
+
+    def position(self, body: Body) -> dict[str, Any] | None:
+        if self.degrees[body] == ABSENT:
+            return None
+        sign = self.signs[body]
+        position = {"sign": SIGN_NAMES[sign] if sign != NO_SIGN else None}
+        if body in PLANETS:
+            position["house"] = self.houses[body] or None
+        position["degree"] = self.degrees[body] / 10
+        return position
+
+    def longitude(self, body: Body) -> float | None:
+        """
+        The ecliptic longitude of `body`, from its sign and degree.
+        """
+        sign = self.signs[body]
+        if self.degrees[body] == ABSENT or sign == NO_SIGN:
+            return None
+        return sign * 30 + self.degrees[body] / 10
+
+    def iter_aspects(self) -> Iterator[tuple[Body, Body, Aspect, float]]:
+        values = self.aspects
+        for i in range(0, len(values), 4):
+            yield (
+                Body(values[i]),
+                Body(values[i + 1]),
+                Aspect(values[i + 2]),
+                values[i + 3] / 100,
+            )
+
+    def as_dict(self) -> dict[str, Any]:
+        """
+        The chart in the dict form `get_portrait` used to return, built on
+        every call.
+        """
+        profile = {}
+        for body, key in zip(PROFILE, PROFILE_KEYS):
+            position = self.position(body)
+            if position is not None:
+                profile[key] = position
+        return {
+            "profile": profile,
+            "key_aspects": [
+                {
+                    "p1": BODY_NAMES[p1],
+                    "p2": BODY_NAMES[p2],
+                    "type": ASPECT_NAMES[aspect],
+                    "orb": orb,
+                }
+                for p1, p2, aspect, orb in self.iter_aspects()
+            ],
+            "house_cusps": {
+                str(number): SIGN_NAMES[sign]
+                for number, sign in enumerate(self.cusps, start=1)
+                if sign != NO_SIGN
+            },
+        }
+
+    def to_json(self) -> str:
+        return dumps_str(self.as_dict())
+
+    def to_bytes(self) -> bytes:
+        return (
+            _header.pack(
+                _VERSION,
+                self.signs,
+                self.houses,
+                self.cusps,
+                len(self.aspects) // 4,
+            )
+            + _little_endian(self.degrees)
+            + _little_endian(self.aspects)
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "NatalChart":
+        version, signs, houses, cusps, count = _header.unpack_from(data)
+        if version != _VERSION:
+            raise ValueError(f"Unsupported natal chart encoding: {version}")
+        values = array("h")
+        values.frombytes(data[_header.size :])
+        if sys.byteorder == "big":
+            values.byteswap()
+        if len(values) != len(PROFILE) + 4 * count:
+            raise ValueError("Truncated natal chart encoding")
+        return cls(
+            signs,
+            houses,
+            values[: len(PROFILE)],
+            cusps,
+            values[len(PROFILE) :],
+        )
+
+    # Read-only mapping over the dict view, for code written against it.
+
+    def __getitem__(self, key: str) -> Any:
+        return self.as_dict()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(("profile", "key_aspects", "house_cusps"))
+
+    def __len__(self) -> int:
+        return 3
+
+    def __repr__(self) -> str:
+        return f"NatalChart({self.as_dict()!r})"
@@ -0,0 +1,53 @@
+"""
+The local day a daily transit is for.
+
+A daily transit describes the user's day, not the instant they opened the
+app, so it is computed for one anchor moment per local day at the user's
+current location: DAILY_TRANSIT_ANCHOR_HOUR o'clock local time. Requests
+made at any time of that day then share one chart, one generation and one
+cache entry, which can also be computed ahead of time.
+"""
+
+import os
+from datetime import date, datetime, time, timedelta
+from datetime import timezone as dt_timezone
+from zoneinfo import ZoneInfo
+
+from backend.app.core.location import get_timezone
+
+ANCHOR_HOUR = int(os.getenv("DAILY_TRANSIT_ANCHOR_HOUR", "12"))
+
+
+def timezone_at(coordinates: str) -> str:
+    latitude, longitude = map(float, coordinates.split(","))
+    return get_timezone(latitude, longitude) or "UTC"
+
+
+def day_anchor(day: date, timezone: str) -> str:
+    """
+    The anchor moment of `day` in `timezone`, as an ISO string.
+    """
+    return datetime.combine(day, time(ANCHOR_HOUR), ZoneInfo(timezone)).isoformat()
+
+
+def anchor_transit_datetime(transit_datetime: str, coordinates: str) -> str:
+    """
+    The anchor of the local day `transit_datetime` falls on at `coordinates`.
+    A datetime without an offset is taken as local time there.
+    """
+    timezone = timezone_at(coordinates)
+    moment = datetime.fromisoformat(transit_datetime)
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(ZoneInfo(timezone))
+    return day_anchor(moment.date(), timezone)
+
+
+def seconds_left_in_day(coordinates: str, now: datetime | None = None) -> int:
+    """
+    Seconds until the next local midnight at `coordinates`, when the daily
+    transit for today stops being the one to show.
+    """
+    zone = ZoneInfo(timezone_at(coordinates))
+    now = (now or datetime.now(dt_timezone.utc)).astimezone(zone)
+    midnight = datetime.combine(now.date() + timedelta(days=1), time(), zone)
+    return int((midnight.astimezone(dt_timezone.utc) - now).total_seconds())
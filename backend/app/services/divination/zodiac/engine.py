@@ -1,13 +1,27 @@
-from app.core.location import get_coordinates
-from functools import cache
-import json
+from backend.app.core.location import get_coordinates
+import base64
+import os
 from pydantic import BaseModel, ValidationError
 from typing import Any
 from pprint import pprint
 
 from backend.app.services.ai.chat import get_chat_response
+from backend.app.core.canonical import BirthMoment, Coordinates
+from backend.app.core.metrics import retries, timed, track
+from backend.app.core.serialization import JSONDecodeError, PreserializedModel, loads
 from backend.app.core.prokerala import get_client as prokerala_client
-from .prompts import portrait_prompt, daily_transit_prompt
+from backend.app.core.shared_cache import shared_store_from_env
+from backend.app.core.startup import Lazy
+from backend.app.core.swr_cache import StaleWhileRevalidateCache
+from .chart import NatalChart
+from .daily import anchor_transit_datetime
+from .prompts import (
+    daily_transit_prompt,
+    daily_transit_prompt_data,
+    portrait_data,
+    portrait_prompt,
+    prompt_messages,
+)
 import logging
 
 logger = logging.getLogger(__name__)
@@ -19,7 +33,7 @@ class PortraitSection(BaseModel):
     summary: str
 
 
-class Portrait(BaseModel):
+class Portrait(PreserializedModel):
     model_config = {"frozen": True}
     core_identity: PortraitSection
     psychological_dynamics: PortraitSection
@@ -27,7 +41,7 @@ class Portrait(BaseModel):
     growth_pathway: PortraitSection
 
 
-class DailyTransit(BaseModel):
+class DailyTransit(PreserializedModel):
     headline: str
     energy: str
     the_tension: str
@@ -35,6 +49,14 @@ class DailyTransit(BaseModel):
     pro_tip: str
 
 
+def _encode_chart(chart: NatalChart) -> str:
+    return base64.b64encode(chart.to_bytes()).decode("ascii")
+
+
+def _decode_chart(encoded: str) -> NatalChart:
+    return NatalChart.from_bytes(base64.b64decode(encoded))
+
+
 class ZodiacPortraitError(Exception):
     pass
 
@@ -87,12 +109,48 @@ class ZodiacEngine:
         self.prokerala_client = prokerala_client()
         self.portrait_prompt = portrait_prompt
         self.daily_transit_prompt = daily_transit_prompt
+        # Served stale while refreshed in the background, so an upstream
+        # outage only affects users we have never seen. LLM generations and
+        # charts, which cost Prokerala quota, are shared with the other
+        # workers, so one made by a background job or another worker is
+        # never made twice.
+        shared = shared_store_from_env()
+        self.chart_cache = StaleWhileRevalidateCache(
+            "natal_chart",
+            ttl=float(os.getenv("CHART_CACHE_TTL", "2592000")),
+            shared=shared,
+            encode=_encode_chart,
+            decode=_decode_chart,
+        )
+        self.transit_cache = StaleWhileRevalidateCache(
+            "transit_aspects", ttl=float(os.getenv("TRANSIT_CACHE_TTL", "86400"))
+        )
+        self.portrait_cache = StaleWhileRevalidateCache(
+            "ai_portrait",
+            ttl=float(os.getenv("PORTRAIT_CACHE_TTL", "604800")),
+            shared=shared,
+            encode=Portrait.model_dump_json,
+            decode=Portrait.model_validate_json,
+        )
+        self.daily_transit_cache = StaleWhileRevalidateCache(
+            "daily_transit",
+            ttl=float(os.getenv("DAILY_TRANSIT_CACHE_TTL", "86400")),
+            shared=shared,
+            encode=DailyTransit.model_dump_json,
+            decode=DailyTransit.model_validate_json,
+        )
 
-    def get_portrait(self, datetime: str, coordinates: str) -> dict[str, Any]:
+    @timed("engine.get_portrait")
+    def get_portrait(
+        self, datetime: str | BirthMoment, coordinates: str | Coordinates
+    ) -> NatalChart:
         """
         Retrieves the astrological portrait for a given datetime and coordinates.
+        Both are canonicalized first, so every spelling of the same chart
+        shares one cache entry and one upstream call.
 
-        Example return value:
+        The chart is returned in its compact form; its dict view
+        (`as_dict()`, or indexing it) looks like this:
         {
           "profile": {
             "Sun": { "sign": "Aquarius", "house": 8, "degree": 23.0 },
@@ -116,8 +174,18 @@ class ZodiacEngine:
         }
         """
 
+        moment = BirthMoment.parse(datetime)
+        place = Coordinates.parse(coordinates)
+        return self.chart_cache.get(
+            (moment, place),
+            lambda: self._build_portrait(moment, place),
+        )
+
+    def _build_portrait(
+        self, datetime: str | BirthMoment, coordinates: str | Coordinates
+    ) -> NatalChart:
         response = self.prokerala_client.get_natal_planet_position(
-            datetime=datetime, coordinates=coordinates
+            datetime=str(datetime), coordinates=str(coordinates)
         )
 
         if response.get("status") != "ok":
@@ -171,31 +239,50 @@ class ZodiacEngine:
             if number and sign:
                 house_cusps[str(number)] = sign
 
-        return {
-            "profile": profile,
-            "key_aspects": key_aspects,
-            "house_cusps": house_cusps,
-        }
+        return NatalChart.from_dict(
+            {
+                "profile": profile,
+                "key_aspects": key_aspects,
+                "house_cusps": house_cusps,
+            }
+        )
+
+    @timed("engine.get_ai_portrait")
+    def get_ai_portrait(
+        self, datetime: str | BirthMoment, coordinates: str | Coordinates
+    ) -> Portrait:
+        moment = BirthMoment.parse(datetime)
+        place = Coordinates.parse(coordinates)
+        return self.portrait_cache.get(
+            (moment, place),
+            lambda: self._generate_ai_portrait(moment, place),
+        )
 
-    @cache
-    def get_ai_portrait(self, datetime: str, coordinates: str) -> Portrait:
+    def _generate_ai_portrait(
+        self, datetime: str | BirthMoment, coordinates: str | Coordinates
+    ) -> Portrait:
         portrait = self.get_portrait(datetime, coordinates)
-        prompt = self.portrait_prompt.format(DATA=portrait)
+        messages = prompt_messages(self.portrait_prompt, portrait_data(portrait))
 
-        for _ in range(self.ai_retries):
+        for attempt in range(self.ai_retries):
+            if attempt:
+                retries.inc(stage="engine.get_ai_portrait")
             try:
                 response = get_chat_response(
-                    messages=[{"role": "user", "content": prompt}],
+                    messages=messages,
                     response_format={"type": "json_object"},
+                    endpoint="portrait",
+                )
+                logger.info(
+                    "AI portrait generated", extra={"response_chars": len(response)}
                 )
-                logger.info({"title": "AI portrait generated", "response": response})
-                return Portrait(**json.loads(response))
-            except (json.JSONDecodeError, ValidationError):
+                logger.debug("AI portrait response", extra={"response": response})
+                with track("engine.portrait_validation"):
+                    return Portrait(**loads(response))
+            except (JSONDecodeError, ValidationError):
                 logger.error(
-                    {
-                        "title": "Failed to generate a valid AI portrait",
-                        "response": response,
-                    }
+                    "Failed to generate a valid AI portrait",
+                    extra={"response": response},
                 )
                 continue
 
@@ -203,6 +290,7 @@ class ZodiacEngine:
             f"Failed to generate a valid AI portrait after {self.ai_retries} retries."
         )
 
+    @timed("engine.clean_transit_data")
     def _clean_transit_data(self, api_response, top_k: int = 3):
         raw_aspects = api_response.get("data", {}).get("transit_natal_aspects", [])
         hard_aspects = []
@@ -243,52 +331,92 @@ class ZodiacEngine:
 
     def get_transit_natal_aspects(
         self,
-        birth_datetime: str,
-        birth_coordinates: str,
-        transit_datetime: str,
-        current_coordinates: str,
+        birth_datetime: str | BirthMoment,
+        birth_coordinates: str | Coordinates,
+        transit_datetime: str | BirthMoment,
+        current_coordinates: str | Coordinates,
     ) -> dict[str, Any]:
-        response = self.prokerala_client.get_transit_planet_position(
-            birth_datetime, birth_coordinates, transit_datetime, current_coordinates
+        key = (
+            BirthMoment.parse(birth_datetime),
+            Coordinates.parse(birth_coordinates),
+            BirthMoment.parse(transit_datetime),
+            Coordinates.parse(current_coordinates),
         )
 
-        return self._clean_transit_data(response)
+        def load():
+            response = self.prokerala_client.get_transit_planet_position(*map(str, key))
+            return self._clean_transit_data(response)
 
+        return self.transit_cache.get(key, load)
+
+    @timed("engine.get_ai_daily_transit")
     def get_ai_daily_transit(
         self,
-        birth_datetime: str,
-        transit_datetime: str,
-        current_coordinates: str,
+        birth_datetime: str | BirthMoment,
+        transit_datetime: str | BirthMoment,
+        current_coordinates: str | Coordinates,
         ai_portrait: Portrait | None = None,
         birth_city: str | None = None,
-        birth_coordinates: str | None = None,
+        birth_coordinates: str | Coordinates | None = None,
     ) -> DailyTransit:
+        """
+        The daily transit for the local day of `transit_datetime` at
+        `current_coordinates`; any moment of the day gives the same result.
+        """
         if not birth_coordinates:
             if not birth_city:
                 raise ValueError(
                     "birth_city is required if birth_coordinates is not provided"
                 )
             birth_coordinates = get_coordinates(birth_city)
+        key = (
+            BirthMoment.parse(birth_datetime),
+            Coordinates.parse(birth_coordinates),
+            BirthMoment.parse(
+                anchor_transit_datetime(str(transit_datetime), str(current_coordinates))
+            ),
+            Coordinates.parse(current_coordinates),
+            ai_portrait,
+        )
+        return self.daily_transit_cache.get(
+            key, lambda: self._generate_ai_daily_transit(*key)
+        )
+
+    def _generate_ai_daily_transit(
+        self,
+        birth_datetime: str | BirthMoment,
+        birth_coordinates: str | Coordinates,
+        transit_datetime: str | BirthMoment,
+        current_coordinates: str | Coordinates,
+        ai_portrait: Portrait | None = None,
+    ) -> DailyTransit:
         transit_data = self.get_transit_natal_aspects(
             birth_datetime, birth_coordinates, transit_datetime, current_coordinates
         )
         portrait = ai_portrait or self.get_ai_portrait(
             birth_datetime, birth_coordinates
         )
-        prompt = self.daily_transit_prompt.format(
-            USER_PORTRAIT=portrait, TRANSIT_DATA=transit_data
+        messages = prompt_messages(
+            self.daily_transit_prompt,
+            daily_transit_prompt_data(portrait, transit_data),
         )
-        for _ in range(self.ai_retries):
+        for attempt in range(self.ai_retries):
+            if attempt:
+                retries.inc(stage="engine.get_ai_daily_transit")
             try:
                 response = get_chat_response(
-                    messages=[{"role": "user", "content": prompt}],
+                    messages=messages,
                     response_format={"type": "json_object"},
+                    endpoint="daily_transit",
                 )
                 logger.info(
-                    {"title": "AI daily transit generated", "response": response}
+                    "AI daily transit generated",
+                    extra={"response_chars": len(response)},
                 )
-                return DailyTransit(**json.loads(response))
-            except (json.JSONDecodeError, ValidationError):
+                logger.debug("AI daily transit response", extra={"response": response})
+                with track("engine.daily_transit_validation"):
+                    return DailyTransit(**loads(response))
+            except (JSONDecodeError, ValidationError):
                 continue
 
         raise ZodiacDailyTransitError(
@@ -296,11 +424,11 @@ class ZodiacEngine:
         )
 
 
-_zodiac_engine = ZodiacEngine()
+_zodiac_engine = Lazy("zodiac_engine", ZodiacEngine)
 
 
 def get_zodiac_engine() -> ZodiacEngine:
-    return _zodiac_engine
+    return _zodiac_engine.get()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,80 @@
+"""
+Portrait and daily transit generation as background jobs.
+"""
+
+import os
+from datetime import datetime, timezone
+from typing import Any
+
+from backend.app.core.database import get_engine
+from backend.app.core.jobs import JobQueue, JobStore
+from backend.app.core.quota import Priority
+from backend.app.core.startup import Lazy
+from backend.app.schemas.zodiac import ZodiacDailyTransitRequest, ZodiacPortraitRequest
+from backend.app.services.profiles import resolve_place, with_profile
+
+from .batch import error_status
+from .engine import DailyTransit, Portrait, get_zodiac_engine
+
+PORTRAIT_JOB = "zodiac.portrait"
+DAILY_TRANSIT_JOB = "zodiac.daily_transit"
+DAILY_TRANSIT_PREGENERATE_JOB = "zodiac.daily_transit.pregenerate"
+
+
+def run_portrait_job(payload: dict[str, Any]) -> Portrait:
+    request = with_profile(ZodiacPortraitRequest.model_validate(payload))
+    if not request.datetime:
+        raise ValueError("Either 'profile_id' or 'datetime' must be provided.")
+    coordinates = resolve_place(request.coordinates, request.city)
+    if not coordinates:
+        raise ValueError("Either 'coordinates' or 'city' must be provided.")
+    return get_zodiac_engine().get_ai_portrait(request.datetime, coordinates)
+
+
+def run_daily_transit_job(payload: dict[str, Any]) -> DailyTransit:
+    request = with_profile(ZodiacDailyTransitRequest.model_validate(payload))
+    if not request.birth_datetime:
+        raise ValueError("Either 'profile_id' or 'birth_datetime' must be provided.")
+    birth_coordinates = resolve_place(request.birth_coordinates, request.birth_city)
+    if not birth_coordinates:
+        raise ValueError("Either 'birth_coordinates' or 'birth_city' must be provided.")
+    current_coordinates = (
+        resolve_place(request.current_coordinates, request.current_city)
+        or birth_coordinates
+    )
+    return get_zodiac_engine().get_ai_daily_transit(
+        birth_datetime=request.birth_datetime,
+        birth_coordinates=birth_coordinates,
+        transit_datetime=(
+            request.transit_datetime or datetime.now(timezone.utc).isoformat()
+        ),
+        current_coordinates=current_coordinates,
+        ai_portrait=request.ai_portrait,
+    )
+
+
+def _build_queue() -> JobQueue:
+    store = JobStore(get_engine(os.getenv("JOBS_DATABASE_URL")))
+    queue = JobQueue(
+        store,
+        workers=int(os.getenv("JOB_WORKERS", "4")),
+        poll_interval=float(os.getenv("JOB_POLL_INTERVAL", "1")),
+        lease=float(os.getenv("JOB_LEASE", "300")),
+        max_attempts=int(os.getenv("JOB_MAX_ATTEMPTS", "3")),
+        upstream_timeout=float(os.getenv("JOB_UPSTREAM_TIMEOUT", "60")),
+        retention=float(os.getenv("JOB_RETENTION", "86400")),
+        error_status=error_status,
+    )
+    queue.register(PORTRAIT_JOB, run_portrait_job)
+    queue.register(DAILY_TRANSIT_JOB, run_daily_transit_job)
+    queue.register(
+        DAILY_TRANSIT_PREGENERATE_JOB, run_daily_transit_job, Priority.BACKGROUND
+    )
+    return queue
+
+
+_job_queue = Lazy("jobs", _build_queue)
+
+
+def get_job_queue() -> JobQueue:
+    return _job_queue.get()
@@ -0,0 +1,361 @@
+"""
+Nightly pre-generation of daily transits, staggered by timezone.
+
+Every user who asked for a daily transit in the last
+DAILY_TRANSIT_ACTIVE_DAYS days is remembered with the inputs of their
+request. Shortly before their local morning (DAILY_TRANSIT_MORNING_HOUR,
+less DAILY_TRANSIT_PREGENERATE_LEAD seconds) the transit for their coming
+day is queued as a background job, so the morning request is served from
+the shared cache instead of every region waking up to an upstream and LLM
+round-trip at once.
+
+Timezones sit on a timing wheel of DAILY_TRANSIT_WHEEL_SLOTS slots over the
+UTC day, by the moment their pre-generation is due. Every process ticks the
+wheel, but each slot is scheduled by whichever process claims it first, and
+its jobs are spread evenly over the slot to keep the load flat.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time as clock
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import (
+    Column,
+    Float,
+    MetaData,
+    String,
+    Table,
+    Text,
+    delete,
+    insert,
+    select,
+    update,
+)
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+
+from backend.app.core.database import get_engine
+from backend.app.core.jobs import JobQueue
+from backend.app.core.startup import Lazy
+
+from .daily import day_anchor, timezone_at
+from .engine import Portrait
+from .jobs import DAILY_TRANSIT_PREGENERATE_JOB, get_job_queue
+
+logger = logging.getLogger(__name__)
+
+DAY = 86400
+
+ENABLED = os.getenv("DAILY_TRANSIT_PREGENERATE", "true").lower() != "false"
+
+metadata = MetaData()
+
+daily_transit_users = Table(
+    "daily_transit_users",
+    metadata,
+    Column("key", String(64), primary_key=True),
+    Column("timezone", String(64), nullable=False, index=True),
+    Column("birth_datetime", String(64), nullable=False),
+    Column("birth_coordinates", String(64), nullable=False),
+    Column("current_coordinates", String(64), nullable=False),
+    Column("ai_portrait", Text),
+    Column("last_seen", Float, nullable=False, index=True),
+)
+
+wheel_ticks = Table(
+    "daily_transit_ticks",
+    metadata,
+    Column("slot", String(32), primary_key=True),
+    Column("claimed_at", Float, nullable=False),
+)
+
+
+class TimingWheel:
+    """
+    `slots` equal buckets over the UTC day. Each timezone is placed in the
+    bucket in which `lead` seconds before `hour` o'clock local time falls,
+    together with the local day that morning belongs to. The layout is
+    built per UTC day, as daylight saving time moves zones around.
+    """
+
+    def __init__(self, slots: int = 96, hour: int = 6, lead: float = 3600):
+        self.slots = slots
+        self.hour = hour
+        self.lead = lead
+        self.slot_seconds = DAY / slots
+        self.day: date | None = None
+        self.buckets: list[list[tuple[str, date]]] = [[] for _ in range(slots)]
+
+    def due_at(self, zone: str, local_day: date) -> datetime:
+        morning = datetime.combine(local_day, time(self.hour), ZoneInfo(zone))
+        return morning.astimezone(timezone.utc) - timedelta(seconds=self.lead)
+
+    def slot_start(self, day: date, slot: int) -> datetime:
+        midnight = datetime.combine(day, time(), timezone.utc)
+        return midnight + timedelta(seconds=slot * self.slot_seconds)
+
+    def slot_of(self, moment: datetime) -> int:
+        midnight = datetime.combine(moment.date(), time(), timezone.utc)
+        return int((moment - midnight).total_seconds() // self.slot_seconds)
+
+    def build(self, day: date, zones: set[str]) -> None:
+        self.day = day
+        self.buckets = [[] for _ in range(self.slots)]
+        for zone in zones:
+            self.add(zone)
+
+    def add(self, zone: str) -> None:
+        # The local morning due on this UTC day can fall on the local day
+        # before or after it.
+        for offset in (-1, 0, 1):
+            local_day = self.day + timedelta(days=offset)
+            due = self.due_at(zone, local_day)
+            entry = (zone, local_day)
+            if due.date() == self.day and entry not in self.bucket(due):
+                self.bucket(due).append(entry)
+
+    def bucket(self, moment: datetime) -> list[tuple[str, date]]:
+        return self.buckets[self.slot_of(moment)]
+
+
+def _user_key(*inputs: Any) -> str:
+    return hashlib.sha256(json.dumps(inputs).encode()).hexdigest()
+
+
+class DailyTransitPregenerator:
+    def __init__(
+        self,
+        engine: Engine,
+        queue: JobQueue,
+        wheel: TimingWheel,
+        active_days: float = 7,
+    ):
+        self.engine = engine
+        self.queue = queue
+        self.wheel = wheel
+        self.active_days = active_days
+        metadata.create_all(engine)
+        self._seen: set[str] = set()
+        self._seen_day: date | None = None
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def remember(
+        self,
+        birth_datetime: str,
+        birth_coordinates: str,
+        current_coordinates: str,
+        ai_portrait: Portrait | None = None,
+    ) -> None:
+        """
+        Record a daily transit request, at most once per user and day.
+        """
+        portrait = ai_portrait.model_dump_json() if ai_portrait else None
+        key = _user_key(
+            birth_datetime, birth_coordinates, current_coordinates, portrait
+        )
+        today = datetime.now(timezone.utc).date()
+        with self._lock:
+            if self._seen_day != today:
+                self._seen, self._seen_day = set(), today
+            if key in self._seen:
+                return
+        zone = timezone_at(current_coordinates)
+        values = {"timezone": zone, "last_seen": clock.time()}
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(
+                    insert(daily_transit_users).values(
+                        key=key,
+                        birth_datetime=birth_datetime,
+                        birth_coordinates=birth_coordinates,
+                        current_coordinates=current_coordinates,
+                        ai_portrait=portrait,
+                        **values,
+                    )
+                )
+        except IntegrityError:
+            with self.engine.begin() as conn:
+                conn.execute(
+                    update(daily_transit_users)
+                    .where(daily_transit_users.c.key == key)
+                    .values(values)
+                )
+        with self._lock:
+            if self._seen_day == today:
+                self._seen.add(key)
+
+    def _zones(self) -> set[str]:
+        with self.engine.connect() as conn:
+            rows = conn.execute(
+                select(daily_transit_users.c.timezone)
+                .distinct()
+                .where(
+                    daily_transit_users.c.last_seen
+                    >= clock.time() - self.active_days * DAY
+                )
+            )
+            return {zone for (zone,) in rows}
+
+    def _claim(self, slot_start: datetime) -> bool:
+        """
+        Whether this process is the first to schedule the slot.
+        """
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(
+                    insert(wheel_ticks).values(
+                        slot=slot_start.strftime("%Y-%m-%dT%H:%M"),
+                        claimed_at=clock.time(),
+                    )
+                )
+        except IntegrityError:
+            return False
+        return True
+
+    def tick(self, now: datetime | None = None) -> int:
+        """
+        Schedule the wheel slot `now` falls in, unless another process has.
+        Returns the number of jobs queued.
+        """
+        now = now or datetime.now(timezone.utc)
+        with self._lock:
+            if self.wheel.day != now.date():
+                self._purge()
+            # Rebuilt every tick so zones of users first seen by another
+            # worker are included.
+            self.wheel.build(now.date(), self._zones())
+            due = list(self.wheel.bucket(now))
+            slot_start = self.wheel.slot_start(now.date(), self.wheel.slot_of(now))
+        if not due or not self._claim(slot_start):
+            return 0
+
+        users = []
+        with self.engine.connect() as conn:
+            for zone, local_day in due:
+                rows = conn.execute(
+                    select(daily_transit_users).where(
+                        daily_transit_users.c.timezone == zone,
+                        daily_transit_users.c.last_seen
+                        >= clock.time() - self.active_days * DAY,
+                    )
+                )
+                users.extend((row, day_anchor(local_day, zone)) for row in rows)
+
+        # Spread the slot's jobs evenly over what is left of it.
+        start = max(now, slot_start).timestamp()
+        remaining = slot_start.timestamp() + self.wheel.slot_seconds - start
+        for i, (user, transit_datetime) in enumerate(users):
+            payload = {
+                "birth_datetime": user.birth_datetime,
+                "birth_coordinates": user.birth_coordinates,
+                "current_coordinates": user.current_coordinates,
+                "transit_datetime": transit_datetime,
+            }
+            if user.ai_portrait:
+                payload["ai_portrait"] = json.loads(user.ai_portrait)
+            self.queue.submit(
+                DAILY_TRANSIT_PREGENERATE_JOB,
+                payload,
+                run_after=start + i * remaining / len(users),
+            )
+        logger.info(
+            "Daily transit pre-generation scheduled",
+            extra={"slot": slot_start.isoformat(), "jobs": len(users)},
+        )
+        return len(users)
+
+    def _purge(self) -> None:
+        """
+        Forget old slot claims, and users no longer active.
+        """
+        now = clock.time()
+        with self.engine.begin() as conn:
+            conn.execute(
+                delete(wheel_ticks).where(wheel_ticks.c.claimed_at < now - 2 * DAY)
+            )
+            conn.execute(
+                delete(daily_transit_users).where(
+                    daily_transit_users.c.last_seen < now - self.active_days * DAY
+                )
+            )
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="daily-transit-wheel", daemon=True
+                )
+                self._thread.start()
+
+    def warmup(self) -> None:
+        if ENABLED:
+            self.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.tick()
+            except Exception as e:
+                logger.warning(
+                    "Daily transit pre-generation failed", extra={"error": str(e)}
+                )
+            # Sleep until just past the start of the next slot.
+            delay = self.wheel.slot_seconds - clock.time() % self.wheel.slot_seconds
+            if self._stop.wait(delay + 1):
+                return
+
+
+def _build_pregenerator() -> DailyTransitPregenerator:
+    return DailyTransitPregenerator(
+        get_engine(os.getenv("JOBS_DATABASE_URL")),
+        get_job_queue(),
+        TimingWheel(
+            slots=int(os.getenv("DAILY_TRANSIT_WHEEL_SLOTS", "96")),
+            hour=int(os.getenv("DAILY_TRANSIT_MORNING_HOUR", "6")),
+            lead=float(os.getenv("DAILY_TRANSIT_PREGENERATE_LEAD", "3600")),
+        ),
+        active_days=float(os.getenv("DAILY_TRANSIT_ACTIVE_DAYS", "7")),
+    )
+
+
+_pregenerator = Lazy("daily_transit_pregenerator", _build_pregenerator)
+
+
+def get_daily_transit_pregenerator() -> DailyTransitPregenerator:
+    return _pregenerator.get()
+
+
+def remember_daily_transit_user(
+    birth_datetime: str,
+    birth_coordinates: str,
+    current_coordinates: str,
+    ai_portrait: Portrait | None = None,
+) -> None:
+    """
+    Record a served daily transit request, and make sure the wheel is
+    turning even when startup warmup is off; failures are only logged.
+    """
+    try:
+        pregenerator = get_daily_transit_pregenerator()
+        pregenerator.remember(
+            birth_datetime, birth_coordinates, current_coordinates, ai_portrait
+        )
+        pregenerator.warmup()
+    except Exception as e:
+        logger.warning("Could not record daily transit user", extra={"error": str(e)})
@@ -0,0 +1,87 @@
+"""
+Speculative portrait generation.
+
+Onboarding localizes the user's birth data a little while before the
+portrait screen asks for the portrait. Starting the chart fetch and LLM
+generation as soon as the birth data is known, at background upstream
+priority, means the portrait request usually finds it in the cache, or
+joins the generation already under way.
+
+This is speculative work: it is dropped rather than queued once
+PORTRAIT_PREGENERATE_MAX_PENDING generations are waiting.
+"""
+
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.app.core.metrics import Counter, registry
+from backend.app.core.quota import Priority, upstream_priority
+
+from .engine import get_zodiac_engine
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.getenv("PORTRAIT_PREGENERATE", "true").lower() != "false"
+MAX_PENDING = int(os.getenv("PORTRAIT_PREGENERATE_MAX_PENDING", "100"))
+
+pregenerations = registry.register(
+    Counter(
+        "myng_pregenerations_total",
+        "Speculative portrait generations by outcome.",
+    )
+)
+
+_executor: ThreadPoolExecutor | None = None
+_executor_pid: int | None = None
+_pending: set[tuple[str, str]] = set()
+_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor, _executor_pid
+    # Worker threads do not survive fork(); each process gets its own pool.
+    if _executor is None or _executor_pid != os.getpid():
+        _executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("PORTRAIT_PREGENERATE_CONCURRENCY", "2")),
+            thread_name_prefix="pregenerate",
+        )
+        _executor_pid = os.getpid()
+        _pending.clear()
+    return _executor
+
+
+def _generate(key: tuple[str, str]) -> None:
+    try:
+        with upstream_priority(Priority.BACKGROUND):
+            get_zodiac_engine().get_ai_portrait(*key)
+        pregenerations.inc(result="done")
+    except Exception as e:
+        pregenerations.inc(result="failed")
+        logger.warning("Portrait pre-generation failed", extra={"error": str(e)})
+    finally:
+        with _lock:
+            _pending.discard(key)
+
+
+def pregenerate_portrait(datetime: str, coordinates: str) -> bool:
+    """
+    Start generating the portrait for this birth data in the background.
+    Returns whether a generation was queued.
+    """
+    if not ENABLED:
+        return False
+    key = (datetime, coordinates)
+    with _lock:
+        executor = _get_executor()
+        if key in _pending:
+            pregenerations.inc(result="duplicate")
+            return False
+        if len(_pending) >= MAX_PENDING:
+            pregenerations.inc(result="dropped")
+            return False
+        _pending.add(key)
+    executor.submit(_generate, key)
+    pregenerations.inc(result="queued")
+    return True
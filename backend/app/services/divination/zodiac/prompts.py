@@ -1,46 +1,81 @@
-portrait_prompt = """Act as a professional psychological astrologer with a focus on humanistic and evolutionary astrology. I will provide you with a JSON object containing a my natal chart data.
+"""
+LLM prompts, and the compact data blocks sent after them.
+
+Prompt input is paid for in latency and cost on every call, so the data
+is not dumped as JSON or Python reprs. Each block is a deterministic,
+line-oriented encoding, and what goes in is chosen by relevance until a
+token budget (estimated at CHARS_PER_TOKEN characters per token) is
+spent: the tightest aspects first for a portrait, and for a daily
+transit the portrait summaries plus the full sections that the natal
+planets touched by today's transits speak to.
+
+The instructions never change, so they are sent as their own system
+message ahead of the data, letting providers cache them as a prompt
+prefix.
+"""
+
+import os
+import re
+from typing import TYPE_CHECKING, Any, Iterable
+
+from .chart import (
+    ASPECT_NAMES,
+    BODY_NAMES,
+    NO_SIGN,
+    PLANETS,
+    PROFILE,
+    SIGN_NAMES,
+    NatalChart,
+)
+
+if TYPE_CHECKING:
+    from .engine import Portrait
+
+CHARS_PER_TOKEN = 4
+PORTRAIT_DATA_BUDGET = int(os.getenv("PORTRAIT_PROMPT_DATA_TOKENS", "500"))
+DAILY_TRANSIT_DATA_BUDGET = int(os.getenv("DAILY_TRANSIT_PROMPT_DATA_TOKENS", "700"))
+
+portrait_prompt = """Act as a professional psychological astrologer with a focus on humanistic and evolutionary astrology. I will provide you with my natal chart data: one line per placement (body, sign, degree within the sign, house), the key aspects with their orbs, tightest first, and the signs on the house cusps.
 
 Your task is to generate a deep, narrative-driven 'User Portrait' and return it strictly as a JSON object. Synthesize the data points into a cohesive psychological profile. Do not just list the positions; explain how they interact.
 
 Analysis Logic:
 1. The Primal Triad (The Core): Synthesize the combination of the Sun (Ego/Life Purpose), Moon (Emotional Needs/Inner World), and Ascendant (Persona/Life Path). Analyze the elemental balance and tension between these three.
-2. Key Aspect Dynamics: Look at the key_aspects list. Prioritize aspects with the smallest orb (closest to 0.0), as these represent the my most dominant psychological themes. Explain how these specific planetary interactions manifest in my behavior (especially Squares and Oppositions).
-3. Life Focus (Houses): Examine the house placements provided in the profile. Identify which areas of life (Houses) carry the most weight (e.g., angular houses 1, 4, 7, 10 or clusters of planets) and explain where my energy is naturally directed.
+2. Key Aspect Dynamics: Look at the key aspects. Prioritize aspects with the smallest orb (closest to 0.0), as these represent the my most dominant psychological themes. Explain how these specific planetary interactions manifest in my behavior (especially Squares and Oppositions).
+3. Life Focus (Houses): Examine the house placements of the planets. Identify which areas of life (Houses) carry the most weight (e.g., angular houses 1, 4, 7, 10 or clusters of planets) and explain where my energy is naturally directed.
 4. Cognitive & Relational Style: Briefly analyze Mercury (Thinking) and Venus/Mars (Values & Drive) to explain how they communicate and what motivates me.
 
 Output Format:
 You must return ONLY a valid JSON object. Do not include any conversational text, preamble, or markdown formatting (do not use ```json). The JSON must use the following keys:
 
-{{
-  "core_identity": {{
+{
+  "core_identity": {
     "content":"String containing the analysis of the Sun/Moon/Ascendant synthesis."
     "summary": "String of 1 sentence summarizing the core_identity content."
-    }},
-  "psychological_dynamics": {{
+    },
+  "psychological_dynamics": {
     "content": "String containing the analysis of the tightest aspects and internal conflicts.",
     "summary": "String of 1 sentence summarizing the psychological_dynamics content."
-    }},
-  "drive_career_values": {{
+    },
+  "drive_career_values": {
     "content": "String containing the analysis of Mars/Venus and House placements.",
     "summary": "String of 1 sentence summarizing the drive_career_values content."
-    }},
-  "growth_pathway": {{
+    },
+  "growth_pathway": {
     "content": "String containing the constructive summary of my biggest challenge and greatest strength.",
     "summary": "String of 1 sentence summarizing the growth_pathway content."
-    }}
-}}
+    }
+}
 
 Tone Guidelines:
 1. Empathetic & Insightful: Use language that validates the user's experience.
 2. Constructive: Frame 'hard' aspects not as doom, but as dynamic sources of energy and growth.
 3. No Jargon Overload: Explain astrological terms briefly if used.
-
-The Data: {DATA}
 """
 
 daily_transit_prompt = """Act as a personal intuitive coach. I will provide you with a "User Portrait" and "Transit Data".
 
-Your goal is to translate complex astrological data into a short, punchy, and jargon-free "Daily Vibe Check" JSON. 
+Your goal is to translate complex astrological data into a short, punchy, and jargon-free "Daily Vibe Check" JSON.
 
 **Crucial Constraints:**
 1.  **NO ASTRO-BABBLE:** Do not mention planet names (Sun, Mars), aspect names (Square, Trine), degrees, or house numbers in the output. The user doesn't care *why* it's happening, only *how* it feels.
@@ -53,19 +88,180 @@ Your goal is to translate complex astrological data into a short, punchy, and ja
 
 Output Format:
 You must return ONLY a valid JSON object. Do not include any conversational text, preamble, or markdown formatting (do not use ```json). The JSON must use the following keys:
-{{
+{
   "headline": "3-5 words max. Punchy and relatable.",
   "energy": "1 word that sums up the energy vibe",
   "the_tension": "2 sentences max. Describe the internal conflict the user feels today without explaining the planets.",
   "the_remedy": "1 sentence. The opportunity or 'silver lining' hidden in the stress.",
   "pro_tip": "2 sentences max. Direct action steps. What should they DO?"
-}}
+}
 
 **Tone:**
 * Casual, direct, and empathetic.
 * Like a text from a wise friend.
-
-**The Data:**
-User Portrait: {USER_PORTRAIT}
-Top Daily Transits: {TRANSIT_DATA}
 """
+
+
+def prompt_messages(instructions: str, data: str) -> list[dict[str, str]]:
+    """
+    The instructions as the system message and the data after them. The
+    instructions are the same bytes on every call, so providers that cache
+    prompt prefixes only process the data of each request.
+    """
+    return [
+        {"role": "system", "content": instructions},
+        {"role": "user", "content": data},
+    ]
+
+
+def portrait_data(chart: NatalChart) -> str:
+    return "The Data:\n" + encode_chart(chart)
+
+
+def daily_transit_prompt_data(
+    portrait: "Portrait", transits: list[dict[str, Any]]
+) -> str:
+    user_portrait, transit_data = daily_transit_data(portrait, transits)
+    return f"User Portrait:\n{user_portrait}\n\nTop Daily Transits:\n{transit_data}"
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def _fit(required: list[str], optional: Iterable[str], budget: int) -> list[str]:
+    """
+    The required lines, then optional lines in order for as long as they
+    fit in `budget` tokens.
+    """
+    lines = list(required)
+    used = sum(estimate_tokens(line) + 1 for line in lines)
+    for line in optional:
+        cost = estimate_tokens(line) + 1
+        if used + cost > budget:
+            break
+        lines.append(line)
+        used += cost
+    return lines
+
+
+def _placement(chart: NatalChart, body) -> str | None:
+    position = chart.position(body)
+    if position is None:
+        return None
+    line = f"{BODY_NAMES[body]} {position['sign']} {position['degree']}"
+    if body in PLANETS and position["house"]:
+        line += f" H{position['house']}"
+    return line
+
+
+def encode_chart(chart: NatalChart, budget: int = PORTRAIT_DATA_BUDGET) -> str:
+    """
+    Placements one per line, then aspects tightest first and the cusps
+    while the budget lasts.
+    """
+    placements = [
+        line for line in (_placement(chart, body) for body in PROFILE) if line
+    ]
+    # Applying orbs are negative; tightness is the orb's size.
+    aspects = sorted(chart.iter_aspects(), key=lambda aspect: abs(aspect[3]))
+    optional = [
+        f"{BODY_NAMES[p1]} {ASPECT_NAMES[kind]} {BODY_NAMES[p2]} orb {orb}"
+        for p1, p2, kind, orb in aspects
+    ]
+    cusps = [
+        f"{number}:{SIGN_NAMES[sign]}"
+        for number, sign in enumerate(chart.cusps, start=1)
+        if sign != NO_SIGN
+    ]
+    if cusps:
+        optional.append("Cusps " + " ".join(cusps))
+    return "\n".join(_fit(placements, optional, budget))
+
+
+def encode_transits(transits: list[dict[str, Any]]) -> str:
+    """
+    One line per transit aspect, as the engine ranks them.
+    """
+    return "\n".join(
+        f"{transit['type']}: {transit['event']} (orb {transit['orb']})"
+        for transit in transits
+    )
+
+
+_event = re.compile(r"^Transit (.+) (\w+) Natal (.+)$")
+
+# The natal bodies each portrait section mostly speaks to.
+SECTION_BODIES = {
+    "core_identity": {"Sun", "Moon", "Ascendant"},
+    "psychological_dynamics": {"Moon", "Mercury", "Pluto", "Neptune", "Uranus"},
+    "drive_career_values": {"Mars", "Venus", "Jupiter", "Saturn", "Mid Heaven"},
+    "growth_pathway": {"Saturn", "Jupiter", "Chiron", "True North Node"},
+}
+
+
+def transit_bodies(transits: list[dict[str, Any]]) -> dict[str, int]:
+    """
+    The natal bodies today's transits touch, weighted double for hard ones.
+    """
+    weights: dict[str, int] = {}
+    for transit in transits:
+        match = _event.match(transit["event"])
+        if match:
+            natal = match.group(3)
+            weights[natal] = weights.get(natal, 0) + (
+                2 if transit["type"] == "Hard" else 1
+            )
+    return weights
+
+
+def encode_portrait(
+    portrait: "Portrait",
+    transits: list[dict[str, Any]],
+    budget: int,
+) -> str:
+    """
+    Every section's summary, and the full text of the sections most
+    relevant to the transits for as long as the budget lasts. Sections keep
+    their order, whichever are expanded.
+    """
+    sections = list(type(portrait).model_fields)
+    weights = transit_bodies(transits)
+    relevance = {
+        name: sum(weights.get(body, 0) for body in SECTION_BODIES.get(name, ()))
+        for name in sections
+    }
+    ranked = sorted(
+        (name for name in sections if relevance[name]),
+        key=lambda name: (-relevance[name], sections.index(name)),
+    )
+    summaries = [f"{name}: {getattr(portrait, name).summary}" for name in sections]
+    used = sum(estimate_tokens(line) + 1 for line in summaries)
+    expanded = set()
+    for name in ranked:
+        cost = estimate_tokens(getattr(portrait, name).content) + 1
+        if used + cost <= budget:
+            expanded.add(name)
+            used += cost
+    lines = []
+    for name, summary in zip(sections, summaries):
+        lines.append(summary)
+        if name in expanded:
+            lines.append(getattr(portrait, name).content)
+    return "\n".join(lines)
+
+
+def daily_transit_data(
+    portrait: "Portrait",
+    transits: list[dict[str, Any]],
+    budget: int = DAILY_TRANSIT_DATA_BUDGET,
+) -> tuple[str, str]:
+    """
+    The portrait and transit blocks of the daily transit prompt. The
+    transits always go in; the portrait gets what is left of the budget.
+    """
+    encoded = encode_transits(transits)
+    return (
+        encode_portrait(portrait, transits, budget - estimate_tokens(encoded)),
+        encoded,
+    )
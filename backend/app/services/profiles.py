@@ -0,0 +1,285 @@
+"""
+Persistent user profiles.
+
+A profile holds a user's canonical birth data, resolved once when it is
+created: the birth datetime with its UTC offset, birth coordinates and
+timezone, the current location, and the generated portrait with the natal
+chart it was read from. Requests then send a `profile_id` instead of the
+birth data, and nothing is geocoded, localized or resent again.
+"""
+
+import os
+import struct
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, TypeVar
+from zoneinfo import ZoneInfo
+
+from pydantic import BaseModel
+from sqlalchemy import (
+    Column,
+    Float,
+    LargeBinary,
+    MetaData,
+    String,
+    Table,
+    Text,
+    insert,
+    or_,
+    select,
+)
+from sqlalchemy import update as sql_update
+from sqlalchemy.engine import Engine
+
+from backend.app.core.database import get_engine
+from backend.app.core.location import GeopyError, get_coordinates, get_timezone
+from backend.app.core.startup import Lazy
+from backend.app.schemas.chat import ChatRequest
+from backend.app.schemas.zodiac import ZodiacDailyTransitRequest, ZodiacPortraitRequest
+from backend.app.services.divination.zodiac.chart import NatalChart
+from backend.app.services.divination.zodiac.engine import Portrait
+
+metadata = MetaData()
+
+profiles_table = Table(
+    "profiles",
+    metadata,
+    Column("id", String(32), primary_key=True),
+    Column("birth_datetime", String(64), nullable=False),
+    Column("birth_city", String(255)),
+    Column("birth_coordinates", String(64), nullable=False),
+    Column("timezone", String(64), nullable=False),
+    Column("current_city", String(255)),
+    Column("current_coordinates", String(64), nullable=False),
+    Column("ai_portrait", Text),
+    Column("natal_chart", LargeBinary),
+    Column("created_at", Float, nullable=False),
+    Column("updated_at", Float, nullable=False),
+)
+
+
+class ProfileNotFoundError(Exception):
+    pass
+
+
+class Profile(BaseModel):
+    id: str
+    birth_datetime: str
+    birth_city: str | None = None
+    birth_coordinates: str
+    timezone: str
+    current_city: str | None = None
+    current_coordinates: str
+    ai_portrait: Portrait | None = None
+    natal_chart: dict[str, Any] | None = None
+    created_at: datetime
+    updated_at: datetime
+
+
+def _chart(packed: bytes | None) -> dict[str, Any] | None:
+    # A chart packed in an older layout is dropped; the next portrait
+    # request stores it again.
+    try:
+        return NatalChart.from_bytes(packed).as_dict() if packed else None
+    except (ValueError, struct.error):
+        return None
+
+
+def _to_profile(row) -> Profile:
+    return Profile(
+        id=row.id,
+        birth_datetime=row.birth_datetime,
+        birth_city=row.birth_city,
+        birth_coordinates=row.birth_coordinates,
+        timezone=row.timezone,
+        current_city=row.current_city,
+        current_coordinates=row.current_coordinates,
+        ai_portrait=(
+            Portrait.model_validate_json(row.ai_portrait) if row.ai_portrait else None
+        ),
+        natal_chart=_chart(row.natal_chart),
+        created_at=datetime.fromtimestamp(row.created_at, timezone.utc),
+        updated_at=datetime.fromtimestamp(row.updated_at, timezone.utc),
+    )
+
+
+def resolve_place(coordinates: str | None, city: str | None) -> str | None:
+    if coordinates or not city:
+        return coordinates
+    resolved = get_coordinates(city)
+    if not resolved:
+        raise GeopyError("Location not found for city: " + city)
+    return resolved
+
+
+def localize(birth_datetime: str, coordinates: str) -> tuple[str, str]:
+    """
+    The birth datetime with its UTC offset, and the timezone at the birth
+    place. A datetime without an offset is taken as local time there.
+    """
+    latitude, longitude = map(float, coordinates.split(","))
+    zone = get_timezone(latitude, longitude)
+    if not zone:
+        raise ValueError("Timezone not found for location")
+    moment = datetime.fromisoformat(birth_datetime)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=ZoneInfo(zone))
+    return moment.isoformat(), zone
+
+
+class ProfileStore:
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        metadata.create_all(engine)
+
+    def get(self, profile_id: str) -> Profile:
+        with self.engine.connect() as conn:
+            row = conn.execute(
+                select(profiles_table).where(profiles_table.c.id == profile_id)
+            ).first()
+        if row is None:
+            raise ProfileNotFoundError(f"Profile not found: {profile_id}")
+        return _to_profile(row)
+
+    def create(
+        self,
+        birth_datetime: str,
+        birth_coordinates: str | None = None,
+        birth_city: str | None = None,
+        current_coordinates: str | None = None,
+        current_city: str | None = None,
+    ) -> Profile:
+        """
+        Resolve and store a profile. Raises ValueError for incomplete birth
+        data and GeopyError for places that cannot be found.
+        """
+        birth_coordinates = resolve_place(birth_coordinates, birth_city)
+        if not birth_coordinates:
+            raise ValueError(
+                "Either 'birth_coordinates' or 'birth_city' must be provided."
+            )
+        birth_datetime, zone = localize(birth_datetime, birth_coordinates)
+        current_coordinates = (
+            resolve_place(current_coordinates, current_city) or birth_coordinates
+        )
+        now = time.time()
+        profile_id = uuid.uuid4().hex
+        with self.engine.begin() as conn:
+            conn.execute(
+                insert(profiles_table).values(
+                    id=profile_id,
+                    birth_datetime=birth_datetime,
+                    birth_city=birth_city,
+                    birth_coordinates=birth_coordinates,
+                    timezone=zone,
+                    current_city=current_city,
+                    current_coordinates=current_coordinates,
+                    created_at=now,
+                    updated_at=now,
+                )
+            )
+        return self.get(profile_id)
+
+    def _update(self, profile_id: str, **values) -> Profile:
+        with self.engine.begin() as conn:
+            updated = conn.execute(
+                sql_update(profiles_table)
+                .where(profiles_table.c.id == profile_id)
+                .values(updated_at=time.time(), **values)
+            ).rowcount
+        if not updated:
+            raise ProfileNotFoundError(f"Profile not found: {profile_id}")
+        return self.get(profile_id)
+
+    def move(
+        self,
+        profile_id: str,
+        current_coordinates: str | None = None,
+        current_city: str | None = None,
+    ) -> Profile:
+        """
+        Change the profile's current location.
+        """
+        coordinates = resolve_place(current_coordinates, current_city)
+        if not coordinates:
+            raise ValueError(
+                "Either 'current_coordinates' or 'current_city' must be provided."
+            )
+        return self._update(
+            profile_id, current_coordinates=coordinates, current_city=current_city
+        )
+
+    def set_portrait(
+        self, profile_id: str, portrait: Portrait, chart: NatalChart
+    ) -> None:
+        """
+        Keep the portrait generated for the profile and the chart it was
+        generated from, unless they already are.
+        """
+        encoded = portrait.model_dump_json()
+        packed = chart.to_bytes()
+        with self.engine.begin() as conn:
+            conn.execute(
+                sql_update(profiles_table)
+                .where(
+                    profiles_table.c.id == profile_id,
+                    or_(
+                        profiles_table.c.ai_portrait.is_(None),
+                        profiles_table.c.ai_portrait != encoded,
+                        profiles_table.c.natal_chart.is_(None),
+                        profiles_table.c.natal_chart != packed,
+                    ),
+                )
+                .values(ai_portrait=encoded, natal_chart=packed, updated_at=time.time())
+            )
+
+
+_profile_store = Lazy(
+    "profiles",
+    lambda: ProfileStore(get_engine(os.getenv("PROFILES_DATABASE_URL"))),
+)
+
+
+def get_profile_store() -> ProfileStore:
+    return _profile_store.get()
+
+
+ProfileRequest = TypeVar(
+    "ProfileRequest", ZodiacPortraitRequest, ZodiacDailyTransitRequest, ChatRequest
+)
+
+
+def with_profile(request: ProfileRequest) -> ProfileRequest:
+    """
+    The request with the birth data of its `profile_id` filled in. The
+    current location and portrait are only taken from the profile when the
+    request does not bring its own.
+    """
+    if not request.profile_id:
+        return request
+    profile = get_profile_store().get(request.profile_id)
+    if isinstance(request, ZodiacPortraitRequest):
+        return request.model_copy(
+            update={
+                "datetime": profile.birth_datetime,
+                "coordinates": profile.birth_coordinates,
+                "city": None,
+            }
+        )
+    update = {
+        "birth_datetime": profile.birth_datetime,
+        "birth_coordinates": profile.birth_coordinates,
+    }
+    if isinstance(request, ZodiacDailyTransitRequest):
+        update["birth_city"] = None
+        update["ai_portrait"] = request.ai_portrait or profile.ai_portrait
+        if not request.current_city:
+            update["current_coordinates"] = (
+                request.current_coordinates or profile.current_coordinates
+            )
+    else:
+        update["current_coordinates"] = (
+            request.current_coordinates or profile.current_coordinates
+        )
+    return request.model_copy(update=update)
@@ -0,0 +1,89 @@
+"""
+Run the offline benchmark suite.
+
+    python -m backend.benchmarks
+    python -m backend.benchmarks --compare backend/.benchmarks/abc1234.json
+    python -m backend.benchmarks --filter engine. --iterations 500
+
+Results are written to backend/.benchmarks/<commit>.json (or --output) so
+runs on different commits can be compared with --compare.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+
+from backend.benchmarks.cases import build_cases, fake_upstreams
+from backend.benchmarks.harness import build_report, compare, load_report, run_benchmark
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), ".benchmarks")
+
+
+def _run(args: argparse.Namespace) -> dict[str, dict]:
+    results = {}
+    with fake_upstreams() as engine:
+        for name, func in build_cases(engine).items():
+            if args.filter not in name:
+                continue
+            results[name] = run_benchmark(
+                func, iterations=args.iterations, warmup=args.warmup
+            )
+            stats = results[name]
+            print(
+                f"{name:40} median {stats['median_us']:>10.1f}us  "
+                f"p95 {stats['p95_us']:>10.1f}us  "
+                f"peak {stats['peak_alloc_bytes']:>9} B"
+            )
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline benchmark suite.")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--filter", default="", help="Only run names containing this.")
+    parser.add_argument("--output", help="Where to write the JSON report.")
+    parser.add_argument("--compare", help="Baseline report to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    # Keep log I/O out of the measurements.
+    logging.disable(logging.CRITICAL)
+    try:
+        results = _run(args)
+    finally:
+        logging.disable(logging.NOTSET)
+
+    report = build_report(results)
+    output = args.output or os.path.join(
+        DEFAULT_DIR, f"{report['meta']['commit'] or 'local'}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {output}")
+
+    if not args.compare:
+        return 0
+
+    regressions = 0
+    print()
+    for row in compare(load_report(args.compare), report, args.threshold):
+        old, new = row["median_us"]
+        flag = "REGRESSION" if row["regression"] else ""
+        ratios = [
+            f"{row[key]:.2f}x" if row[key] is not None else "n/a"
+            for key in ("time_ratio", "alloc_ratio")
+        ]
+        print(
+            f"{row['name']:40} {old:>10.1f}us -> {new:>10.1f}us "
+            f"({ratios[0]} time, {ratios[1]} alloc) {flag}"
+        )
+        regressions += row["regression"]
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+Benchmark cases for the zodiac engine and chat agent.
+
+Upstreams are replaced with in-process fakes serving the recorded Prokerala
+payloads and canned OpenAI responses of benchmarks/payloads.py, so the
+numbers reflect only our own code.
+"""
+
+import json
+from contextlib import ExitStack, contextmanager
+from types import SimpleNamespace
+from typing import Callable, Iterator
+from unittest.mock import patch
+
+from backend.app.services import chat_agent
+from backend.app.services.divination.zodiac import engine as engine_module
+from backend.app.services.divination.zodiac.engine import Portrait, ZodiacEngine
+from backend.benchmarks.payloads import (
+    NATAL_PAYLOAD,
+    PORTRAIT_RESPONSE,
+    TRANSIT_PAYLOAD,
+    canned_reply,
+)
+
+BIRTH_DATETIME = "2000-01-01T00:00:00+00:00"
+TRANSIT_DATETIME = "2025-01-01T00:00:00+00:00"
+COORDINATES = "25.0375198,121.5636796"
+
+
+class FakeProkeralaClient:
+    def get_natal_planet_position(self, datetime, coordinates, **kwargs):
+        return NATAL_PAYLOAD
+
+    def get_transit_planet_position(self, *args, **kwargs):
+        return TRANSIT_PAYLOAD
+
+
+def _completion(content=None, tool_calls=None):
+    message = SimpleNamespace(content=content, tool_calls=tool_calls)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+def _tool_call(name: str, arguments: dict):
+    return SimpleNamespace(
+        id=f"call_{name}",
+        function=SimpleNamespace(name=name, arguments=json.dumps(arguments)),
+    )
+
+
+def _fake_chat_completion(messages, tools=None, **kwargs):
+    if messages[-1]["role"] == "tool":
+        return _completion(content="Your Moon trines Uranus, so change energizes you.")
+    return _completion(
+        tool_calls=[
+            _tool_call("get_natal_chart_context", {}),
+            _tool_call("get_daily_transit_context", {"transit_datetime": "2025-01-01"}),
+        ]
+    )
+
+
+@contextmanager
+def fake_upstreams() -> Iterator[ZodiacEngine]:
+    """
+    A ZodiacEngine wired to fake Prokerala and OpenAI clients, installed as
+    the shared engine for the duration of the block.
+    """
+    engine = ZodiacEngine()
+    engine.prokerala_client = FakeProkeralaClient()
+    with ExitStack() as stack:
+        stack.enter_context(
+            patch.object(engine_module._zodiac_engine, "get", return_value=engine)
+        )
+        stack.enter_context(
+            patch.object(engine_module, "get_chat_response", canned_reply)
+        )
+        stack.enter_context(
+            patch.object(chat_agent, "get_chat_completion", _fake_chat_completion)
+        )
+        yield engine
+
+
+def build_cases(engine: ZodiacEngine) -> dict[str, Callable[[], object]]:
+    portrait_data = engine.get_portrait(BIRTH_DATETIME, COORDINATES)
+    ai_portrait = Portrait.model_validate_json(PORTRAIT_RESPONSE)
+    user_context = {
+        "birth_datetime": BIRTH_DATETIME,
+        "birth_coordinates": COORDINATES,
+        "transit_datetime": TRANSIT_DATETIME,
+        "current_coordinates": COORDINATES,
+    }
+    history = [{"role": "user", "content": "What is my rising sign?"}]
+
+    return {
+        "engine.get_portrait": lambda: engine._build_portrait(
+            BIRTH_DATETIME, COORDINATES
+        ),
+        "engine.clean_transit_data": lambda: engine._clean_transit_data(
+            TRANSIT_PAYLOAD
+        ),
+        "engine.get_ai_daily_transit": lambda: engine._generate_ai_daily_transit(
+            birth_datetime=BIRTH_DATETIME,
+            birth_coordinates=COORDINATES,
+            transit_datetime=TRANSIT_DATETIME,
+            current_coordinates=COORDINATES,
+            ai_portrait=ai_portrait,
+        ),
+        "engine.get_ai_portrait.uncached": lambda: engine._generate_ai_portrait(
+            BIRTH_DATETIME, COORDINATES
+        ),
+        "engine.get_ai_portrait.cached": lambda: engine.get_ai_portrait(
+            BIRTH_DATETIME, COORDINATES
+        ),
+        "agent.chat": lambda: chat_agent.ZodiacAgent(dict(user_context)).chat(
+            list(history)
+        ),
+        "json.dumps.portrait_data": lambda: portrait_data.to_json(),
+        "json.loads.portrait_response": lambda: json.loads(PORTRAIT_RESPONSE),
+        "pydantic.portrait_validate": lambda: Portrait(**json.loads(PORTRAIT_RESPONSE)),
+        "pydantic.portrait_dump_json": lambda: ai_portrait.model_dump_json(),
+    }
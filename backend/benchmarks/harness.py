@@ -0,0 +1,125 @@
+"""
+Timing and allocation harness for the offline benchmarks.
+"""
+
+import json
+import math
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+
+def _nearest_rank(ordered: list[int], fraction: float) -> int:
+    return ordered[max(math.ceil(len(ordered) * fraction) - 1, 0)]
+
+
+def run_benchmark(
+    func: Callable[[], Any],
+    iterations: int = 200,
+    warmup: int = 20,
+    alloc_iterations: int = 20,
+) -> dict[str, Any]:
+    """
+    Time `func` over `iterations` calls and measure its peak allocation.
+
+    Allocation is measured in a separate pass under tracemalloc so tracing
+    overhead does not skew the timings.
+    """
+    for _ in range(warmup):
+        func()
+
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter_ns()
+        func()
+        timings.append(time.perf_counter_ns() - start)
+
+    tracemalloc.start()
+    peaks = []
+    try:
+        for _ in range(alloc_iterations):
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - baseline)
+    finally:
+        tracemalloc.stop()
+
+    timings.sort()
+    mean_ns = statistics.fmean(timings)
+    return {
+        "iterations": iterations,
+        "mean_us": round(mean_ns / 1000, 3),
+        "median_us": round(statistics.median(timings) / 1000, 3),
+        "p95_us": round(_nearest_rank(timings, 0.95) / 1000, 3),
+        "min_us": round(timings[0] / 1000, 3),
+        "ops_per_sec": round(1e9 / mean_ns, 1) if mean_ns else None,
+        "peak_alloc_bytes": int(statistics.median(peaks)) if peaks else None,
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_report(results: dict[str, dict[str, Any]]) -> dict[str, Any]:
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        },
+        "benchmarks": results,
+    }
+
+
+def compare(
+    baseline: dict[str, Any], current: dict[str, Any], threshold: float = 0.1
+) -> list[dict[str, Any]]:
+    """
+    Compare median time and peak allocation of benchmarks present in both
+    reports. A benchmark regresses when either grows by more than `threshold`.
+    """
+    rows = []
+    for name, new in current["benchmarks"].items():
+        old = baseline["benchmarks"].get(name)
+        if old is None:
+            continue
+        time_ratio = new["median_us"] / old["median_us"] if old["median_us"] else None
+        alloc_ratio = (
+            new["peak_alloc_bytes"] / old["peak_alloc_bytes"]
+            if old.get("peak_alloc_bytes")
+            else None
+        )
+        rows.append(
+            {
+                "name": name,
+                "median_us": (old["median_us"], new["median_us"]),
+                "time_ratio": time_ratio,
+                "alloc_ratio": alloc_ratio,
+                "regression": any(
+                    ratio is not None and ratio > 1 + threshold
+                    for ratio in (time_ratio, alloc_ratio)
+                ),
+            }
+        )
+    return rows
+
+
+def load_report(path: str) -> dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
@@ -0,0 +1,51 @@
+"""
+Canned upstream payloads for the benchmarks, the load test stubs and the
+tests: the natal chart recorded for the tests, and the JSON an LLM returns
+for the portrait and daily transit prompts.
+
+Plain data importing nothing from the app or pytest, so tooling can load it
+without the app's optional packages.
+"""
+
+import json
+
+from backend.tests.zodiac.recordings import natal_planet_position
+
+NATAL_PAYLOAD = natal_planet_position()
+
+# The transit endpoint returns aspects in the same shape as the natal one.
+TRANSIT_PAYLOAD = {
+    "status": "ok",
+    "data": {"transit_natal_aspects": NATAL_PAYLOAD["data"]["aspects"]},
+}
+
+PORTRAIT_SECTIONS = (
+    "core_identity",
+    "psychological_dynamics",
+    "drive_career_values",
+    "growth_pathway",
+)
+PORTRAIT_RESPONSE = json.dumps(
+    {
+        section: {"content": f"{section} content " * 40, "summary": f"{section}."}
+        for section in PORTRAIT_SECTIONS
+    }
+)
+DAILY_TRANSIT_RESPONSE = json.dumps(
+    {
+        "headline": "Slow down today",
+        "energy": "Reflective",
+        "the_tension": "You want to move fast. Others do not.",
+        "the_remedy": "Patience turns friction into focus.",
+        "pro_tip": "Write the plan down. Then do one thing.",
+    }
+)
+
+
+def canned_reply(messages, **kwargs) -> str:
+    """
+    The JSON an LLM would return for a portrait or daily transit prompt.
+    """
+    if "Daily Vibe Check" in messages[0]["content"]:
+        return DAILY_TRANSIT_RESPONSE
+    return PORTRAIT_RESPONSE
@@ -0,0 +1,275 @@
+"""
+Closed-loop load generator for the public API.
+
+    python -m backend.loadtest.loadgen --base-url http://127.0.0.1:8000 \\
+        --concurrency 20 --duration 60 --mix chat_stream=2,portrait=1
+
+Each worker keeps one connection open and sends requests back to back,
+picking a scenario by weight and a synthetic user from a pool of `--users`
+birth profiles (so cache hit rates can be controlled). Reports throughput,
+latency percentiles and, for streamed responses, time to first byte.
+"""
+
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+from urllib.parse import urlsplit
+
+from backend.benchmarks.payloads import PORTRAIT_RESPONSE
+
+CITIES = (
+    "25.0375198,121.5636796",
+    "51.5073219,-0.1276474",
+    "40.7127281,-74.0060152",
+    "-33.8698439,151.2082848",
+    "35.6821936,139.7673068",
+    "48.8588897,2.3200410",
+)
+
+QUESTIONS = (
+    "How does today look for me?",
+    "What is my rising sign?",
+    "Explain my 7th house.",
+)
+
+
+def _user(index: int) -> dict[str, str]:
+    rng = random.Random(index)
+    birth = datetime(1960, 1, 1, tzinfo=timezone.utc) + timedelta(
+        minutes=rng.randrange(60 * 24 * 365 * 45)
+    )
+    return {"birth_datetime": birth.isoformat(), "coordinates": rng.choice(CITIES)}
+
+
+def _chat_stream(user, transit):
+    return "/api/v1/chat/stream", {
+        "message": random.choice(QUESTIONS),
+        "birth_datetime": user["birth_datetime"],
+        "birth_coordinates": user["coordinates"],
+        "transit_datetime": transit,
+    }
+
+
+def _portrait(user, transit):
+    return "/api/v1/divination/zodiac/portrait", {
+        "datetime": user["birth_datetime"],
+        "coordinates": user["coordinates"],
+    }
+
+
+def _daily_transit(user, transit):
+    return "/api/v1/divination/zodiac/daily-transit", {
+        "birth_datetime": user["birth_datetime"],
+        "birth_coordinates": user["coordinates"],
+        "transit_datetime": transit,
+        "ai_portrait": json.loads(PORTRAIT_RESPONSE),
+    }
+
+
+SCENARIOS: dict[str, Callable[[dict, str], tuple[str, dict]]] = {
+    "chat_stream": _chat_stream,
+    "portrait": _portrait,
+    "daily_transit": _daily_transit,
+}
+
+
+def parse_mix(spec: str) -> dict[str, float]:
+    """
+    Parse "chat_stream=2,portrait=1" into scenario weights.
+    """
+    mix = {}
+    for item in spec.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario: {name!r}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    """
+    Nearest-rank percentile of `values` (0 < q <= 100).
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+class LoadGenerator:
+    def __init__(
+        self,
+        base_url: str,
+        mix: dict[str, float],
+        concurrency: int = 10,
+        users: int = 1000,
+        timeout: float = 120.0,
+    ):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.https = parts.scheme == "https"
+        self.mix = mix
+        self.concurrency = concurrency
+        self.users = [_user(i) for i in range(users)]
+        self.timeout = timeout
+        self.samples: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> http.client.HTTPConnection:
+        cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        return cls(self.host, self.port, timeout=self.timeout)
+
+    def _request(self, conn, scenario: str) -> dict[str, Any]:
+        transit = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+        path, payload = SCENARIOS[scenario](random.choice(self.users), transit)
+        body = json.dumps(payload).encode()
+
+        start = time.perf_counter()
+        ttfb = None
+        conn.request(
+            "POST", path, body=body, headers={"Content-Type": "application/json"}
+        )
+        response = conn.getresponse()
+        size = 0
+        while chunk := response.read1(65536):
+            if ttfb is None:
+                ttfb = time.perf_counter() - start
+            size += len(chunk)
+        # read1() can leave the final empty chunk unread; finish the response
+        # so the connection can be reused.
+        size += len(response.read())
+        return {
+            "scenario": scenario,
+            "status": response.status,
+            "latency": time.perf_counter() - start,
+            "ttfb": ttfb,
+            "bytes": size,
+        }
+
+    def _worker(self, deadline: float, remaining: list[int]) -> None:
+        names, weights = zip(*self.mix.items())
+        conn = self._connect()
+        while time.monotonic() < deadline:
+            with self._lock:
+                if remaining[0] == 0:
+                    break
+                remaining[0] -= 1
+            scenario = random.choices(names, weights)[0]
+            start = time.perf_counter()
+            try:
+                sample = self._request(conn, scenario)
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                conn = self._connect()
+                sample = {
+                    "scenario": scenario,
+                    "status": type(e).__name__,
+                    "latency": time.perf_counter() - start,
+                    "ttfb": None,
+                    "bytes": 0,
+                }
+            with self._lock:
+                self.samples.append(sample)
+        conn.close()
+
+    def run(self, duration: float | None = None, requests: int | None = None):
+        """
+        Run until `duration` seconds have passed or `requests` were sent,
+        whichever comes first, and return the report.
+        """
+        deadline = time.monotonic() + (duration if duration else float("inf"))
+        remaining = [requests if requests else -1]
+        threads = [
+            threading.Thread(target=self._worker, args=(deadline, remaining))
+            for _ in range(self.concurrency)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return summarize(self.samples, time.perf_counter() - start)
+
+
+def _stats(samples: list[dict[str, Any]], elapsed: float) -> dict[str, Any]:
+    latencies = [s["latency"] for s in samples]
+    ttfbs = [s["ttfb"] for s in samples if s["ttfb"] is not None]
+    ok = [s for s in samples if isinstance(s["status"], int) and s["status"] < 400]
+    stats = {
+        "requests": len(samples),
+        "errors": len(samples) - len(ok),
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else None,
+        "status": dict(Counter(str(s["status"]) for s in samples)),
+    }
+    for name, values in (("latency", latencies), ("ttfb", ttfbs)):
+        for q in (50, 90, 95, 99):
+            value = percentile(values, q)
+            stats[f"{name}_p{q}_ms"] = (
+                round(value * 1000, 1) if value is not None else None
+            )
+    stats["latency_max_ms"] = round(max(latencies) * 1000, 1) if latencies else None
+    return stats
+
+
+def summarize(samples: list[dict[str, Any]], elapsed: float) -> dict[str, Any]:
+    scenarios = sorted({s["scenario"] for s in samples})
+    return {
+        "elapsed_seconds": round(elapsed, 3),
+        "total": _stats(samples, elapsed),
+        "scenarios": {
+            name: _stats([s for s in samples if s["scenario"] == name], elapsed)
+            for name in scenarios
+        },
+    }
+
+
+def _print_report(report: dict[str, Any]) -> None:
+    columns = ("requests", "errors", "throughput_rps")
+    percentiles = ("latency_p50_ms", "latency_p95_ms", "latency_p99_ms")
+    print(
+        f"{'scenario':15}"
+        + "".join(f"{c:>16}" for c in columns + percentiles + ("ttfb_p50_ms",))
+    )
+    rows = [*report["scenarios"].items(), ("total", report["total"])]
+    for name, stats in rows:
+        cells = [stats[c] for c in columns + percentiles + ("ttfb_p50_ms",)]
+        print(f"{name:15}" + "".join(f"{str(c):>16}" for c in cells))
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--mix", default="chat_stream=1,portrait=1,daily_transit=1")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--requests", type=int, help="Stop after this many.")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--output", help="Write the JSON report here.")
+    args = parser.parse_args(argv)
+
+    generator = LoadGenerator(
+        args.base_url,
+        parse_mix(args.mix),
+        concurrency=args.concurrency,
+        users=args.users,
+        timeout=args.timeout,
+    )
+    report = generator.run(duration=args.duration, requests=args.requests)
+    _print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
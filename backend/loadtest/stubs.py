@@ -0,0 +1,409 @@
+"""
+Local stand-ins for the Prokerala and OpenAI APIs, for load testing.
+
+    python -m backend.loadtest.stubs --openai-latency lognormal:0.8:0.5
+
+then point the API at them:
+
+    PROKERALA_BASE_URL=http://127.0.0.1:8081/ PROKERALA_CLIENT_ID=stub \\
+    PROKERALA_SECRET=stub OPENAI_BASE_URL=http://127.0.0.1:8082/v1 \\
+    OPENAI_API_KEY=stub uvicorn backend.app.main:app
+
+Prokerala answers the natal, transit and composite endpoints with the
+recorded fixture payloads. OpenAI answers chat completions, streamed or not,
+with tool calls when tools are offered and canned portrait/daily transit
+JSON for json_object requests. Each upstream has its own latency
+distribution, error rate and rate limit.
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from backend.app.core.rate_limit import TokenBucket
+from backend.benchmarks.payloads import NATAL_PAYLOAD, TRANSIT_PAYLOAD, canned_reply
+
+COMPOSITE_PAYLOAD = {
+    "status": "ok",
+    "data": {"composite_aspects": NATAL_PAYLOAD["data"]["aspects"]},
+}
+
+PROKERALA_ROUTES = {
+    "/v2/astrology/natal-planet-position": NATAL_PAYLOAD,
+    "/v2/astrology/transit-planet-position": TRANSIT_PAYLOAD,
+    "/v2/astrology/composite-planet-aspect": COMPOSITE_PAYLOAD,
+}
+
+CHAT_REPLY = (
+    "Your Moon trines Uranus today, so change feels less like a threat and "
+    "more like fuel. Lean into the unexpected conversation."
+)
+
+
+class Latency:
+    """
+    A latency distribution parsed from "none", "fixed:S", "uniform:MIN:MAX"
+    or "lognormal:MEDIAN:SIGMA" (seconds).
+    """
+
+    def __init__(self, spec: str = "none"):
+        kind, *params = spec.split(":")
+        self.kind = kind
+        self.params = [float(p) for p in params]
+        expected = {"none": 0, "fixed": 1, "uniform": 2, "lognormal": 2}
+        if expected.get(kind) != len(self.params):
+            raise ValueError(f"Invalid latency spec: {spec!r}")
+
+    def sample(self) -> float:
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return random.uniform(*self.params)
+        if self.kind == "lognormal":
+            median, sigma = self.params
+            return random.lognormvariate(math.log(median), sigma)
+        return 0.0
+
+
+class Behaviour:
+    """
+    Fault injection shared by all requests to one stub server.
+
+    `rate_limit` is in requests per second (0 disables it); requests over
+    the limit get a 429, and a fraction `error_rate` of the rest a 500.
+    """
+
+    def __init__(
+        self,
+        latency: Latency | None = None,
+        error_rate: float = 0.0,
+        rate_limit: float = 0.0,
+        burst: float | None = None,
+    ):
+        self.latency = latency or Latency()
+        self.error_rate = error_rate
+        self.limiter = TokenBucket(rate_limit, burst) if rate_limit else None
+
+    def fault(self) -> int | None:
+        if self.limiter is not None and not self.limiter.try_acquire():
+            return 429
+        if self.error_rate and random.random() < self.error_rate:
+            return 500
+        return None
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    behaviour: Behaviour
+
+    def log_message(self, *args):
+        pass
+
+    def _read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def _send_json(self, status: int, body: Any, headers=None) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class ProkeralaHandler(StubHandler):
+    @staticmethod
+    def _error(detail: str) -> dict[str, Any]:
+        return {"status": "error", "errors": [{"title": detail, "detail": detail}]}
+
+    def do_POST(self):
+        self._read_body()
+        if self.path.rstrip("/").endswith("/token"):
+            return self._send_json(
+                200,
+                {
+                    "access_token": f"stub-{secrets.token_hex(8)}",
+                    "token_type": "Bearer",
+                    "expires_in": 3600,
+                },
+            )
+        self._send_json(404, self._error("Not found"))
+
+    def do_GET(self):
+        # ApiClient joins BASE_URL and the endpoint with a double slash.
+        path = re.sub("/+", "/", self.path.split("?", 1)[0])
+        payload = PROKERALA_ROUTES.get(path)
+        if payload is None:
+            return self._send_json(404, self._error("Not found"))
+        if not self.headers.get("Authorization", "").startswith("Bearer "):
+            return self._send_json(401, self._error("Missing access token"))
+
+        status = self.behaviour.fault()
+        if status == 429:
+            return self._send_json(429, self._error("Rate limit exceeded"))
+        time.sleep(self.behaviour.latency.sample())
+        if status == 500:
+            return self._send_json(500, self._error("Internal server error"))
+        self._send_json(200, payload)
+
+
+class OpenAIHandler(StubHandler):
+    tool_call_rate = 1.0
+    stream_interval = 0.0
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._read_body()
+            return self._send_json(404, {"error": {"message": "Not found"}})
+        request = json.loads(self._read_body() or b"{}")
+
+        status = self.behaviour.fault()
+        if status == 429:
+            return self._send_json(
+                429,
+                {
+                    "error": {
+                        "message": "Rate limit reached",
+                        "type": "requests",
+                        "code": "rate_limit_exceeded",
+                    }
+                },
+                headers={"Retry-After": "1"},
+            )
+        time.sleep(self.behaviour.latency.sample())
+        if status == 500:
+            return self._send_json(
+                500, {"error": {"message": "Server error", "type": "server_error"}}
+            )
+
+        content, tool_calls = self._reply(request)
+        if request.get("stream"):
+            self._stream(request, content, tool_calls)
+        else:
+            self._complete(request, content, tool_calls)
+
+    def _reply(self, request) -> tuple[str | None, list[dict] | None]:
+        messages = request.get("messages") or [{"role": "user", "content": ""}]
+        tools = request.get("tools")
+        if (
+            tools
+            and messages[-1].get("role") != "tool"
+            and random.random() < self.tool_call_rate
+        ):
+            return None, [
+                {
+                    "id": f"call_{secrets.token_hex(6)}",
+                    "type": "function",
+                    "function": {"name": tool["function"]["name"], "arguments": "{}"},
+                }
+                for tool in tools
+            ]
+        if (request.get("response_format") or {}).get("type") == "json_object":
+            return canned_reply(messages), None
+        return CHAT_REPLY, None
+
+    @staticmethod
+    def _envelope(request, kind: str) -> dict[str, Any]:
+        return {
+            "id": f"chatcmpl-{secrets.token_hex(8)}",
+            "object": kind,
+            "created": int(time.time()),
+            "model": request.get("model") or "stub",
+        }
+
+    def _complete(self, request, content, tool_calls) -> None:
+        prompt_chars = sum(
+            len(m.get("content") or "") for m in request.get("messages", [])
+        )
+        completion_tokens = len(content or "") // 4 + 1
+        message = {"role": "assistant", "content": content}
+        if tool_calls:
+            message["tool_calls"] = tool_calls
+        body = {
+            **self._envelope(request, "chat.completion"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": message,
+                    "finish_reason": "tool_calls" if tool_calls else "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_chars // 4 + 1,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_chars // 4 + 1 + completion_tokens,
+            },
+        }
+        self._send_json(200, body)
+
+    def _stream(self, request, content, tool_calls) -> None:
+        envelope = self._envelope(request, "chat.completion.chunk")
+        deltas: list[dict[str, Any]] = [{"role": "assistant", "content": ""}]
+        for index, call in enumerate(tool_calls or []):
+            deltas.append(
+                {
+                    "tool_calls": [
+                        {
+                            "index": index,
+                            "id": call["id"],
+                            "type": "function",
+                            "function": {"name": call["function"]["name"]},
+                        }
+                    ]
+                }
+            )
+            deltas.append(
+                {
+                    "tool_calls": [
+                        {
+                            "index": index,
+                            "function": {"arguments": call["function"]["arguments"]},
+                        }
+                    ]
+                }
+            )
+        for token in re.findall(r"\S+\s*", content or ""):
+            deltas.append({"content": token})
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        finish_reason = "tool_calls" if tool_calls else "stop"
+        chunks = [{"index": 0, "delta": d, "finish_reason": None} for d in deltas]
+        chunks.append({"index": 0, "delta": {}, "finish_reason": finish_reason})
+        for i, choice in enumerate(chunks):
+            if i and self.stream_interval:
+                time.sleep(self.stream_interval)
+            event = json.dumps({**envelope, "choices": [choice]})
+            self.wfile.write(f"data: {event}\n\n".encode())
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+class StubServer:
+    """
+    Run `handler` with its own `behaviour` on a background thread.
+    """
+
+    def __init__(
+        self,
+        handler: type[StubHandler],
+        behaviour: Behaviour | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        **handler_options,
+    ):
+        handler_cls = type(
+            handler.__name__,
+            (handler,),
+            {"behaviour": behaviour or Behaviour(), **handler_options},
+        )
+        self.server = ThreadingHTTPServer((host, port), handler_cls)
+        self.server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(
+            target=self.server.serve_forever, name="stub-server", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    for name, port, latency in (
+        ("prokerala", 8081, "lognormal:0.3:0.4"),
+        ("openai", 8082, "lognormal:0.8:0.5"),
+    ):
+        parser.add_argument(f"--{name}-port", type=int, default=port)
+        parser.add_argument(
+            f"--{name}-latency",
+            default=latency,
+            help="none, fixed:S, uniform:MIN:MAX or lognormal:MEDIAN:SIGMA",
+        )
+        parser.add_argument(f"--{name}-error-rate", type=float, default=0.0)
+        parser.add_argument(
+            f"--{name}-rate-limit",
+            type=float,
+            default=0.0,
+            help="Requests per second before answering 429 (0 = unlimited).",
+        )
+    parser.add_argument(
+        "--tool-call-rate",
+        type=float,
+        default=1.0,
+        help="Fraction of tool-enabled chat requests answered with tool calls.",
+    )
+    parser.add_argument(
+        "--stream-interval",
+        type=float,
+        default=0.02,
+        help="Seconds between streamed chunks.",
+    )
+    args = parser.parse_args(argv)
+
+    prokerala = StubServer(
+        ProkeralaHandler,
+        Behaviour(
+            Latency(args.prokerala_latency),
+            args.prokerala_error_rate,
+            args.prokerala_rate_limit,
+        ),
+        args.host,
+        args.prokerala_port,
+    )
+    openai = StubServer(
+        OpenAIHandler,
+        Behaviour(
+            Latency(args.openai_latency),
+            args.openai_error_rate,
+            args.openai_rate_limit,
+        ),
+        args.host,
+        args.openai_port,
+        tool_call_rate=args.tool_call_rate,
+        stream_interval=args.stream_interval,
+    )
+    with prokerala, openai:
+        print(f"PROKERALA_BASE_URL={prokerala.url}")
+        print(f"OPENAI_BASE_URL={openai.url}v1")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
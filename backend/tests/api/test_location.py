@@ -0,0 +1,62 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.app.api.v1.endpoints import location
+
+app = FastAPI()
+app.include_router(location.router, prefix="/location")
+client = TestClient(app)
+
+
+def test_localize_batch_deduplicates_cities():
+    async def fake_geocode(city):
+        if city.strip().lower() == "taipei":
+            return "25.0375198,121.5636796"
+        if city == "Slowville":
+            raise TimeoutError()
+        raise location.GeopyError("Location not found for city: " + city)
+
+    geocode = AsyncMock(side_effect=fake_geocode)
+    payload = {
+        "items": [
+            {"date_str": "2000-01-01T08:00:00", "city": "Taipei"},
+            {"date_str": "2000-07-01T08:00:00", "city": " taipei"},
+            {"date_str": "not-a-date", "city": "Taipei"},
+            {"date_str": "2000-01-01T08:00:00", "city": "Nowhereville"},
+            {"date_str": "2000-01-01T08:00:00", "city": "Slowville"},
+        ]
+    }
+
+    with patch.object(location, "get_coordinates_async", geocode):
+        response = client.post("/location/localize/batch", json=payload)
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert geocode.await_count == 3
+    assert results[0]["datetime"] == "2000-01-01T08:00:00+08:00"
+    assert results[0]["timezone"] == "Asia/Taipei"
+    assert results[1]["datetime"] == "2000-07-01T08:00:00+08:00"
+    assert results[2]["error"].startswith("Invalid date format")
+    assert results[3]["error"] == "Location not found for city: Nowhereville"
+    assert results[4]["error"] == "TimeoutError"
+
+
+def test_localize_starts_portrait_pregeneration():
+    geocode = AsyncMock(return_value="25.0375198,121.5636796")
+    pregenerate = MagicMock()
+
+    with (
+        patch.object(location, "get_coordinates_async", geocode),
+        patch.object(location, "pregenerate_portrait", pregenerate),
+    ):
+        response = client.post(
+            "/location/localize",
+            json={"date_str": "2000-01-01T08:00:00", "city": "Taipei"},
+        )
+
+    assert response.status_code == 200
+    pregenerate.assert_called_once_with(
+        "2000-01-01T08:00:00+08:00", "25.0375198,121.5636796"
+    )
@@ -0,0 +1,99 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.app.api.v1.endpoints import profiles as profiles_endpoint
+from backend.app.api.v1.endpoints import zodiac
+from backend.app.core.database import get_engine
+from backend.app.services import profiles
+from backend.app.services.divination.zodiac.chart import NatalChart
+from backend.app.services.divination.zodiac.engine import Portrait
+from backend.benchmarks.payloads import PORTRAIT_RESPONSE
+
+app = FastAPI()
+app.include_router(profiles_endpoint.router, prefix="/profiles")
+app.include_router(zodiac.router)
+client = TestClient(app)
+
+CITIES = {"Taipei": "25.0375198,121.5636796", "Paris": "48.8566,2.3522"}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = profiles.ProfileStore(get_engine(f"sqlite:///{tmp_path / 'profiles.db'}"))
+    profiles._profile_store.set(store)
+    with (
+        patch.object(profiles, "get_coordinates", side_effect=CITIES.get),
+        patch.object(profiles_endpoint, "pregenerate_portrait") as pregenerate,
+    ):
+        store.pregenerate = pregenerate
+        yield store
+    profiles._profile_store.reset()
+
+
+def test_profile_is_created_read_and_moved(store):
+    created = client.post(
+        "/profiles",
+        json={"birth_datetime": "2000-01-01T08:00:00", "birth_city": "Taipei"},
+    )
+    profile_id = created.json()["id"]
+    moved = client.patch(f"/profiles/{profile_id}", json={"current_city": "Paris"})
+    fetched = client.get(f"/profiles/{profile_id}")
+    missing = client.get("/profiles/unknown")
+    unknown_city = client.post(
+        "/profiles",
+        json={"birth_datetime": "2000-01-01T08:00:00", "birth_city": "Atlantis"},
+    )
+
+    assert created.status_code == 201
+    assert created.json()["birth_datetime"] == "2000-01-01T08:00:00+08:00"
+    assert created.json()["timezone"] == "Asia/Taipei"
+    assert created.json()["current_coordinates"] == CITIES["Taipei"]
+    store.pregenerate.assert_called_once_with(
+        "2000-01-01T08:00:00+08:00", CITIES["Taipei"]
+    )
+    assert moved.status_code == 200
+    assert fetched.json()["current_city"] == "Paris"
+    assert fetched.json()["current_coordinates"] == CITIES["Paris"]
+    assert missing.status_code == 404
+    assert unknown_city.status_code == 404
+
+
+def test_portrait_and_chart_are_kept_on_the_profile(store):
+    profile = store.create("2000-01-01T08:00:00", birth_city="Taipei")
+    portrait = Portrait.model_validate_json(PORTRAIT_RESPONSE)
+    engine = MagicMock()
+    chart = NatalChart.from_dict(
+        {
+            "profile": {"Sun": {"sign": "Capricorn", "house": 12, "degree": 10.8}},
+            "key_aspects": [],
+            "house_cusps": {"1": "Aquarius"},
+        }
+    )
+    engine.get_ai_portrait.return_value = portrait
+    engine.get_portrait.return_value = chart
+
+    with patch.object(zodiac, "get_zodiac_engine", return_value=engine):
+        response = client.post(
+            "/divination/zodiac/portrait", json={"profile_id": profile.id}
+        )
+        missing = client.post(
+            "/divination/zodiac/portrait", json={"profile_id": "unknown"}
+        )
+
+    assert response.status_code == 200
+    engine.get_ai_portrait.assert_called_once_with(
+        "2000-01-01T08:00:00+08:00", CITIES["Taipei"]
+    )
+    assert store.get(profile.id).ai_portrait == portrait
+    assert store.get(profile.id).natal_chart == chart.as_dict()
+    assert missing.status_code == 404
+
+    transit = profiles.with_profile(
+        profiles.ZodiacDailyTransitRequest(profile_id=profile.id)
+    )
+    assert transit.birth_datetime == profile.birth_datetime
+    assert transit.current_coordinates == CITIES["Taipei"]
+    assert transit.ai_portrait == portrait
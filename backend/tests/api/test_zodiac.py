@@ -0,0 +1,268 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.app.api.v1.endpoints import zodiac
+from backend.app.core.canonical import BirthMoment, Coordinates
+from backend.app.core.database import get_engine
+from backend.app.core.jobs import JobQueue, JobStore
+from backend.app.core.location import GeocodeRateLimitError, GeopyError
+from backend.app.core.quota import UpstreamBusyError
+from backend.app.core.swr_cache import StaleWhileRevalidateCache
+from backend.app.services.divination.zodiac import batch, jobs
+from backend.app.services.divination.zodiac.engine import DailyTransit, Portrait
+from backend.benchmarks.payloads import PORTRAIT_RESPONSE
+
+app = FastAPI()
+app.include_router(zodiac.router)
+client = TestClient(app)
+
+
+def test_busy_upstream_answers_try_later():
+    engine = MagicMock()
+    engine.get_ai_portrait.side_effect = UpstreamBusyError("prokerala", 2.5)
+    engine.get_ai_daily_transit.side_effect = UpstreamBusyError("prokerala", 2.5)
+
+    with patch.object(zodiac, "get_zodiac_engine", return_value=engine):
+        portrait = client.post(
+            "/divination/zodiac/portrait",
+            json={"datetime": "2000-01-01T00:00:00Z", "coordinates": "0,0"},
+        )
+        transit = client.post(
+            "/divination/zodiac/daily-transit",
+            json={
+                "birth_datetime": "2000-01-01T00:00:00Z",
+                "birth_coordinates": "0,0",
+                "transit_datetime": "2025-01-01T00:00:00Z",
+            },
+        )
+
+    for response in (portrait, transit):
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "3"
+
+
+def test_geocoding_errors_keep_their_status():
+    errors = {
+        "Atlantis": GeopyError("Location not found for city: Atlantis"),
+        "Paris": GeocodeRateLimitError("Geocoding rate limit exceeded"),
+    }
+
+    async def geocode(city):
+        if city in errors:
+            raise errors[city]
+        return None
+
+    with patch.object(zodiac, "get_coordinates_async", geocode):
+        missing = client.post(
+            "/divination/zodiac/portrait",
+            json={"datetime": "2000-01-01T00:00:00Z", "city": "Atlantis"},
+        )
+        limited = client.post(
+            "/divination/zodiac/daily-transit",
+            json={"birth_datetime": "2000-01-01T00:00:00Z", "birth_city": "Paris"},
+        )
+        moved = client.post(
+            "/divination/zodiac/daily-transit",
+            json={
+                "birth_datetime": "2000-01-01T00:00:00Z",
+                "birth_coordinates": "0,0",
+                "current_city": "Atlantis",
+            },
+        )
+        unresolved = client.post(
+            "/divination/zodiac/portrait",
+            json={"datetime": "2000-01-01T00:00:00Z", "city": "Nowhere"},
+        )
+
+    assert missing.status_code == 404
+    assert limited.status_code == 429
+    assert moved.status_code == 404
+    assert unresolved.status_code == 400
+
+
+def test_stale_portrait_is_flagged():
+    cache = StaleWhileRevalidateCache("test", ttl=-1)
+    portrait = Portrait.model_validate_json(PORTRAIT_RESPONSE)
+    cache.set("key", portrait)
+    engine = MagicMock()
+    engine.get_ai_portrait.side_effect = lambda *args: cache.get(
+        "key", lambda: portrait
+    )
+
+    with patch.object(zodiac, "get_zodiac_engine", return_value=engine):
+        response = client.post(
+            "/divination/zodiac/portrait",
+            json={"datetime": "2000-01-01T00:00:00Z", "coordinates": "0,0"},
+        )
+
+    assert response.status_code == 200
+    assert response.headers["X-Stale"] == "true"
+    assert "Age" in response.headers
+    assert response.json() == portrait.model_dump()
+
+
+def test_portrait_batch_streams_deduplicated_results():
+    portrait = Portrait.model_validate_json(PORTRAIT_RESPONSE)
+    engine = MagicMock()
+    engine.get_ai_portrait.return_value = portrait
+    geocode = AsyncMock(
+        side_effect=lambda city: "1,2" if city.strip() == "Paris" else None
+    )
+    items = [
+        {"datetime": "2000-01-01T00:00:00Z", "coordinates": "1,2"},
+        {"datetime": "2000-01-01T00:00:00Z", "city": "Paris "},
+        {"datetime": "2000-01-01T01:00:00+01:00", "city": "Paris"},
+        {"datetime": "2000-01-01T00:00:00Z", "city": "Atlantis"},
+        {"datetime": "2000-01-01T00:00:00Z"},
+    ]
+
+    with (
+        patch.object(batch, "get_zodiac_engine", return_value=engine),
+        patch.object(batch, "get_coordinates_async", geocode),
+    ):
+        response = client.post(
+            "/divination/zodiac/portrait/batch", json={"items": items}
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    by_index = {line["index"]: line for line in lines}
+    assert len(lines) == len(items)
+    assert [by_index[i]["status"] for i in range(5)] == [200, 200, 200, 404, 400]
+    assert by_index[0]["result"] == portrait.model_dump(mode="json")
+    # One geocode per distinct city, one generation per distinct chart.
+    assert geocode.await_count == 2
+    key = (BirthMoment.parse("2000-01-01T00:00:00Z"), Coordinates.parse("1,2"))
+    engine.get_portrait.assert_called_once_with(*key)
+    engine.get_ai_portrait.assert_called_once_with(*key)
+
+
+def test_batch_geocodes_a_few_cities_at_a_time():
+    running = []
+    peak = 0
+
+    async def geocode(city):
+        nonlocal peak
+        running.append(city)
+        peak = max(peak, len(running))
+        await asyncio.sleep(0.01)
+        running.remove(city)
+        return "1,2"
+
+    with patch.object(batch, "get_coordinates_async", geocode):
+        places = asyncio.run(batch._geocode({f"City {i}" for i in range(10)}))
+
+    assert len(places) == 10
+    assert peak == batch.GEOCODE_CONCURRENCY
+
+
+def test_daily_transit_batch_reports_item_errors():
+    engine = MagicMock()
+    engine.get_ai_daily_transit.side_effect = UpstreamBusyError("openai", 4)
+    item = {
+        "birth_datetime": "2000-01-01T00:00:00Z",
+        "birth_coordinates": "0,0",
+        "transit_datetime": "2025-01-01T00:00:00Z",
+        "ai_portrait": json.loads(PORTRAIT_RESPONSE),
+    }
+
+    with patch.object(batch, "get_zodiac_engine", return_value=engine):
+        response = client.post(
+            "/divination/zodiac/daily-transit/batch", json={"items": [item, item]}
+        )
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["index"] for line in lines) == [0, 1]
+    assert all(line["status"] == 503 for line in lines)
+    assert all(line["retry_after"] == 4 for line in lines)
+    engine.get_portrait.assert_not_called()
+    engine.get_ai_daily_transit.assert_called_once()
+
+
+def test_portrait_job_is_accepted_and_polled(tmp_path):
+    portrait = Portrait.model_validate_json(PORTRAIT_RESPONSE)
+    engine = MagicMock()
+    engine.get_ai_portrait.return_value = portrait
+    queue = JobQueue(
+        JobStore(get_engine(f"sqlite:///{tmp_path / 'jobs.db'}")), poll_interval=0.05
+    )
+    queue.register(jobs.PORTRAIT_JOB, jobs.run_portrait_job)
+    body = {"datetime": "2000-01-01T00:00:00Z", "coordinates": "0,0"}
+
+    with (
+        patch.object(zodiac, "get_job_queue", return_value=queue),
+        patch.object(jobs, "get_zodiac_engine", return_value=engine),
+    ):
+        try:
+            accepted = client.post("/divination/zodiac/portrait/jobs", json=body)
+            job_id = accepted.json()["id"]
+            polled = client.get(f"/divination/zodiac/jobs/{job_id}?wait=5")
+        finally:
+            queue.stop()
+        missing = client.get("/divination/zodiac/jobs/unknown")
+        invalid = client.post(
+            "/divination/zodiac/portrait/jobs", json={"datetime": body["datetime"]}
+        )
+
+    assert accepted.status_code == 202
+    assert accepted.headers["Location"].endswith(f"/divination/zodiac/jobs/{job_id}")
+    assert polled.json()["status"] == "done"
+    assert polled.json()["result"] == portrait.model_dump(mode="json")
+    engine.get_ai_portrait.assert_called_once_with("2000-01-01T00:00:00Z", "0,0")
+    assert missing.status_code == 404
+    assert invalid.status_code == 400
+
+
+def test_unchanged_portrait_is_not_sent_again():
+    portrait = Portrait.model_validate_json(PORTRAIT_RESPONSE)
+    engine = MagicMock()
+    engine.get_ai_portrait.return_value = portrait
+    body = {"datetime": "2000-01-01T00:00:00Z", "coordinates": "0,0"}
+
+    with patch.object(zodiac, "get_zodiac_engine", return_value=engine):
+        first = client.post("/divination/zodiac/portrait", json=body)
+        etag = first.headers["ETag"]
+        repeat = client.post(
+            "/divination/zodiac/portrait",
+            json=body,
+            headers={"If-None-Match": f'"other", W/{etag}'},
+        )
+        changed = client.post(
+            "/divination/zodiac/portrait",
+            json=body,
+            headers={"If-None-Match": '"other"'},
+        )
+
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] == "private, max-age=86400"
+    assert repeat.status_code == 304
+    assert repeat.content == b""
+    assert repeat.headers["ETag"] == etag
+    assert changed.status_code == 200
+    assert changed.json() == portrait.model_dump()
+
+
+def test_daily_transit_is_cacheable_until_local_midnight():
+    engine = MagicMock()
+    engine.get_ai_daily_transit.return_value = DailyTransit(
+        headline="h", energy="e", the_tension="t", the_remedy="r", pro_tip="p"
+    )
+
+    with (
+        patch.object(zodiac, "get_zodiac_engine", return_value=engine),
+        patch.object(zodiac, "remember_daily_transit_user"),
+        patch.object(zodiac, "seconds_left_in_day", return_value=3600),
+    ):
+        response = client.post(
+            "/divination/zodiac/daily-transit",
+            json={"birth_datetime": "2000-01-01T00:00:00Z", "birth_coordinates": "0,0"},
+        )
+
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == "private, max-age=3600"
+    assert response.headers["ETag"]
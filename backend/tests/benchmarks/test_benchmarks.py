@@ -0,0 +1,65 @@
+import json
+import logging
+
+from backend.app.services.divination.zodiac.engine import Portrait
+from backend.benchmarks.__main__ import main
+from backend.benchmarks.cases import build_cases, fake_upstreams
+from backend.benchmarks.harness import _nearest_rank, compare, run_benchmark
+from backend.benchmarks.payloads import PORTRAIT_SECTIONS
+
+
+def test_every_case_runs_against_fake_upstreams():
+    with fake_upstreams() as engine:
+        for name, func in build_cases(engine).items():
+            stats = run_benchmark(func, iterations=2, warmup=1, alloc_iterations=1)
+            assert stats["iterations"] == 2, name
+            assert stats["peak_alloc_bytes"] >= 0, name
+
+
+def test_p95_is_the_nearest_rank():
+    assert _nearest_rank(list(range(1, 11)), 0.95) == 10
+    assert _nearest_rank(list(range(1, 101)), 0.95) == 95
+    assert _nearest_rank(list(range(1, 21)), 0.95) == 19
+    assert _nearest_rank([7], 0.95) == 7
+
+
+def test_compare_flags_regressions():
+    baseline = {"benchmarks": {"a": {"median_us": 10.0, "peak_alloc_bytes": 100}}}
+    current = {"benchmarks": {"a": {"median_us": 12.0, "peak_alloc_bytes": 100}}}
+
+    (row,) = compare(baseline, current, threshold=0.1)
+    assert row["regression"]
+    assert not compare(baseline, baseline, threshold=0.1)[0]["regression"]
+
+
+def test_cli_writes_report_and_compares(tmp_path):
+    output = tmp_path / "report.json"
+    args = ["--iterations", "2", "--warmup", "0", "--filter", "json."]
+
+    assert main([*args, "--output", str(output)]) == 0
+    report = json.loads(output.read_text())
+    assert set(report["benchmarks"]) == {
+        "json.dumps.portrait_data",
+        "json.loads.portrait_response",
+    }
+
+    # A wildly generous threshold keeps timing noise from failing the test.
+    assert (
+        main(
+            [*args, "--output", str(tmp_path / "again.json")]
+            + ["--compare", str(output), "--threshold", "1000"]
+        )
+        == 0
+    )
+
+
+def test_cli_restores_logging(tmp_path):
+    args = ["--iterations", "1", "--warmup", "0", "--filter", "json.dumps"]
+
+    main([*args, "--output", str(tmp_path / "report.json")])
+
+    assert logging.root.manager.disable == logging.NOTSET
+
+
+def test_canned_portrait_has_every_section():
+    assert set(PORTRAIT_SECTIONS) == set(Portrait.model_fields)
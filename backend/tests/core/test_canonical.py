@@ -0,0 +1,28 @@
+import pytest
+
+from backend.app.core.canonical import BirthMoment, Coordinates
+
+
+def test_equivalent_moments_are_equal():
+    spellings = [
+        "2000-01-01T08:00:00+08:00",
+        "2000-01-01T00:00:00Z",
+        "2000-01-01T00:00:00.400+00:00",
+        "2000-01-01T00:00:00",
+    ]
+    moments = {BirthMoment.parse(spelling) for spelling in spellings}
+
+    assert len(moments) == 1
+    assert str(moments.pop()) == "2000-01-01T00:00:00Z"
+
+
+def test_coordinates_are_quantized():
+    assert Coordinates.parse("25.0375198,121.5636796") == Coordinates.parse(
+        " 25.03752, 121.56368"
+    )
+    assert str(Coordinates.parse("25.0375198,121.5636796")) == "25.04,121.56"
+    assert str(Coordinates.parse("-0.001,0")) == "0.0,0.0"
+    with pytest.raises(ValueError):
+        Coordinates.parse("91,0")
+    with pytest.raises(ValueError):
+        Coordinates.parse("1,2,3")
@@ -0,0 +1,56 @@
+import time
+
+import pytest
+
+from backend.app.core.circuit_breaker import CircuitBreaker, CircuitOpenError, State
+
+
+class ClientError(Exception):
+    status_code = 400
+
+
+def fail(breaker, error=RuntimeError("upstream down")):
+    with pytest.raises(type(error)):
+        with breaker.call():
+            raise error
+
+
+def test_opens_after_consecutive_failures_and_fails_fast():
+    breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=60)
+    fail(breaker)
+    assert breaker.state is State.CLOSED
+    fail(breaker)
+    assert breaker.state is State.OPEN
+
+    with pytest.raises(CircuitOpenError) as info:
+        breaker.check()
+    assert info.value.retry_after == 60
+
+
+def test_half_open_probe_closes_or_reopens():
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=0.05)
+    fail(breaker)
+    time.sleep(0.06)
+
+    fail(breaker)  # the probe fails
+    assert breaker.state is State.OPEN
+    time.sleep(0.06)
+
+    with breaker.call():
+        # Only one probe at a time.
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+    assert breaker.state is State.CLOSED
+
+
+def test_client_errors_do_not_trip_the_breaker():
+    breaker = CircuitBreaker("test", failure_threshold=1)
+    fail(breaker, ClientError())
+    assert breaker.state is State.CLOSED
+
+
+def test_slow_calls_count_as_failures():
+    breaker = CircuitBreaker("test", failure_threshold=1, slow_call_duration=0.01)
+    with breaker.call():
+        time.sleep(0.02)
+    assert breaker.state is State.OPEN
@@ -0,0 +1,77 @@
+import gzip
+from unittest.mock import patch
+
+from starlette.requests import Request
+
+from backend.app.core import http_cache
+from backend.app.core.http_cache import (
+    conditional_response,
+    etag_matches,
+    negotiate_coding,
+    negotiate_media_type,
+)
+from backend.app.core.serialization import PreserializedModel
+
+
+class Reading(PreserializedModel):
+    model_config = {"frozen": True}
+    content: str
+
+
+def _request(**headers: str) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "headers": [
+                (name.replace("_", "-").encode(), value.encode())
+                for name, value in headers.items()
+            ],
+        }
+    )
+
+
+def test_codings_are_negotiated_by_q_value():
+    assert negotiate_coding("gzip;q=0.5, deflate") == "gzip"
+    assert negotiate_coding("gzip;q=0") is None
+    assert negotiate_coding("identity") is None
+    assert negotiate_coding(None) is None
+
+
+def test_msgpack_falls_back_to_json_when_unavailable():
+    with patch.object(http_cache, "MSGPACK_AVAILABLE", False):
+        assert negotiate_media_type("application/msgpack") == "application/json"
+    with patch.object(http_cache, "MSGPACK_AVAILABLE", True):
+        assert negotiate_media_type("application/msgpack") == "application/msgpack"
+        assert (
+            negotiate_media_type("application/json, application/msgpack;q=0.5")
+            == "application/json"
+        )
+
+
+def test_large_bodies_are_compressed_once():
+    reading = Reading(content="Saturn returns. " * 200)
+
+    first = conditional_response(_request(accept_encoding="gzip"), reading, 60)
+    second = conditional_response(_request(accept_encoding="gzip"), reading, 60)
+    revalidated = conditional_response(
+        _request(accept_encoding="gzip", if_none_match=first.headers["ETag"]),
+        reading,
+        60,
+    )
+    small = conditional_response(
+        _request(accept_encoding="gzip"), Reading(content="Mars"), 60
+    )
+
+    assert first.headers["Content-Encoding"] == "gzip"
+    assert first.headers["ETag"] == reading.etag[:-1] + '-gzip"'
+    assert gzip.decompress(first.body) == reading.json_bytes
+    assert first.body is second.body
+    assert revalidated.status_code == 304
+    assert "Content-Encoding" not in small.headers
+
+
+def test_etags_only_match_the_same_representation():
+    assert etag_matches('W/"abc-gzip"', '"abc-gzip"')
+    assert etag_matches('"x", "abc"', '"abc"')
+    assert not etag_matches('"abc"', '"abc-msgpack"')
+    assert not etag_matches('"abc-gzip"', '"abc"')
@@ -0,0 +1,126 @@
+import asyncio
+import time
+
+import pytest
+
+from backend.app.core.database import get_engine
+from backend.app.core.jobs import JobQueue, JobStatus, JobStore
+from backend.app.core.quota import UpstreamBusyError
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(get_engine(f"sqlite:///{tmp_path / 'jobs.db'}"))
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_identical_active_jobs_are_deduplicated(store):
+    job, created = store.submit("portrait", {"a": 1, "b": 2})
+    again, created_again = store.submit("portrait", {"b": 2, "a": 1})
+    other, _ = store.submit("portrait", {"a": 2})
+
+    assert created and not created_again
+    assert again.id == job.id
+    assert other.id != job.id
+
+    claimed, payload = store.claim(["portrait"], lease=60)
+    store.complete(claimed.id, '"done"')
+    # Finished jobs do not absorb new submissions.
+    fresh, created_fresh = store.submit("portrait", payload)
+    assert created_fresh and fresh.id != claimed.id
+
+
+def test_each_job_is_claimed_once(store):
+    store.submit("portrait", {"a": 1})
+
+    first = store.claim(["portrait"], lease=60)
+    assert first is not None
+    assert first[0].status is JobStatus.RUNNING
+    assert first[0].attempts == 1
+    assert store.claim(["portrait"], lease=60) is None
+    assert store.claim(["other"], lease=60) is None
+
+
+def test_expired_lease_is_reclaimed(store):
+    job, _ = store.submit("portrait", {"a": 1})
+    store.claim(["portrait"], lease=-1)
+
+    reclaimed, _ = store.claim(["portrait"], lease=60)
+    assert reclaimed.id == job.id
+    assert reclaimed.attempts == 2
+
+
+def test_running_job_keeps_its_lease(store):
+    queue = JobQueue(store, workers=1, poll_interval=0.05, lease=0.15)
+    queue.register("portrait", lambda payload: time.sleep(0.5) or "done")
+
+    try:
+        job = queue.submit("portrait", {"a": 1})
+        assert wait_for(lambda: store.get(job.id).status is JobStatus.RUNNING)
+        time.sleep(0.3)
+        assert store.claim(["portrait"], lease=60) is None
+        assert wait_for(lambda: store.get(job.id).status is JobStatus.DONE)
+    finally:
+        queue.stop()
+    assert store.get(job.id).attempts == 1
+
+
+def test_queue_runs_handlers_and_records_results(store):
+    queue = JobQueue(store, workers=2, poll_interval=0.05, error_status=lambda e: 400)
+    queue.register("square", lambda payload: {"value": payload["n"] ** 2})
+    queue.register("broken", lambda payload: int("x"))
+    try:
+        ok = queue.submit("square", {"n": 3})
+        broken = queue.submit("broken", {})
+
+        assert wait_for(lambda: queue.get(ok.id).finished)
+        assert wait_for(lambda: queue.get(broken.id).finished)
+    finally:
+        queue.stop()
+
+    assert queue.get(ok.id).result == {"value": 9}
+    failed = queue.get(broken.id)
+    assert failed.status is JobStatus.FAILED
+    assert failed.error_status == 400
+    with pytest.raises(ValueError):
+        queue.submit("unknown", {})
+
+
+def test_busy_upstream_retries_then_fails(store):
+    def busy(payload):
+        raise UpstreamBusyError("prokerala", 0)
+
+    queue = JobQueue(store, workers=1, max_attempts=2)
+    queue.register("busy", busy)
+    job, _ = store.submit("busy", {})
+
+    queue.run(*store.claim(["busy"], lease=60))
+    assert queue.get(job.id).status is JobStatus.PENDING
+    # Retried once the suggested delay has passed.
+    assert store.claim(["busy"], lease=60) is None
+    store.retry(job.id, 0, "busy")
+
+    queue.run(*store.claim(["busy"], lease=60))
+    failed = queue.get(job.id)
+    assert failed.status is JobStatus.FAILED
+    assert failed.error_status == 503
+
+
+def test_wait_returns_once_finished(store):
+    queue = JobQueue(store, workers=1, poll_interval=0.05)
+    queue.register("slow", lambda payload: time.sleep(0.1) or "done")
+    try:
+        job = queue.submit("slow", {})
+        finished = asyncio.run(queue.wait(job.id, timeout=2))
+    finally:
+        queue.stop()
+
+    assert finished.status is JobStatus.DONE
+    assert finished.result == "done"
+    assert asyncio.run(queue.wait("missing", timeout=0.1)) is None
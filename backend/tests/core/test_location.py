@@ -0,0 +1,71 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from backend.app.core import location
+from backend.app.core.geocode_cache import MISS, GeocodeCache
+from backend.app.core.metrics import cache_requests
+from backend.app.core.rate_limit import TokenBucket
+
+
+@pytest.fixture
+def geocode_cache(tmp_path):
+    cache = GeocodeCache(path=str(tmp_path / "geocode.sqlite3"))
+    with patch.object(location, "geocode_cache", cache):
+        yield cache
+
+
+def test_get_coordinates_is_cached(geocode_cache):
+    geolocator = MagicMock()
+    geolocator.geocode.return_value = SimpleNamespace(latitude=25.03, longitude=121.56)
+
+    with patch.object(location.geolocator, "get", return_value=geolocator):
+        assert location.get_coordinates("Taipei") == "25.03,121.56"
+        assert location.get_coordinates("  taipei ") == "25.03,121.56"
+
+    assert geolocator.geocode.call_count == 1
+    assert geocode_cache.get("taipei") == "25.03,121.56"
+
+
+def test_get_coordinates_caches_failures(geocode_cache):
+    geolocator = MagicMock()
+    geolocator.geocode.return_value = None
+
+    with patch.object(location.geolocator, "get", return_value=geolocator):
+        for _ in range(3):
+            with pytest.raises(location.GeopyError):
+                location.get_coordinates("Nowhereville")
+
+    assert geolocator.geocode.call_count == 1
+
+
+def test_each_lookup_is_counted_once(geocode_cache):
+    geolocator = MagicMock()
+    geolocator.geocode.return_value = SimpleNamespace(latitude=48.85, longitude=2.35)
+    misses = cache_requests.value(cache="geocode", result="miss")
+    hits = cache_requests.value(cache="geocode", result="hit")
+
+    with patch.object(location.geolocator, "get", return_value=geolocator):
+        assert asyncio.run(location.get_coordinates_async("Paris")) == "48.85,2.35"
+        assert location.get_coordinates("Paris") == "48.85,2.35"
+
+    assert cache_requests.value(cache="geocode", result="miss") == misses + 1
+    assert cache_requests.value(cache="geocode", result="hit") == hits + 1
+
+
+def test_negative_entries_expire(tmp_path):
+    cache = GeocodeCache(path=str(tmp_path / "geocode.sqlite3"), negative_ttl=-1)
+    cache.set("nowhereville", None)
+
+    assert cache.get("nowhereville") is MISS
+
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=1.0, capacity=2.0)
+
+    assert bucket.try_acquire()
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+    assert not bucket.acquire(timeout=0.1)
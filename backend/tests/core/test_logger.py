@@ -0,0 +1,114 @@
+import json
+import logging
+import logging.handlers
+import queue
+
+from backend.app.core import logger
+from backend.app.core.metrics import registry
+from backend.app.core.logger import (
+    JSONFormatter,
+    NonBlockingQueueHandler,
+    SamplingFilter,
+    parse_sample_rates,
+    shutdown_logging,
+)
+
+
+def make_record(name="test", level=logging.INFO, msg="hello", extra=None):
+    return logging.getLogger(name).makeRecord(
+        name, level, __file__, 1, msg, None, None, extra=extra
+    )
+
+
+def test_formatter_emits_extra_fields_and_truncates():
+    formatter = JSONFormatter(max_field_length=10)
+    record = make_record(
+        extra={
+            "response": "x" * 50,
+            "tokens": 42,
+            "user_context": {"history": ["y" * 50], "short": "ok"},
+        }
+    )
+
+    data = json.loads(formatter.format(record))
+
+    assert data["message"] == "hello"
+    assert data["tokens"] == 42
+    assert data["response"] == "x" * 10 + "... [40 chars truncated]"
+    assert data["user_context"] == {
+        "history": ["y" * 10 + "... [40 chars truncated]"],
+        "short": "ok",
+    }
+
+
+def test_formatter_unpacks_dict_messages():
+    record = make_record(msg={"title": "AI portrait generated", "response": "{}"})
+
+    data = json.loads(JSONFormatter().format(record))
+
+    assert data["message"] == "AI portrait generated"
+    assert data["response"] == "{}"
+
+
+def test_sampling_filter_uses_longest_prefix_and_keeps_warnings():
+    sampler = SamplingFilter(parse_sample_rates("backend=1.0,backend.app.services=0"))
+
+    assert sampler.filter(make_record(name="backend.app.core"))
+    assert not sampler.filter(make_record(name="backend.app.services.chat_agent"))
+    assert sampler.filter(
+        make_record(name="backend.app.services.chat_agent", level=logging.WARNING)
+    )
+
+
+def test_queue_handler_drops_instead_of_blocking():
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    before = logger.dropped_records.value()
+
+    handler.handle(make_record())
+    handler.handle(make_record())
+
+    assert handler.queue.qsize() == 1
+    assert handler.dropped == 1
+    assert logger.dropped_records.value() == before + 1
+    assert "myng_log_records_dropped_total" in registry.render()
+
+
+def test_child_gets_a_new_listener_after_fork(monkeypatch):
+    records = []
+    sink = logging.Handler()
+    sink.emit = records.append
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=5))
+    parent = logging.handlers.QueueListener(handler.queue, sink)
+    monkeypatch.setattr(logger, "_listener", parent)
+    root = logging.getLogger()
+    root.addHandler(handler)
+    try:
+        logger._restart_listener_after_fork()
+        child = logger._listener
+        handler.handle(make_record())
+        child.stop()
+    finally:
+        root.removeHandler(handler)
+
+    assert child is not parent
+    assert child.queue is handler.queue
+    assert child.queue.maxsize == 5
+    assert child.handlers == (sink,)
+    assert [record.getMessage() for record in records] == ["hello"]
+
+
+def test_shutdown_writes_out_queued_records(monkeypatch):
+    records = []
+    sink = logging.Handler()
+    sink.emit = records.append
+    handler = NonBlockingQueueHandler(queue.Queue())
+    listener = logging.handlers.QueueListener(handler.queue, sink)
+    monkeypatch.setattr(logger, "_listener", listener)
+    listener.start()
+    monkeypatch.setattr(logging, "shutdown", lambda: records.append("shutdown"))
+    handler.handle(make_record())
+
+    shutdown_logging()
+
+    assert [getattr(r, "msg", r) for r in records] == ["hello", "shutdown"]
+    assert logger._listener is None
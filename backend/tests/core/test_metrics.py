@@ -0,0 +1,103 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app.core.metrics import (
+    Counter,
+    Histogram,
+    record_llm_usage,
+    llm_prompt_cache,
+    llm_tokens,
+    stage_duration,
+    stage_errors,
+    track,
+)
+
+
+def test_track_records_latency_and_errors():
+    with track("test.ok"):
+        pass
+    with pytest.raises(ValueError):
+        with track("test.fail"):
+            raise ValueError("boom")
+
+    assert stage_duration.count(stage="test.ok") == 1
+    assert stage_duration.count(stage="test.fail") == 1
+    assert stage_errors.value(stage="test.fail", error="ValueError") == 1
+
+
+def test_histogram_exposition_is_cumulative():
+    histogram = Histogram("test_seconds", "Test.", buckets=(0.1, 1.0))
+    histogram.observe(0.05, stage="a")
+    histogram.observe(0.5, stage="a")
+    histogram.observe(5.0, stage="a")
+
+    lines = list(histogram.collect())
+
+    assert 'test_seconds_bucket{stage="a",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{stage="a",le="1.0"} 2' in lines
+    assert 'test_seconds_bucket{stage="a",le="+Inf"} 3' in lines
+    assert 'test_seconds_count{stage="a"} 3' in lines
+
+
+def test_counter_callbacks_are_collected():
+    counter = Counter("test_total", "Test.")
+    counter.add_callback(lambda: [({"cache": "x"}, 7)])
+
+    assert 'test_total{cache="x"} 7' in list(counter.collect())
+
+
+def test_record_llm_usage():
+    response = SimpleNamespace(
+        usage=SimpleNamespace(prompt_tokens=10, completion_tokens=5)
+    )
+
+    record_llm_usage(response, "test-model")
+
+    assert llm_tokens.value(model="test-model", kind="prompt") == 10
+    assert llm_tokens.value(model="test-model", kind="completion") == 5
+    assert (
+        llm_prompt_cache.value(endpoint="default", model="test-model", result="miss")
+        == 0
+    )
+
+
+def test_record_llm_usage_counts_prefix_cache_per_endpoint():
+    response = SimpleNamespace(
+        usage=SimpleNamespace(
+            prompt_tokens=1200,
+            completion_tokens=50,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=1024),
+        )
+    )
+    other_backend = SimpleNamespace(
+        usage=SimpleNamespace(
+            prompt_tokens=300, completion_tokens=5, prompt_cache_hit_tokens=0
+        )
+    )
+
+    record_llm_usage(response, "cache-model", "portrait")
+    record_llm_usage(other_backend, "cache-model", "chat")
+
+    assert (
+        llm_prompt_cache.value(endpoint="portrait", model="cache-model", result="hit")
+        == 1024
+    )
+    assert (
+        llm_prompt_cache.value(endpoint="portrait", model="cache-model", result="miss")
+        == 176
+    )
+    assert (
+        llm_prompt_cache.value(endpoint="chat", model="cache-model", result="miss")
+        == 300
+    )
+
+
+def test_metrics_endpoint():
+    from backend.app.main import app
+
+    response = TestClient(app).get("/metrics")
+
+    assert response.status_code == 200
+    assert "# TYPE myng_stage_duration_seconds histogram" in response.text
@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.app.core.profiling import ProfilingMiddleware
+from backend.app.core.tracing import TracingMiddleware
+
+
+def busy_loop(seconds: float) -> None:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def make_client(tmp_path, **kwargs):
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, directory=str(tmp_path), **kwargs)
+    app.add_middleware(TracingMiddleware)
+
+    @app.get("/work/{item_id}")
+    def work(item_id: str):
+        busy_loop(0.05)
+        return {"item_id": item_id}
+
+    @app.get("/threaded")
+    async def threaded():
+        await asyncio.to_thread(busy_loop, 0.05)
+        return {}
+
+    return TestClient(app)
+
+
+def test_header_with_token_writes_folded_profile(tmp_path):
+    client = make_client(tmp_path, token="secret", interval=0.001)
+
+    client.get("/work/1", headers={"X-Profile": "secret", "X-Request-ID": "req-9"})
+
+    (profile,) = tmp_path.iterdir()
+    assert profile.name.endswith("_GET_work_item_id_req-9.folded")
+    assert "busy_loop" in profile.read_text()
+
+
+def test_requests_are_not_profiled_without_token(tmp_path):
+    client = make_client(tmp_path, token=None)
+
+    client.get("/work/1", headers={"X-Profile": "anything"})
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_cprofile_mode(tmp_path):
+    client = make_client(tmp_path, sample_rate=1.0, mode="cprofile")
+
+    client.get("/work/1")
+
+    (profile,) = tmp_path.iterdir()
+    assert profile.suffix == ".prof"
+
+
+def test_sampling_sees_work_done_in_threads(tmp_path):
+    client = make_client(tmp_path, sample_rate=1.0, interval=0.001)
+
+    client.get("/threaded")
+
+    (profile,) = tmp_path.iterdir()
+    assert "busy_loop" in profile.read_text()
+
+
+def test_headers_that_are_not_utf8_are_not_profiled(tmp_path):
+    sent = []
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+
+    async def send(message):
+        sent.append(message)
+
+    middleware = ProfilingMiddleware(app, token="secret", directory=str(tmp_path))
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(b"x-profile", "s\xe9cret".encode("latin-1"))],
+    }
+    asyncio.run(middleware(scope, None, send))
+
+    assert sent[0]["status"] == 200
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,53 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from backend.app.core.circuit_breaker import CircuitBreaker, CircuitOpenError, State
+from backend.app.core.prokerala import ProkeralaClient
+from backend.app.core.prokerala_auth import SharedTokenApiClient
+from backend.app.core.token_cache import TokenCache
+
+
+class HangingHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        time.sleep(1)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def hanging_upstream():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), HangingHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/"
+    server.shutdown()
+    server.server_close()
+
+
+def test_hung_upstream_times_out_and_trips_the_breaker(tmp_path, hanging_upstream):
+    api = SharedTokenApiClient(
+        "id",
+        "secret",
+        token_cache=TokenCache(str(tmp_path / "tokens.db")),
+        base_url=hanging_upstream,
+        timeout=0.1,
+    )
+    api.token_cache.refresh(api.cache_key, lambda: ("token", 3600.0))
+    client = ProkeralaClient()
+    client._client = api
+    client.breaker = CircuitBreaker("test", failure_threshold=2)
+
+    start = time.monotonic()
+    for _ in range(2):
+        with pytest.raises(OSError):
+            client.get_natal_planet_position("2000-01-01T08:00:00+08:00", "1,2")
+
+    assert time.monotonic() - start < 1
+    assert client.breaker.state is State.OPEN
+    with pytest.raises(CircuitOpenError):
+        client.get_natal_planet_position("2000-01-01T08:00:00+08:00", "1,2")
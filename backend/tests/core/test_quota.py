@@ -0,0 +1,86 @@
+import threading
+import time
+
+import pytest
+
+from backend.app.core.quota import (
+    Priority,
+    QuotaExhaustedError,
+    QuotaScheduler,
+    UpstreamBusyError,
+    scheduler_from_env,
+    upstream_priority,
+)
+
+
+def test_interactive_calls_go_before_queued_background_work():
+    scheduler = QuotaScheduler("test", rate=20, burst=1, interactive_reserve=0)
+    scheduler.admit()  # drain the bucket
+    order = []
+
+    def call(priority, name):
+        with upstream_priority(priority, timeout=5):
+            scheduler.admit()
+        order.append(name)
+
+    background = [
+        threading.Thread(target=call, args=(Priority.BACKGROUND, f"bg{i}"))
+        for i in range(3)
+    ]
+    for thread in background:
+        thread.start()
+    time.sleep(0.01)
+    interactive = threading.Thread(target=call, args=(Priority.INTERACTIVE, "ui"))
+    interactive.start()
+    for thread in [*background, interactive]:
+        thread.join()
+
+    assert order.index("ui") <= 1
+
+
+def test_rejects_immediately_when_wait_exceeds_deadline():
+    scheduler = QuotaScheduler("test", rate=0.1, burst=1)
+    scheduler.admit()
+
+    start = time.monotonic()
+    with upstream_priority(Priority.INTERACTIVE, timeout=1):
+        with pytest.raises(UpstreamBusyError) as info:
+            scheduler.admit()
+    assert time.monotonic() - start < 0.1
+    assert info.value.retry_after >= 9
+
+
+def test_background_leaves_burst_headroom_for_interactive():
+    scheduler = QuotaScheduler("test", rate=0.01, burst=2, interactive_reserve=1)
+
+    with upstream_priority(Priority.BACKGROUND, timeout=1):
+        scheduler.admit()
+        with pytest.raises(UpstreamBusyError):
+            scheduler.admit()
+    scheduler.admit()
+
+
+def test_quota_accounting_caps_background_share():
+    scheduler = QuotaScheduler("test", rate=100, quota=3, background_share=0.5)
+
+    with upstream_priority(Priority.BACKGROUND):
+        scheduler.admit()
+        with pytest.raises(QuotaExhaustedError):
+            scheduler.admit()
+    scheduler.admit()
+    scheduler.admit()
+    assert scheduler.remaining_quota() == 0
+    with pytest.raises(QuotaExhaustedError):
+        scheduler.admit()
+
+
+def test_limits_are_shared_among_workers(monkeypatch):
+    monkeypatch.setenv("TEST_RATE_LIMIT", "10")
+    monkeypatch.setenv("TEST_QUOTA", "1000")
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+
+    scheduler = scheduler_from_env("test", "TEST")
+
+    assert scheduler.bucket.rate == 2.5
+    assert scheduler.bucket.capacity == 2.5
+    assert scheduler.quota == 250
@@ -0,0 +1,19 @@
+from backend.app.core.serialization import ModelResponse, PreserializedModel, loads
+
+
+class Reading(PreserializedModel):
+    model_config = {"frozen": True}
+    headline: str
+
+
+def test_model_is_serialized_once():
+    reading = Reading(headline="Mercury stations")
+
+    first = ModelResponse(reading)
+    second = ModelResponse(reading)
+
+    assert first.body is second.body
+    assert loads(first.body) == {"headline": "Mercury stations"}
+    assert first.headers["content-type"] == "application/json"
+    assert reading == Reading(headline="Mercury stations")
+    assert hash(reading) == hash(Reading(headline="Mercury stations"))
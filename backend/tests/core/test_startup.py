@@ -0,0 +1,35 @@
+import pytest
+
+from backend.app.core import startup
+from backend.app.core.startup import Lazy, startup_report, warmup
+
+
+@pytest.fixture(autouse=True)
+def isolated_registry(monkeypatch):
+    monkeypatch.setattr(startup, "_registry", {})
+
+
+def test_lazy_builds_once_and_is_reported():
+    calls = []
+    lazy = Lazy(
+        "test_component", lambda: calls.append(1) or object(), imports=("json",)
+    )
+
+    assert not lazy.initialized
+    assert lazy.get() is lazy.get()
+    assert calls == [1]
+
+    component = startup_report()["components"]["test_component"]
+    assert component["initialized"] is True
+    assert "import" in component and "init" in component
+
+
+def test_warmup_reports_failures():
+    def fail():
+        raise ValueError("missing credentials")
+
+    Lazy("test_broken_component", fail)
+
+    status = warmup(["test_broken_component"])
+
+    assert status["test_broken_component"] == "error: missing credentials"
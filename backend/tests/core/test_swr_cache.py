@@ -0,0 +1,90 @@
+import threading
+import time
+
+from backend.app.core.database import get_engine
+from backend.app.core.shared_cache import SharedCacheStore
+from backend.app.core.swr_cache import StaleWhileRevalidateCache, collect_staleness
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_concurrent_misses_share_one_load():
+    cache = StaleWhileRevalidateCache("test", ttl=60)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return "value"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get("k", loader)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["value"] * 5
+    assert len(calls) == 1
+
+
+def test_stale_entry_is_served_while_refreshing():
+    cache = StaleWhileRevalidateCache("test", ttl=0.01)
+    cache.set("k", "old")
+    time.sleep(0.02)
+    refreshed = threading.Event()
+
+    def loader():
+        refreshed.wait(1)
+        return "new"
+
+    with collect_staleness() as ages:
+        start = time.monotonic()
+        assert cache.get("k", loader) == "old"
+        assert time.monotonic() - start < 0.5
+    assert len(ages) == 1 and ages[0] >= 0.01
+
+    refreshed.set()
+    assert wait_for(lambda: cache.get("k", loader) == "new")
+
+
+def test_failed_refresh_keeps_serving_stale_value():
+    cache = StaleWhileRevalidateCache("test", ttl=0)
+    cache.set("k", "old")
+    attempts = []
+
+    def loader():
+        attempts.append(1)
+        raise RuntimeError("upstream down")
+
+    assert cache.get("k", loader) == "old"
+    assert wait_for(lambda: attempts and "k" not in cache._refreshing)
+    assert cache.get("k", loader) == "old"
+
+
+def test_evicts_least_recently_used():
+    cache = StaleWhileRevalidateCache("test", ttl=60, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a", lambda: None)
+    cache.set("c", 3)
+    assert cache.get("a", lambda: "reloaded") == 1
+    assert cache.get("b", lambda: "reloaded") == "reloaded"
+
+
+def test_shared_store_serves_other_workers(tmp_path):
+    store = SharedCacheStore(get_engine(f"sqlite:///{tmp_path / 'cache.db'}"))
+    first = StaleWhileRevalidateCache("test", ttl=60, shared=store)
+    second = StaleWhileRevalidateCache("test", ttl=60, shared=store)
+
+    assert first.get(("k", 1), lambda: {"value": 1}) == {"value": 1}
+    assert second.get(("k", 1), lambda: {"value": 2}) == {"value": 1}
+    assert second.get(("k", 2), lambda: {"value": 2}) == {"value": 2}
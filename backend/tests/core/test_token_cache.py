@@ -0,0 +1,73 @@
+import threading
+import time
+
+from backend.app.core.token_cache import TokenCache, TokenRefresher
+
+
+class Fetcher:
+    def __init__(self, expires_in=3600.0, delay=0.0):
+        self.expires_in = expires_in
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return f"token-{self.calls}", self.expires_in
+
+
+def test_workers_share_one_token(tmp_path):
+    path = str(tmp_path / "tokens.db")
+    fetch = Fetcher()
+
+    assert TokenCache(path).get_or_refresh("acct", fetch) == "token-1"
+    assert TokenCache(path).get_or_refresh("acct", fetch) == "token-1"
+    assert fetch.calls == 1
+
+
+def test_concurrent_refreshes_reach_upstream_once(tmp_path):
+    path = str(tmp_path / "tokens.db")
+    fetch = Fetcher(delay=0.05)
+    results = []
+
+    def worker():
+        results.append(TokenCache(path).get_or_refresh("acct", fetch))
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert fetch.calls == 1
+    assert results == ["token-1"] * 5
+
+
+def test_expiring_token_is_replaced_only_when_forced(tmp_path):
+    cache = TokenCache(str(tmp_path / "tokens.db"), refresh_margin=300)
+    fetch = Fetcher(expires_in=200)
+
+    cache.refresh("acct", fetch)
+    assert cache.get("acct") == "token-1"
+    assert cache.refresh("acct", fetch) == "token-1"
+    assert cache.refresh("acct", fetch, force=True) == "token-2"
+
+
+def test_expired_token_is_not_handed_out(tmp_path):
+    cache = TokenCache(str(tmp_path / "tokens.db"), min_validity=10)
+    cache.refresh("acct", Fetcher(expires_in=5))
+    assert cache.get("acct") is None
+
+
+def test_refresher_renews_ahead_of_expiry(tmp_path):
+    cache = TokenCache(str(tmp_path / "tokens.db"), refresh_margin=1, min_validity=0)
+    fetch = Fetcher(expires_in=1.2)
+    refresher = TokenRefresher(cache, "acct", fetch, retry=0.05)
+    refresher.start()
+
+    deadline = time.monotonic() + 3
+    while fetch.calls < 2 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    refresher.stop()
+    assert fetch.calls >= 2
+    assert cache.get("acct") is not None
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.app.core import tracing
+from backend.app.core.logger import TraceContextFilter
+from backend.app.core.metrics import track
+
+
+@pytest.fixture
+def collector():
+    """Local stand-in for an OTLP/HTTP collector."""
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            received.append((self.path, json.loads(body)))
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/v1/traces", received
+    server.shutdown()
+
+
+def test_spans_nest_and_export_to_file(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    with tracing.start_trace("req-1", sampled=True) as trace:
+        with tracing.span("outer"):
+            with tracing.span("inner", tool="x"):
+                pass
+    tracing.FileExporter(str(path)).export([trace])
+
+    exported = json.loads(path.read_text())
+    spans = {s["name"]: s for s in exported["spans"]}
+    assert exported["request_id"] == "req-1"
+    assert spans["inner"]["parent_id"] == spans["outer"]["span_id"]
+    assert spans["inner"]["attributes"] == {"tool": "x"}
+
+
+def test_unsampled_trace_records_no_spans():
+    with tracing.start_trace(sampled=False) as trace:
+        with tracing.span("ignored") as s:
+            assert s is None
+    assert trace.spans == []
+
+
+def test_log_records_carry_request_id():
+    record = logging.makeLogRecord({"msg": "hello"})
+    with tracing.start_trace("req-2", sampled=True):
+        with tracing.span("work") as s:
+            TraceContextFilter().filter(record)
+
+    assert record.request_id == "req-2"
+    assert record.span_id == s.span_id
+
+
+def test_middleware_propagates_request_id_and_exports_otlp(collector, monkeypatch):
+    endpoint, received = collector
+    exporter = tracing.BackgroundExporter(tracing.OTLPExporter(endpoint))
+    monkeypatch.setattr(tracing, "exporter", exporter)
+
+    app = FastAPI()
+    app.add_middleware(tracing.TracingMiddleware)
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: str):
+        with track("test.lookup"):
+            return {"item_id": item_id}
+
+    response = TestClient(app).get(
+        "/items/1", headers={"X-Request-ID": "abc", "X-Trace-Sample": "1"}
+    )
+    exporter.flush()
+
+    assert response.headers["X-Request-ID"] == "abc"
+    path, body = received[0]
+    assert path == "/v1/traces"
+    spans = {s["name"]: s for s in body["resourceSpans"][0]["scopeSpans"][0]["spans"]}
+    root = spans["GET /items/{item_id}"]
+    assert spans["test.lookup"]["parentSpanId"] == root["spanId"]
+    assert {"key": "request_id", "value": {"stringValue": "abc"}} in root["attributes"]
+
+
+def _call(middleware, headers: list[tuple[bytes, bytes]]) -> list[dict]:
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": headers}
+    asyncio.run(middleware(scope, receive, send))
+    return sent
+
+
+def test_middleware_accepts_headers_that_are_not_utf8():
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    sent = _call(
+        tracing.TracingMiddleware(app),
+        [(b"x-request-id", b"abc"), (b"x-name", "caf\xe9".encode("latin-1"))],
+    )
+
+    assert sent[0]["status"] == 200
+    assert (b"X-Request-ID", b"abc") in sent[0]["headers"]
+
+
+def test_middleware_replaces_malformed_request_ids():
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    for request_id in (b"a" * 129, b"abc\r\nSet-Cookie: x", b"a b"):
+        sent = _call(tracing.TracingMiddleware(app), [(b"x-request-id", request_id)])
+        echoed = dict(sent[0]["headers"])[b"X-Request-ID"]
+
+        assert echoed != request_id
+        assert len(echoed) == 32
@@ -0,0 +1,141 @@
+import pytest
+from openai import OpenAI
+from prokerala_api import ServerError
+
+from backend.app.core.prokerala import ProkeralaClient
+from backend.app.services.divination.zodiac.engine import Portrait
+from backend.benchmarks.payloads import NATAL_PAYLOAD
+from backend.loadtest.loadgen import parse_mix, percentile, summarize
+from backend.loadtest.stubs import (
+    Behaviour,
+    Latency,
+    OpenAIHandler,
+    ProkeralaHandler,
+    StubServer,
+)
+
+TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "get_natal_chart_context",
+            "parameters": {"type": "object", "properties": {}},
+        },
+    }
+]
+
+
+@pytest.fixture
+def prokerala(monkeypatch, tmp_path):
+    def start(behaviour=None):
+        server = StubServer(ProkeralaHandler, behaviour).start()
+        monkeypatch.setenv("PROKERALA_BASE_URL", server.url)
+        monkeypatch.setenv("PROKERALA_CLIENT_ID", "stub")
+        monkeypatch.setenv("PROKERALA_SECRET", "stub")
+        monkeypatch.setenv("PROKERALA_TOKEN_CACHE", str(tmp_path / "tokens.db"))
+        servers.append(server)
+        return ProkeralaClient()
+
+    servers = []
+    yield start
+    for server in servers:
+        server.stop()
+
+
+@pytest.fixture
+def openai_stub():
+    with StubServer(OpenAIHandler) as server:
+        yield OpenAI(api_key="stub", base_url=f"{server.url}v1", max_retries=0)
+
+
+def test_prokerala_stub_serves_fixture_payloads(prokerala):
+    client = prokerala()
+    result = client.get_natal_planet_position("2000-01-01T00:00:00Z", "0,0")
+    assert result == NATAL_PAYLOAD
+
+
+def test_prokerala_stub_injects_errors(prokerala):
+    client = prokerala(Behaviour(error_rate=1.0))
+    with pytest.raises(ServerError):
+        client.get_natal_planet_position("2000-01-01T00:00:00Z", "0,0")
+
+
+def test_openai_stub_calls_tools_then_answers(openai_stub):
+    messages = [{"role": "user", "content": "What is my rising sign?"}]
+    first = openai_stub.chat.completions.create(
+        model="stub", messages=messages, tools=TOOLS
+    )
+    (call,) = first.choices[0].message.tool_calls
+    assert call.function.name == "get_natal_chart_context"
+    assert first.usage.total_tokens > 0
+
+    messages += [
+        first.choices[0].message,
+        {"role": "tool", "tool_call_id": call.id, "content": "{}"},
+    ]
+    stream = openai_stub.chat.completions.create(
+        model="stub", messages=messages, tools=TOOLS, stream=True
+    )
+    text = "".join(chunk.choices[0].delta.content or "" for chunk in stream)
+    assert "Moon" in text
+
+
+def test_openai_stub_streams_tool_calls(openai_stub):
+    stream = openai_stub.chat.completions.create(
+        model="stub",
+        messages=[{"role": "user", "content": "hi"}],
+        tools=TOOLS,
+        stream=True,
+    )
+    names = [
+        call.function.name
+        for chunk in stream
+        for call in chunk.choices[0].delta.tool_calls or []
+        if call.function and call.function.name
+    ]
+    assert names == ["get_natal_chart_context"]
+
+
+def test_openai_stub_returns_json_for_json_mode(openai_stub):
+    response = openai_stub.chat.completions.create(
+        model="stub",
+        messages=[{"role": "user", "content": "Portrait please"}],
+        response_format={"type": "json_object"},
+    )
+    Portrait.model_validate_json(response.choices[0].message.content)
+
+
+def test_rate_limit_answers_429():
+    behaviour = Behaviour(rate_limit=1, burst=1)
+    assert behaviour.fault() is None
+    assert behaviour.fault() == 429
+
+
+def test_latency_specs():
+    assert Latency("fixed:0.5").sample() == 0.5
+    assert 1 <= Latency("uniform:1:2").sample() <= 2
+    assert Latency("lognormal:0.1:0.5").sample() > 0
+    with pytest.raises(ValueError):
+        Latency("uniform:1")
+
+
+def test_loadgen_report():
+    samples = [
+        {"scenario": "portrait", "status": 200, "latency": i / 100, "ttfb": None}
+        for i in range(1, 101)
+    ]
+    samples.append(
+        {
+            "scenario": "chat_stream",
+            "status": "ConnectionResetError",
+            "latency": 1.0,
+            "ttfb": 0.5,
+        }
+    )
+    report = summarize(samples, elapsed=10.0)
+
+    assert percentile([3, 1, 2], 50) == 2
+    assert report["scenarios"]["portrait"]["latency_p99_ms"] == 990.0
+    assert report["total"]["errors"] == 1
+    assert report["total"]["throughput_rps"] == 10.1
+    assert parse_mix("portrait=2,chat_stream") == {"portrait": 2.0, "chat_stream": 1.0}
@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from backend.app.core.metrics import llm_prompt_cache, llm_tokens
+from backend.app.services import chat_agent
+from backend.app.services.ai.chat import get_chat_completion
+from backend.app.services.chat_agent import ZodiacAgent
+
+
+def _chunk(content=None, usage=None):
+    choices = [SimpleNamespace(delta=SimpleNamespace(content=content))]
+    return SimpleNamespace(choices=choices if content else [], usage=usage)
+
+
+def test_streamed_answer_records_usage_from_last_chunk():
+    usage = SimpleNamespace(
+        prompt_tokens=900,
+        completion_tokens=7,
+        prompt_tokens_details=SimpleNamespace(cached_tokens=768),
+    )
+    stream = [_chunk("Hello"), _chunk(" there"), _chunk(usage=usage)]
+    agent = ZodiacAgent({"birth_datetime": "x", "birth_coordinates": "1,2"})
+    completions = []
+
+    def completion(**kwargs):
+        completions.append(kwargs)
+        return iter(stream)
+
+    with (
+        patch.object(chat_agent, "MODEL_NAME", "stream-model"),
+        patch.object(agent, "_prepare_chat", return_value=([], [], True)),
+        patch.object(chat_agent, "get_chat_completion", completion),
+    ):
+        assert "".join(agent.chat_stream([])) == "Hello there"
+
+    assert completions[0]["stream"] is True
+    assert llm_tokens.value(model="stream-model", kind="completion") == 7
+    assert (
+        llm_prompt_cache.value(endpoint="chat", model="stream-model", result="hit")
+        == 768
+    )
+
+
+def test_streams_ask_for_usage():
+    client = SimpleNamespace(
+        chat=SimpleNamespace(
+            completions=SimpleNamespace(create=lambda **params: params)
+        )
+    )
+
+    params = get_chat_completion([], client=client, stream=True)
+
+    assert params["stream_options"] == {"include_usage": True}
+    assert "stream_options" not in get_chat_completion([], client=client)
@@ -0,0 +1,26 @@
+import time
+from argparse import Namespace
+
+import pytest
+
+from backend.app.serve import MAX_FAST_EXITS, PreforkSupervisor
+
+
+def test_workers_failing_on_start_back_off_then_give_up():
+    supervisor = PreforkSupervisor(None, None, Namespace())
+    delays = []
+    for _ in range(MAX_FAST_EXITS + 1):
+        supervisor.started[0] = time.monotonic()
+        supervisor.schedule_restart(0)
+        due = supervisor.restart_at.pop(0, None)
+        if due is not None:
+            delays.append(due - supervisor.started[0])
+
+    assert delays == pytest.approx([0.5, 1, 2, 4, 8], abs=0.05)
+    assert supervisor.failed == {0}
+
+    # A worker that ran for a while is restarted right away.
+    supervisor.started[1] = time.monotonic() - 60
+    supervisor.schedule_restart(1)
+    assert supervisor.restart_at[1] <= time.monotonic()
+    assert supervisor.failed == {0}
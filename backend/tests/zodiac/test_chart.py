@@ -0,0 +1,60 @@
+from unittest.mock import patch
+
+import pytest
+
+from backend.app.services.divination.zodiac.chart import Body, NatalChart
+from backend.app.services.divination.zodiac.engine import ZodiacEngine
+
+from .fixtures import prokerala_natal_planet_position
+
+
+def test_chart_views_and_encoding_round_trip(prokerala_natal_planet_position):
+    engine = ZodiacEngine()
+    with patch.object(
+        engine.prokerala_client,
+        "get_natal_planet_position",
+        return_value=prokerala_natal_planet_position,
+    ):
+        chart = engine._build_portrait("2026-01-01T00:00:00Z", "25.03,121.56")
+
+    view = chart.as_dict()
+    assert chart["profile"] == view["profile"]
+    assert view["profile"]["Sun"] == {"sign": "Capricorn", "house": 12, "degree": 10.8}
+    assert "house" not in view["profile"]["Ascendant"]
+    assert chart.longitude(Body.SUN) == 280.8
+    assert NatalChart.from_dict(view).as_dict() == view
+    assert NatalChart.from_bytes(chart.to_bytes()).as_dict() == view
+    assert not hasattr(chart, "__dict__")
+
+
+def test_aspects_without_ids_are_left_out():
+    chart = NatalChart.from_dict(
+        {
+            "profile": {"Sun": {"sign": "Leo", "house": None, "degree": 29.95}},
+            "key_aspects": [
+                {"p1": "Sun", "p2": "Moon", "type": "Square", "orb": 0.05},
+                {"p1": "Sun", "p2": "Vulcan", "type": "Trine", "orb": 1.0},
+            ],
+            "house_cusps": {"1": "Leo"},
+        }
+    )
+
+    assert chart.as_dict() == {
+        "profile": {"Sun": {"sign": "Leo", "house": None, "degree": 30.0}},
+        "key_aspects": [{"p1": "Sun", "p2": "Moon", "type": "Square", "orb": 0.05}],
+        "house_cusps": {"1": "Leo"},
+    }
+
+
+def test_negative_orbs_are_kept_and_unknown_signs_rejected():
+    view = {
+        "profile": {"Moon": {"sign": "Cancer", "house": 4, "degree": 0.0}},
+        "key_aspects": [{"p1": "Moon", "p2": "Sun", "type": "Trine", "orb": -1.25}],
+        "house_cusps": {"1": "Aries"},
+    }
+    chart = NatalChart.from_dict(view)
+
+    assert chart.as_dict() == view
+    assert NatalChart.from_bytes(chart.to_bytes()).as_dict() == view
+    with pytest.raises(ValueError):
+        NatalChart.from_dict({**view, "house_cusps": {"1": "Ophiuchus"}})
@@ -0,0 +1,104 @@
+from datetime import date, datetime, timezone
+from unittest.mock import MagicMock
+
+from sqlalchemy import select, update
+
+from backend.app.core.database import get_engine
+from backend.app.services.divination.zodiac.daily import (
+    anchor_transit_datetime,
+    seconds_left_in_day,
+)
+from backend.app.services.divination.zodiac.engine import Portrait
+from backend.app.services.divination.zodiac import nightly
+from backend.app.services.divination.zodiac.nightly import (
+    DailyTransitPregenerator,
+    TimingWheel,
+    daily_transit_users,
+    remember_daily_transit_user,
+)
+from backend.benchmarks.payloads import PORTRAIT_RESPONSE
+
+TAIPEI = "25.0375198,121.5636796"
+
+
+def test_transit_datetime_is_anchored_to_the_local_day():
+    assert (
+        anchor_transit_datetime("2026-10-18T22:30:00.123Z", TAIPEI)
+        == "2026-10-19T12:00:00+08:00"
+    )
+    assert (
+        anchor_transit_datetime("2026-10-19T08:00:00", TAIPEI)
+        == "2026-10-19T12:00:00+08:00"
+    )
+
+
+def test_wheel_places_zones_by_local_morning():
+    wheel = TimingWheel(slots=96, hour=6, lead=3600)
+    wheel.build(date(2026, 10, 18), {"Asia/Taipei", "America/New_York"})
+
+    # 05:00 in Taipei is 21:00 UTC the day before; in New York (EDT) 09:00.
+    assert wheel.buckets[84] == [("Asia/Taipei", date(2026, 10, 19))]
+    assert wheel.buckets[36] == [("America/New_York", date(2026, 10, 18))]
+    assert sum(map(len, wheel.buckets)) == 2
+
+
+def test_tick_queues_active_users_once_spread_over_the_slot(tmp_path):
+    engine = get_engine(f"sqlite:///{tmp_path / 'nightly.db'}")
+    queue = MagicMock()
+    pregenerator = DailyTransitPregenerator(engine, queue, TimingWheel())
+    portrait = Portrait.model_validate_json(PORTRAIT_RESPONSE)
+    pregenerator.remember("2000-01-01T00:00:00Z", TAIPEI, TAIPEI, portrait)
+    pregenerator.remember("1990-06-01T00:00:00Z", TAIPEI, TAIPEI)
+    pregenerator.remember("1980-06-01T00:00:00Z", TAIPEI, TAIPEI)
+    with engine.begin() as conn:
+        conn.execute(
+            update(daily_transit_users)
+            .where(daily_transit_users.c.birth_datetime == "1980-06-01T00:00:00Z")
+            .values(last_seen=0)
+        )
+
+    now = datetime(2026, 10, 18, 21, 5, tzinfo=timezone.utc)
+    assert pregenerator.tick(now) == 2
+    # Users inactive for longer than active_days are purged.
+    with engine.connect() as conn:
+        remaining = conn.execute(select(daily_transit_users.c.birth_datetime))
+        assert "1980-06-01T00:00:00Z" not in {row for (row,) in remaining}
+    # Another worker ticking the same slot leaves it alone.
+    other = DailyTransitPregenerator(engine, MagicMock(), TimingWheel())
+    assert other.tick(now) == 0
+    assert pregenerator.tick(datetime(2026, 10, 18, 12, tzinfo=timezone.utc)) == 0
+
+    calls = queue.submit.call_args_list
+    payloads = [call.args[1] for call in calls]
+    assert {p["transit_datetime"] for p in payloads} == {"2026-10-19T12:00:00+08:00"}
+    assert {p["birth_datetime"] for p in payloads} == {
+        "2000-01-01T00:00:00Z",
+        "1990-06-01T00:00:00Z",
+    }
+    assert any(p.get("ai_portrait") == portrait.model_dump() for p in payloads)
+    run_after = sorted(call.kwargs["run_after"] for call in calls)
+    assert run_after[0] == now.timestamp()
+    assert (
+        run_after[1] < datetime(2026, 10, 18, 21, 15, tzinfo=timezone.utc).timestamp()
+    )
+
+
+def test_seconds_left_in_day_across_daylight_saving_change():
+    # New York springs forward on 2025-03-09, a 23 hour day.
+    left = seconds_left_in_day(
+        "40.7128,-74.0060", datetime(2025, 3, 9, 5, 0, tzinfo=timezone.utc)
+    )
+
+    assert left == 23 * 3600
+
+
+def test_remembering_a_user_starts_the_wheel(tmp_path):
+    engine = get_engine(f"sqlite:///{tmp_path / 'nightly.db'}")
+    pregenerator = DailyTransitPregenerator(engine, MagicMock(), TimingWheel())
+    nightly._pregenerator.set(pregenerator)
+    try:
+        remember_daily_transit_user("2000-01-01T00:00:00Z", TAIPEI, TAIPEI)
+        assert pregenerator._thread.is_alive()
+    finally:
+        pregenerator.stop()
+        nightly._pregenerator.reset()
@@ -0,0 +1,38 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+from backend.app.core.quota import Priority, _priority
+from backend.app.services.divination.zodiac import pregenerate
+
+
+def test_pregeneration_runs_once_per_profile_at_background_priority():
+    release = threading.Event()
+    done = threading.Event()
+    priorities = []
+
+    def generate(datetime, coordinates):
+        priorities.append(_priority.get())
+        release.wait(2)
+        done.set()
+
+    engine = MagicMock()
+    engine.get_ai_portrait.side_effect = generate
+
+    with patch.object(pregenerate, "get_zodiac_engine", return_value=engine):
+        assert pregenerate.pregenerate_portrait("2000-01-01T00:00:00Z", "0,0")
+        assert not pregenerate.pregenerate_portrait("2000-01-01T00:00:00Z", "0,0")
+        release.set()
+        assert done.wait(2)
+
+    engine.get_ai_portrait.assert_called_once_with("2000-01-01T00:00:00Z", "0,0")
+    assert priorities == [Priority.BACKGROUND]
+
+
+def test_pregeneration_is_dropped_when_saturated():
+    with (
+        patch.object(pregenerate, "MAX_PENDING", 0),
+        patch.object(pregenerate, "get_zodiac_engine") as engine,
+    ):
+        assert not pregenerate.pregenerate_portrait("2000-01-01T00:00:00Z", "1,1")
+
+    engine.assert_not_called()
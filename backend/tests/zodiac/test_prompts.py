@@ -0,0 +1,100 @@
+from backend.app.services.divination.zodiac.chart import NatalChart
+from backend.app.services.divination.zodiac.engine import Portrait
+from backend.app.services.divination.zodiac.prompts import (
+    daily_transit_data,
+    daily_transit_prompt,
+    daily_transit_prompt_data,
+    encode_chart,
+    estimate_tokens,
+    portrait_data,
+    portrait_prompt,
+    prompt_messages,
+)
+from backend.benchmarks.payloads import PORTRAIT_RESPONSE
+
+CHART = NatalChart.from_dict(
+    {
+        "profile": {
+            "Sun": {"sign": "Capricorn", "house": 12, "degree": 10.8},
+            "Moon": {"sign": "Capricorn", "house": 12, "degree": 23.9},
+            "Ascendant": {"sign": "Aquarius", "degree": 0.4},
+        },
+        "key_aspects": [
+            {"p1": "Sun", "p2": "Ascendant", "type": "Conjunction", "orb": 4.4},
+            {"p1": "Moon", "p2": "Ascendant", "type": "Conjunction", "orb": 1.5},
+            {"p1": "Sun", "p2": "Moon", "type": "Conjunction", "orb": -13.1},
+            {"p1": "Sun", "p2": "Moon", "type": "Conjunction", "orb": -0.2},
+        ],
+        "house_cusps": {"1": "Aquarius", "2": "Pisces"},
+    }
+)
+
+TRANSITS = [
+    {"type": "Hard", "event": "Transit Mars Square Natal Mars", "orb": 0.4},
+    {"type": "Soft", "event": "Transit Venus Trine Natal Saturn", "orb": 1.2},
+]
+
+
+def test_chart_block_keeps_placements_and_tightest_aspects_first():
+    full = encode_chart(CHART, budget=1000)
+    tight = encode_chart(CHART, budget=32)
+
+    assert full.splitlines() == [
+        "Sun Capricorn 10.8 H12",
+        "Moon Capricorn 23.9 H12",
+        "Ascendant Aquarius 0.4",
+        "Sun Conjunction Moon orb -0.2",
+        "Moon Conjunction Ascendant orb 1.5",
+        "Sun Conjunction Ascendant orb 4.4",
+        "Sun Conjunction Moon orb -13.1",
+        "Cusps 1:Aquarius 2:Pisces",
+    ]
+    assert tight.splitlines() == full.splitlines()[:4]
+    assert encode_chart(CHART, budget=0).splitlines() == full.splitlines()[:3]
+
+
+def test_daily_block_expands_sections_the_transits_touch():
+    portrait = Portrait.model_validate_json(PORTRAIT_RESPONSE)
+    section = portrait.drive_career_values
+
+    user_portrait, transits = daily_transit_data(portrait, TRANSITS, budget=2000)
+    summaries_only, _ = daily_transit_data(portrait, TRANSITS, budget=0)
+
+    assert transits.splitlines() == [
+        "Hard: Transit Mars Square Natal Mars (orb 0.4)",
+        "Soft: Transit Venus Trine Natal Saturn (orb 1.2)",
+    ]
+    assert section.content in user_portrait
+    assert portrait.core_identity.content not in user_portrait
+    assert all(
+        getattr(portrait, name).summary in summaries_only
+        for name in Portrait.model_fields
+    )
+    assert section.content not in summaries_only
+    assert daily_transit_data(portrait, TRANSITS, budget=2000) == (
+        user_portrait,
+        transits,
+    )
+    assert estimate_tokens(user_portrait) < estimate_tokens(portrait.model_dump_json())
+
+
+def test_instructions_are_a_static_prefix_with_the_data_last():
+    portrait = Portrait.model_validate_json(PORTRAIT_RESPONSE)
+    first = prompt_messages(portrait_prompt, portrait_data(CHART))
+    daily = prompt_messages(
+        daily_transit_prompt, daily_transit_prompt_data(portrait, TRANSITS)
+    )
+    other = prompt_messages(
+        daily_transit_prompt, daily_transit_prompt_data(portrait, TRANSITS[:1])
+    )
+
+    assert first[0] == {"role": "system", "content": portrait_prompt}
+    assert first[1]["content"].startswith("The Data:\nSun Capricorn")
+    assert daily[0] == other[0]
+    assert daily[1] != other[1]
+    assert "Top Daily Transits:\nHard: Transit Mars" in daily[1]["content"]
+    assert not any(
+        line != line.rstrip()
+        for prompt in (portrait_prompt, daily_transit_prompt)
+        for line in prompt.splitlines()
+    )
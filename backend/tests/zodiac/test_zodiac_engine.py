@@ -28,3 +28,26 @@ def test_get_portrait(prokerala_natal_planet_position):
     house_cusps = portrait["house_cusps"]
     assert house_cusps["1"] == "Aquarius"
     assert house_cusps["10"] == "Scorpio"
+
+
+def test_equivalent_inputs_share_one_chart(
+    prokerala_natal_planet_position, monkeypatch
+):
+    # Charts are shared through the database; keep this one in process.
+    monkeypatch.setenv("SHARED_CACHE", "false")
+    engine = ZodiacEngine()
+
+    with patch.object(
+        engine.prokerala_client,
+        "get_natal_planet_position",
+        return_value=prokerala_natal_planet_position,
+    ) as upstream:
+        first = engine.get_portrait(
+            "2026-01-01T08:00:00+08:00", "25.0375198,121.5636796"
+        )
+        second = engine.get_portrait("2026-01-01T00:00:00Z", "25.03752,121.56368")
+
+    assert first == second
+    upstream.assert_called_once_with(
+        datetime="2026-01-01T00:00:00Z", coordinates="25.04,121.56"
+    )